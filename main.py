@@ -7,7 +7,8 @@
 1. 登录验证
 2. 获取成绩信息
 3. 获取课程表信息
-4. 启动GUI界面
+4. 课表查询（某天课程、一周课表、下一节课、空闲时段）
+5. 启动GUI界面
 
 使用方法：
     python main.py [--gui] [--cli]
@@ -24,12 +25,59 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from src.utils.env_loader import env_loader
+
+# 先读取 .env（验证码和OCR相关配置在其中），再在后台加载OCR模型，
+# 与后续的模块导入、cookies加载和首页请求并行，首次登录只在模型尚未加载完成时等待
+env_loader.load_env()
+if env_loader.get_bool('OCR_WARM_UP_ON_START', True):
+    from utils.code1 import warm_up_ocr_async
+    warm_up_ocr_async()
+
 from src.auth.login import login, isValid, getname
+from src.auth.keepalive import start_keepalive
 from src.academic.achievement import achievement
 from src.academic.curriculum import curriculum
+from src.academic.timetable import Timetable, format_session
 from src.models.data import data
 
 
+def _ask_position(timetable: Timetable, ask_period: bool = False):
+    """读取要查询的周次和星期（直接回车表示今天），ask_period为True时再读取已上完的节次"""
+    today = timetable.position()
+    hint = f"，直接回车表示今天（第{today[0]}周 星期{today[1]}）" if today else ""
+    text = input(f"请输入周次和星期，如 7 3{hint}: ").strip()
+    try:
+        if text:
+            week, weekday = (int(part) for part in text.split()[:2])
+        elif today:
+            week, weekday = today
+        else:
+            print("未配置SEMESTER_START_DATE，请输入周次和星期")
+            return None
+    except ValueError:
+        print("格式不正确，应为 周次 星期，如 7 3")
+        return None
+
+    if not 1 <= weekday <= 7:
+        print("星期应为1-7")
+        return None
+
+    after_period = 0
+    if ask_period:
+        period_text = input("已上完第几节（直接回车表示从当天第一节开始）: ").strip()
+        after_period = int(period_text) if period_text.isdigit() else 0
+    return week, weekday, after_period
+
+
+def _print_day(timetable: Timetable, week: int, weekday: int) -> None:
+    """输出某天的课程"""
+    sessions = timetable.day(week, weekday)
+    print(f"第{week}周 星期{weekday}: {'共' + str(len(sessions)) + '节课' if sessions else '没有课'}")
+    for session in sessions:
+        print(f"  {format_session(session)}")
+
+
 def cli_mode():
     """命令行模式"""
     print("=" * 50)
@@ -45,14 +93,28 @@ def cli_mode():
 
         print(f"登录成功！用户：{getname()}")
 
+        # 后台保活，避免菜单操作时等待重新登录
+        start_keepalive()
+
+        # 获取一次课程表后在内存中建立索引，课表查询不再重新获取
+        timetable = None
+
         while True:
             print("\n请选择功能：")
             print("1. 获取成绩信息")
             print("2. 获取课程表信息")
             print("3. 获取所有数据")
+            print("4. 查看某天课程")
+            print("5. 查看一周课表")
+            print("6. 查询下一节课")
+            print("7. 查询空闲时段")
             print("0. 退出")
 
-            choice = input("请输入选择 (0-3): ").strip()
+            choice = input("请输入选择 (0-7): ").strip()
+
+            if choice in ('4', '5', '6', '7') and timetable is None:
+                print("正在获取课程表信息...")
+                timetable = Timetable(curriculum(compact=True))
 
             if choice == '0':
                 print("再见！")
@@ -69,16 +131,53 @@ def cli_mode():
                 if len(achievements) > 5:
                     print(f"... 还有 {len(achievements) - 5} 条记录")
 
+                # 绩点和各学期统计
+                if achievements:
+                    from src.academic.achievement_frame import to_frame, format_summary
+                    print(format_summary(to_frame(achievements)))
+
             elif choice == '2':
                 print("正在获取课程表信息...")
-                courses = curriculum()
-                print(f"成功获取课程表信息")
+                timetable = Timetable(curriculum(compact=True))
+                print(f"成功获取课程表信息：{len(timetable.courses())} 门课程，{len(timetable)} 个上课时段")
 
             elif choice == '3':
                 print("正在获取所有数据...")
                 # 这里需要用户名和密码参数，暂时跳过
                 print("此功能需要在GUI模式下使用")
 
+            elif choice == '4':
+                position = _ask_position(timetable)
+                if position:
+                    _print_day(timetable, *position[:2])
+
+            elif choice == '5':
+                position = _ask_position(timetable)
+                if position:
+                    week = position[0]
+                    days = timetable.week(week)
+                    if not days:
+                        print(f"第{week}周没有课")
+                    for weekday in days:
+                        _print_day(timetable, week, weekday)
+
+            elif choice == '6':
+                position = _ask_position(timetable, ask_period=True)
+                if position:
+                    found = timetable.next_class(*position)
+                    if found:
+                        week, weekday, session = found
+                        print(f"下一节课：第{week}周 星期{weekday} {format_session(session)}")
+                    else:
+                        print("本学期之后没有课了")
+
+            elif choice == '7':
+                position = _ask_position(timetable)
+                if position:
+                    week, weekday = position[:2]
+                    free = timetable.free_slots(week, weekday)
+                    print(f"第{week}周 星期{weekday} 空闲时段: {'、'.join(free) if free else '无'}")
+
             else:
                 print("无效选择，请重新输入")
 
@@ -3,7 +3,9 @@
 包含成绩查询、课程表查询等功能
 """
 
-from .achievement import achievement
-from .curriculum import curriculum
+from .achievement import achievement, async_achievement
+from .curriculum import curriculum, async_curriculum
+from .result_cache import is_stale
+from .timetable import Timetable
 
-__all__ = ['achievement', 'curriculum']
+__all__ = ['achievement', 'async_achievement', 'curriculum', 'async_curriculum', 'is_stale', 'Timetable']
@@ -3,13 +3,18 @@ import json
 import sys
 from typing import List, Dict, Any, Optional
 from pathlib import Path
-from bs4 import BeautifulSoup
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.auth.session_manager import get_session, ensure_logged_in
+from src.auth.session_manager import session_manager
+from src.academic.result_cache import result_cache, serve_stale
+from src.academic.html_backend import parse_html
+from src.academic.parse_cache import parse_cache, content_hash
+
+# 解析器版本：解析逻辑或结果格式变化时递增，使已缓存的解析结果失效（见 src.academic.parse_cache）
+PARSER_VERSION = 1
 
 
 class AchievementParser:
@@ -21,7 +26,7 @@ class AchievementParser:
 
     def _parse_html_table(self, html_content: str) -> List[Dict[str, Any]]:
         """
-        使用BeautifulSoup解析HTML表格
+        解析HTML成绩表格（解析后端见 src.academic.html_backend）
 
         Args:
             html_content: HTML内容
@@ -29,7 +34,7 @@ class AchievementParser:
         Returns:
             解析后的成绩数据列表
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = parse_html(html_content)
 
         # 查找成绩表格
         table = soup.find('table', {'id': 'dataList'})
@@ -89,73 +94,148 @@ class AchievementParser:
 
         return achievements
 
+    def _process_html(self, html_content: str) -> List[Dict[str, Any]]:
+        """
+        解析成绩页面并写入JSON文件
+
+        页面与之前解析过的页面逐字节相同时直接使用缓存的解析结果，
+        JSON文件已经是该页面的结果时不再重写。
+        """
+        body_hash = content_hash(html_content)
+        achievements = parse_cache.get('achievement', PARSER_VERSION, body_hash)
+
+        if achievements is not None:
+            print(f"✅ 成绩页面未变化，使用已解析的结果（{len(achievements)} 条）")
+        else:
+            achievements = self._parse_html_table(html_content)
+            # 没有解析出成绩的页面可能是错误页，不缓存
+            if achievements:
+                parse_cache.put('achievement', PARSER_VERSION, body_hash, achievements)
+
+        json_path = self._json_path()
+        if not parse_cache.output_current(json_path, body_hash):
+            self._save_to_json(achievements)
+            parse_cache.mark_output(json_path, body_hash)
+
+        return achievements
+
+    def _json_path(self) -> Path:
+        """JSON输出文件路径"""
+        return Path(__file__).parent.parent.parent / "data" / self.json_file
+
     def _save_to_json(self, data: List[Dict[str, Any]]) -> None:
         """保存数据到JSON文件"""
         # 确保data目录存在
-        data_dir = Path(__file__).parent.parent.parent / "data"
-        data_dir.mkdir(exist_ok=True)
+        json_path = self._json_path()
+        json_path.parent.mkdir(exist_ok=True)
 
-        json_path = data_dir / self.json_file
         with open(json_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
 
     def _load_from_json(self) -> Optional[List[Dict[str, Any]]]:
         """从JSON文件加载数据"""
         try:
-            data_dir = Path(__file__).parent.parent.parent / "data"
-            json_path = data_dir / self.json_file
+            json_path = self._json_path()
             with open(json_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
-    def fetch_achievements(self) -> List[Dict[str, Any]]:
-        """获取成绩数据"""
-        try:
-            # 确保已登录
-            if not ensure_logged_in():
-                print("❌ 登录失败，无法获取成绩数据")
-                return []
+    def _fallback(self, account: Optional[str], error: Exception) -> List[Dict[str, Any]]:
+        """
+        获取失败时返回该账号缓存的成绩（标记为过期数据），没有缓存返回空列表
 
+        achievement.json 由所有账号共用、每次获取都会覆盖，不能作为某个账号的降级数据。
+        """
+        stale = serve_stale('achievement', account, error)
+        return stale if stale is not None else []
+
+    def fetch_achievements(self, account: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        获取成绩数据
+
+        Args:
+            account: 账号，为空表示默认账号
+
+        Returns:
+            成绩数据列表
+        """
+        try:
             # 准备请求数据
             data = {"kksj": "", "kcxz": "", "kcmc": "", "xsfs": "max"}
 
-            # 使用全局session发送请求
-            session = get_session()
-            response = session.post(self.base_url, data=data, timeout=30)
+            # 直接请求成绩页，会话失效时session管理器会重新登录并重放请求
+            response = session_manager.request('POST', self.base_url, account=account, data=data)
             response.raise_for_status()
 
 
 
-            # 使用BeautifulSoup解析HTML表格
-            achievements = self._parse_html_table(response.text)
-
-            # 保存到文件
-            self._save_to_json(achievements)
+            # 解析HTML表格并保存到文件（页面未变化时使用缓存的解析结果）
+            achievements = self._process_html(response.text)
+            result_cache.put('achievement', account, achievements)
             return achievements
 
         except requests.RequestException as e:
             print(f"网络请求失败: {e}")
-            # 尝试从本地文件加载
-            cached_data = self._load_from_json()
-            return cached_data if cached_data else []
+            return self._fallback(account, e)
 
         except Exception as e:
             print(f"获取成绩数据时发生未知错误: {e}")
-            # 尝试从本地文件加载
-            cached_data = self._load_from_json()
-            return cached_data if cached_data else []
+            return self._fallback(account, e)
+
+    async def async_fetch_achievements(self, account: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        异步获取成绩数据
+
+        Args:
+            account: 账号，为空表示默认账号
+
+        Returns:
+            成绩数据列表
+        """
+        try:
+            from src.auth.async_session import async_session_manager
+            data = {"kksj": "", "kcxz": "", "kcmc": "", "xsfs": "max"}
+            response = await async_session_manager.request(
+                'POST', self.base_url, account=account, data=data
+            )
+            response.raise_for_status()
 
+            achievements = self._process_html(response.text)
+            result_cache.put('achievement', account, achievements)
+            return achievements
+
+        except Exception as e:
+            print(f"异步获取成绩数据失败: {e}")
+            return self._fallback(account, e)
 
-def achievement() -> List[Dict[str, Any]]:
+
+def achievement(account: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     获取成绩信息的主函数
 
+    Args:
+        account: 账号，为空表示默认账号
+
+    Returns:
+        List[Dict[str, Any]]: 成绩数据列表
+    """
+    parser = AchievementParser()
+    return parser.fetch_achievements(account)
+
+
+async def async_achievement(account: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    异步获取成绩信息的主函数
+
+    Args:
+        account: 账号，为空表示默认账号
+
     Returns:
         List[Dict[str, Any]]: 成绩数据列表
     """
     parser = AchievementParser()
-    return parser.fetch_achievements()
+    return await parser.async_fetch_achievements(account)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成绩表的列式数据
+
+AchievementParser 返回的成绩记录中所有字段都是字符串，每次计算都要重新转换。
+本模块把成绩记录一次转换为带类型的pandas DataFrame：
+    成绩、学分、学时、绩点等数值列为float64（缺失或无法识别为NaN）
+    总成绩为等级制（优秀、良好、合格等）时按 GRADE_TEXT_SCORES 折算为 score 列
+    学期、课程性质、考试性质等重复取值的列为categorical
+    passed 列为是否通过（按分数或等级判断）
+
+在此基础上的绩点、学期统计和通过情况都是向量化的分组计算，多个学生的成绩合并为一个DataFrame
+（account 列区分）后可以一次算出全部学生的结果。to_structured() 把成绩表转换为NumPy结构化数组。
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 数值列：成绩记录字段 -> 说明
+NUMERIC_COLUMNS = {
+    'kczcj': '总成绩',
+    'jncj': '技能成绩',
+    'pscj': '平时成绩',
+    'jmcj': '卷面成绩',
+    'xf': '学分',
+    'zxs': '总学时',
+    'cjjd': '绩点',
+}
+
+# 分类列：取值重复度高的字段
+CATEGORY_COLUMNS = ('xnxqmc', 'kcxz', 'ksxz', 'kcsx', 'khfs', 'cjbz')
+
+# 文本列
+TEXT_COLUMNS = ('序号', 'kcbh', 'kcmc')
+
+# 等级制成绩折算的分数
+GRADE_TEXT_SCORES = {
+    '优秀': 95.0, '优': 95.0,
+    '良好': 85.0, '良': 85.0,
+    '中等': 75.0, '中': 75.0,
+    '及格': 65.0,
+    '不及格': 0.0,
+}
+
+# 没有对应分数的通过/未通过等级
+PASS_TEXTS = ('合格', '通过')
+FAIL_TEXTS = ('不合格', '不通过', '缺考', '旷考', '作弊', '取消')
+
+# 及格分数线
+PASS_SCORE = 60.0
+
+# to_structured() 的字段类型：分类列保存为类别编号（-1表示缺失）
+STRUCTURED_DTYPE = np.dtype([
+    ('kcbh', 'U32'),
+    ('kcmc', 'U64'),
+    ('xnxqmc', 'i2'),
+    ('kcxz', 'i2'),
+    ('ksxz', 'i2'),
+    ('score', 'f4'),
+    ('xf', 'f4'),
+    ('zxs', 'f4'),
+    ('cjjd', 'f4'),
+    ('passed', '?'),
+])
+
+
+def _convert(raw: pd.DataFrame) -> pd.DataFrame:
+    """把字符串字段的成绩表转换为带类型的成绩表"""
+    frame = pd.DataFrame(index=raw.index)
+
+    def column(name: str) -> pd.Series:
+        # 解析时单元格文本已去掉首尾空白
+        if name in raw:
+            return raw[name].fillna('').astype(str)
+        return pd.Series('', index=raw.index, dtype=str)
+
+    for name in TEXT_COLUMNS:
+        frame[name] = column(name)
+    for name in CATEGORY_COLUMNS:
+        categorical = column(name).astype('category')
+        if '' in categorical.cat.categories:
+            categorical = categorical.cat.remove_categories([''])
+        frame[name] = categorical
+    for name in NUMERIC_COLUMNS:
+        frame[name] = pd.to_numeric(column(name), errors='coerce').astype('float64')
+
+    # 总成绩为等级制时折算为分数
+    grade_text = column('kczcj')
+    frame['score'] = frame['kczcj'].fillna(grade_text.map(GRADE_TEXT_SCORES))
+
+    passed = frame['score'] >= PASS_SCORE
+    passed[grade_text.isin(PASS_TEXTS)] = True
+    passed[grade_text.isin(FAIL_TEXTS)] = False
+    frame['passed'] = passed
+
+    if 'account' in raw:
+        frame['account'] = raw['account'].astype('category')
+    return frame
+
+
+def to_frame(records: Iterable[Mapping[str, Any]], account: Optional[str] = None) -> pd.DataFrame:
+    """
+    把成绩记录转换为带类型的DataFrame
+
+    Args:
+        records: AchievementParser 返回的成绩记录（或从 achievement.json 读取的记录）
+        account: 账号，不为空时添加 account 列
+
+    Returns:
+        成绩DataFrame（列说明见模块文档）
+    """
+    raw = pd.DataFrame.from_records(list(records or []))
+    if account is not None:
+        raw['account'] = account
+    return _convert(raw)
+
+
+def combine_frames(records_by_account: Mapping[str, Iterable[Mapping[str, Any]]]) -> pd.DataFrame:
+    """
+    合并多个学生的成绩（全部记录一次转换）
+
+    Args:
+        records_by_account: {账号: 成绩记录}
+
+    Returns:
+        带 account 列的成绩DataFrame
+    """
+    records = []
+    accounts = []
+    for account, account_records in records_by_account.items():
+        account_records = list(account_records or [])
+        records.extend(account_records)
+        accounts.extend([account] * len(account_records))
+
+    raw = pd.DataFrame.from_records(records)
+    raw['account'] = pd.Series(accounts, dtype=str)
+    return _convert(raw)
+
+
+def _group_keys(by: Union[str, Sequence[str], None]) -> List[str]:
+    if by is None:
+        return []
+    return [by] if isinstance(by, str) else list(by)
+
+
+def weighted_gpa(frame: pd.DataFrame, by: Union[str, Sequence[str], None] = None) -> Union[float, pd.Series]:
+    """
+    学分加权平均绩点（只统计学分大于0且有绩点的课程）
+
+    Args:
+        frame: to_frame() / combine_frames() 的结果
+        by: 分组列，如 'account'、'xnxqmc' 或 ['account', 'xnxqmc']，为空时计算整体
+
+    Returns:
+        不分组时为绩点（没有可统计的课程为NaN），分组时为每组的绩点
+    """
+    valid = frame['cjjd'].notna() & (frame['xf'] > 0)
+    credits = frame['xf'].where(valid, 0.0)
+    points = (frame['cjjd'] * frame['xf']).where(valid, 0.0)
+
+    keys = _group_keys(by)
+    if not keys:
+        total = credits.sum()
+        return float(points.sum() / total) if total else float('nan')
+
+    grouped = pd.DataFrame({'points': points, 'credits': credits})
+    grouped[keys] = frame[keys]
+    sums = grouped.groupby(keys, observed=True)[['points', 'credits']].sum()
+    return (sums['points'] / sums['credits'].replace(0.0, np.nan)).rename('gpa')
+
+
+def pass_fail_counts(frame: pd.DataFrame, by: Union[str, Sequence[str], None] = None) -> pd.DataFrame:
+    """
+    通过/未通过的课程数
+
+    Args:
+        frame: 成绩DataFrame
+        by: 分组列，为空时统计整体
+
+    Returns:
+        包含 passed、failed 列的DataFrame（不分组时只有一行）
+    """
+    counts = pd.DataFrame({'passed': frame['passed'].astype(int), 'failed': (~frame['passed']).astype(int)})
+    keys = _group_keys(by)
+    if not keys:
+        return counts.sum().to_frame().T
+
+    counts[keys] = frame[keys]
+    return counts.groupby(keys, observed=True)[['passed', 'failed']].sum()
+
+
+def semester_summary(frame: pd.DataFrame, by: Union[str, Sequence[str], None] = 'xnxqmc') -> pd.DataFrame:
+    """
+    按学期（或其他分组）统计
+
+    Args:
+        frame: 成绩DataFrame
+        by: 分组列，默认按学期；多个学生时可用 ['account', 'xnxqmc']
+
+    Returns:
+        每组的 courses（课程数）、credits（总学分）、earned_credits（已获得学分）、hours（总学时）、
+        mean_score（平均分）、gpa（学分加权绩点）、passed、failed
+    """
+    keys = _group_keys(by)
+    data = pd.DataFrame({
+        'credits': frame['xf'],
+        'earned_credits': frame['xf'].where(frame['passed'], 0.0),
+        'hours': frame['zxs'],
+        'score': frame['score'],
+    })
+    data[keys] = frame[keys]
+
+    grouped = data.groupby(keys, observed=True)
+    summary = grouped.agg(
+        courses=('score', 'size'),
+        credits=('credits', 'sum'),
+        earned_credits=('earned_credits', 'sum'),
+        hours=('hours', 'sum'),
+        mean_score=('score', 'mean'),
+    )
+    summary['gpa'] = weighted_gpa(frame, keys)
+    return summary.join(pass_fail_counts(frame, keys))
+
+
+def to_structured(frame: pd.DataFrame) -> np.ndarray:
+    """
+    转换为NumPy结构化数组（字段见 STRUCTURED_DTYPE）
+
+    学期、课程性质、考试性质保存为类别编号，对应的取值为 frame[列].cat.categories。
+    """
+    array = np.empty(len(frame), dtype=STRUCTURED_DTYPE)
+    for name in STRUCTURED_DTYPE.names:
+        if isinstance(frame[name].dtype, pd.CategoricalDtype):
+            array[name] = frame[name].cat.codes.to_numpy()
+        else:
+            array[name] = frame[name].to_numpy()
+    return array
+
+
+def achievement_frame(account: Optional[str] = None) -> pd.DataFrame:
+    """
+    获取成绩并转换为DataFrame
+
+    Args:
+        account: 账号，为空表示默认账号
+
+    Returns:
+        成绩DataFrame
+    """
+    from src.academic.achievement import achievement
+
+    return to_frame(achievement(account), account)
+
+
+def format_summary(frame: pd.DataFrame) -> str:
+    """格式化成绩统计"""
+    totals = pass_fail_counts(frame).iloc[0]
+    gpa = weighted_gpa(frame)
+
+    output = [f"📊 共 {len(frame)} 门课程，通过 {totals['passed']} 门，未通过 {totals['failed']} 门"]
+    output.append(f"🎓 学分加权平均绩点: {gpa:.2f}" if not np.isnan(gpa) else "🎓 学分加权平均绩点: -")
+
+    if frame['xnxqmc'].notna().any():
+        for semester, row in semester_summary(frame).iterrows():
+            semester_gpa = f"{row['gpa']:.2f}" if pd.notna(row['gpa']) else '-'
+            output.append(
+                f"  {semester}: {int(row['courses'])}门 学分{row['earned_credits']:g}/{row['credits']:g} "
+                f"绩点{semester_gpa} 未通过{int(row['failed'])}门"
+            )
+    return "\n".join(output)
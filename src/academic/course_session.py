@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的课程表记录
+
+课表中一门课在同一时间段通常连续上十几周，原来的解析结果为每一周生成一条相同的记录。
+CourseSession 把这些记录合并为一条，用整数位图保存上课周次（第n周对应第n位），
+需要逐周记录时再调用 expand() 展开，展开结果与原来的逐周记录完全相同。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+# 逐周记录的字段顺序
+RECORD_FIELDS = ('kcmc', 'teaxms', 'jxcdmc', 'xq', 'xqmc', 'zc', 'jcdm', 'jcmc', 'time_slot', 'div_id')
+
+
+def weeks_to_mask(weeks: Iterable[int]) -> int:
+    """周次列表转换为位图"""
+    mask = 0
+    for week in weeks:
+        if week >= 0:
+            mask |= 1 << week
+    return mask
+
+
+def mask_to_weeks(mask: int) -> List[int]:
+    """位图转换为升序的周次列表"""
+    weeks = []
+    week = 0
+    while mask:
+        if mask & 1:
+            weeks.append(week)
+        mask >>= 1
+        week += 1
+    return weeks
+
+
+def format_weeks(mask: int) -> str:
+    """位图转换为周次文本，如 "1-8,10,12-16" """
+    parts = []
+    weeks = mask_to_weeks(mask)
+    start = previous = None
+    for week in weeks + [None]:
+        if start is not None and week == previous + 1:
+            previous = week
+            continue
+        if start is not None:
+            parts.append(str(start) if start == previous else f"{start}-{previous}")
+        start = previous = week
+    return ','.join(parts)
+
+
+def parse_weeks(text: str) -> int:
+    """周次文本（format_weeks的输出）转换为位图"""
+    mask = 0
+    for part in (text or '').split(','):
+        part = part.strip()
+        if '-' in part:
+            start, end = map(int, part.split('-', 1))
+            mask |= ((1 << (end - start + 1)) - 1) << start
+        elif part.isdigit():
+            mask |= 1 << int(part)
+    return mask
+
+
+class CourseSession:
+    """一门课在某个星期、某个节次的全部上课周次"""
+
+    __slots__ = ('kcmc', 'teaxms', 'jxcdmc', 'xq', 'xqmc', 'jcdm', 'jcmc', 'time_slot', 'div_id', 'weeks')
+
+    def __init__(self, kcmc: str, teaxms: str, jxcdmc: str, xq: int, xqmc: str,
+                 jcdm: str, jcmc: str, time_slot: str, div_id: str, weeks: int = 0):
+        self.kcmc = kcmc              # 课程名称
+        self.teaxms = teaxms          # 任课教师
+        self.jxcdmc = jxcdmc          # 教室
+        self.xq = xq                  # 星期几
+        self.xqmc = xqmc              # 星期名称
+        self.jcdm = jcdm              # 节次
+        self.jcmc = jcmc              # 节次名称
+        self.time_slot = time_slot    # 时间段
+        self.div_id = div_id          # 原始div_id
+        self.weeks = weeks            # 上课周次位图
+
+    @property
+    def week_list(self) -> List[int]:
+        """上课周次（升序）"""
+        return mask_to_weeks(self.weeks)
+
+    @property
+    def week_count(self) -> int:
+        """上课周数"""
+        return bin(self.weeks).count('1')
+
+    def has_week(self, week: int) -> bool:
+        """第week周是否上课"""
+        return week >= 0 and bool(self.weeks >> week & 1)
+
+    def _key(self) -> tuple:
+        return (self.kcmc, self.teaxms, self.jxcdmc, self.xq, self.xqmc,
+                self.jcdm, self.jcmc, self.time_slot, self.div_id)
+
+    def record(self, week: int) -> Dict[str, Any]:
+        """第week周的逐周记录"""
+        return {
+            'kcmc': self.kcmc,
+            'teaxms': self.teaxms,
+            'jxcdmc': self.jxcdmc,
+            'xq': self.xq,
+            'xqmc': self.xqmc,
+            'zc': week,
+            'jcdm': self.jcdm,
+            'jcmc': self.jcmc,
+            'time_slot': self.time_slot,
+            'div_id': self.div_id,
+        }
+
+    def expand(self) -> List[Dict[str, Any]]:
+        """展开为逐周记录（按周次升序）"""
+        return [self.record(week) for week in self.week_list]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """紧凑的字典形式（周次保存为 "1-8,10" 形式的文本）"""
+        data = {field: getattr(self, field) for field in self.__slots__ if field != 'weeks'}
+        data['weeks'] = format_weeks(self.weeks)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CourseSession':
+        """从 to_dict() 的结果恢复"""
+        fields = {field: data.get(field, '') for field in cls.__slots__ if field != 'weeks'}
+        fields['xq'] = int(fields['xq'] or 0)
+        return cls(weeks=parse_weeks(data.get('weeks', '')), **fields)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CourseSession):
+            return NotImplemented
+        return self._key() == other._key() and self.weeks == other.weeks
+
+    def __repr__(self) -> str:
+        return f"CourseSession({self.kcmc!r}, {self.xqmc} {self.jcmc}, 第{format_weeks(self.weeks)}周)"
+
+
+def group_records(records: Iterable[Dict[str, Any]]) -> List[CourseSession]:
+    """
+    把逐周记录合并为CourseSession
+
+    只合并相邻、除周次外字段相同且周次递增的记录，保证 expand_sessions() 能还原出相同顺序的记录。
+
+    Args:
+        records: 逐周记录
+
+    Returns:
+        CourseSession列表
+    """
+    sessions: List[CourseSession] = []
+    last_week: Optional[int] = None
+
+    for record in records:
+        week = int(record.get('zc', 0))
+        session = CourseSession(
+            record.get('kcmc', ''), record.get('teaxms', ''), record.get('jxcdmc', ''),
+            int(record.get('xq', 0)), record.get('xqmc', ''), record.get('jcdm', ''),
+            record.get('jcmc', ''), record.get('time_slot', ''), record.get('div_id', '')
+        )
+        if sessions and last_week is not None and week > last_week and sessions[-1]._key() == session._key():
+            sessions[-1].weeks |= 1 << week
+        else:
+            session.weeks = 1 << week
+            sessions.append(session)
+        last_week = week
+
+    return sessions
+
+
+def expand_sessions(sessions: Iterable[CourseSession]) -> List[Dict[str, Any]]:
+    """把CourseSession展开为逐周记录"""
+    records = []
+    for session in sessions:
+        records.extend(session.expand())
+    return records
+
+
+def load_sessions(records: Iterable[Dict[str, Any]]) -> List[CourseSession]:
+    """
+    从字典列表恢复CourseSession（兼容紧凑记录和旧的逐周记录）
+
+    Args:
+        records: to_dict() 的结果列表，或旧版本保存的逐周记录列表
+
+    Returns:
+        CourseSession列表
+    """
+    records = list(records or [])
+    if records and 'zc' in records[0]:
+        return group_records(records)
+    return [CourseSession.from_dict(record) for record in records]
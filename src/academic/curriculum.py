@@ -9,7 +9,8 @@
 import re
 import json
 import sys
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
 from bs4 import BeautifulSoup
 
@@ -17,7 +18,243 @@ from bs4 import BeautifulSoup
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.auth.session_manager import get_session, ensure_logged_in
+from src.utils.env_loader import env_loader
+from src.auth.session_manager import session_manager
+from src.academic.result_cache import result_cache, serve_stale, mark_stale
+from src.academic.html_backend import parse_html
+from src.academic.parse_cache import parse_cache, content_hash
+from src.academic.course_session import CourseSession, weeks_to_mask, group_records, expand_sessions, load_sessions
+
+# 解析器版本：解析逻辑或结果格式变化时递增，使已缓存的解析结果失效（见 src.academic.parse_cache）
+PARSER_VERSION = 1
+
+# 节次表：(节次标识, 时间段, 节次名称)，按顺序匹配节次信息
+PERIOD_TABLE = (
+    ('01-02', '12', '第1-2节'),
+    ('03-04', '34', '第3-4节'),
+    ('05-06', '56', '第5-6节'),
+    ('07-08', '78', '第7-8节'),
+    ('09-10', '910', '第9-10节'),
+    ('11-12', '1112', '第11-12节'),
+)
+
+# 课程div中各字段所在font标签的title
+COURSE_FONT_TITLES = ('老师', '周次(节次)', '教室')
+
+# 文本解析使用的正则（预编译）
+TIME_INFO_PATTERN = re.compile(r'(\d+(?:[-,]\d+)*)\(周\)\[([^\]]+)\]')
+PERIOD_PATTERN = re.compile(r'\[(.*?)\]')
+TEXT_BEFORE_BR_PATTERN = re.compile(r'>([^<]+)<br')
+TEACHER_TITLES = r'(?:讲师|教授|护师|副教授|实验师)(?:\（[^）]*\）)?'
+TEACHER_TITLE_PATTERN = re.compile(TEACHER_TITLES)
+TEACHER_TITLE_SUFFIX_PATTERN = re.compile(rf'{TEACHER_TITLES}.*$')
+FONT_TEACHER_PATTERN = re.compile(r'<font title=[\'"]老师[\'"]>(.*?)</font>')
+FONT_CLASSROOM_PATTERN = re.compile(r'<font title=[\'"]教室[\'"]>(.*?)</font>')
+
+# 教师名称模式（包含职称的优先）
+TEACHER_PATTERNS = (
+    re.compile(r'^([^0-9\[\(]*?(?:讲师|教授|护师|副教授)(?:\（[^）]*\）)?)'),  # 包含职称
+    re.compile(r'^([^0-9\[\(]{2,8}?)(?=\d|\s|$)'),  # 简单姓名
+)
+TEACHER_CLEANUP_PATTERNS = (
+    re.compile(r'[,，].*$'),  # 移除逗号后的内容
+    re.compile(r'\]'),        # 移除残留的]符号
+)
+
+# 教室名称模式
+CLASSROOM_PATTERNS = (
+    re.compile(r'(护理楼\d+)'),                    # 护理楼+数字
+    re.compile(r'(实验楼\d+)'),                    # 实验楼+数字
+    re.compile(r'(临床技能中心\d+)'),              # 临床技能中心+数字
+    re.compile(r'(长沙医学院第一附属医院)'),        # 附属医院
+    re.compile(r'(第一附属医院[^0-9\[\(]*)'),      # 附属医院相关
+    re.compile(r'([^0-9\[\(]*(?:楼|室|院|中心)\d*)'), # 通用地点模式
+)
+
+# 课程名称提取的各级策略
+COURSE_TEACHER_PATTERN = re.compile(rf'([^0-9]*?)([A-Za-z\u4e00-\u9fff]{{2,4}}{TEACHER_TITLES})')
+COURSE_NAME_PATTERNS = (
+    re.compile(r'^(.*?)([A-Za-z\u4e00-\u9fff]{2,4})(?=\d+(?:[-,]\d+)*\(周\))'),  # 姓名+周次模式
+    re.compile(r'^(.*?)([A-Za-z\u4e00-\u9fff]{2,4})(?=\d)'),                     # 姓名+数字模式
+)
+COURSE_ENDING_PATTERNS = (
+    re.compile(r'(.*?护理学(?:\[实践\])?)'),     # 护理学类
+    re.compile(r'(.*?(?:学|教育|指导|规划|原理|概论|政策|管理学|生物学|实验学)(?:\[实践\])?)'),  # 通用学科结尾
+    re.compile(r'(.*?(?:\（[^）]*\）)(?:\[实践\])?)'),  # 带括号的课程名称
+)
+LEADING_DIGIT_PATTERN = re.compile(r'^\d')
+CHINESE_PREFIX_PATTERN = re.compile(r'^([\u4e00-\u9fff（）\[\]]+)')
+NON_DIGIT_PREFIX_PATTERN = re.compile(r'^([^0-9]+)')
+
+# 文本解析结果的缓存容量（同一教师、教室、周次文本在各div、各学期、各学生之间大量重复）
+PARSE_CACHE_SIZE = env_loader.get_int('CURRICULUM_PARSE_CACHE_SIZE', 4096)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_time_info(time_info: str) -> Tuple[Tuple[int, ...], str]:
+    """
+    解析时间信息（带缓存）
+
+    Args:
+        time_info: 时间信息字符串，如 "1-15(周)[01-02节]"
+
+    Returns:
+        (升序的周次元组, 节次信息)
+    """
+    weeks = set()
+    periods = ''
+
+    try:
+        # 分离周次和节次信息
+        if '(周)' in time_info:
+            parts = time_info.split('(周)')
+            week_part = parts[0]
+
+            # 解析节次信息（在方括号中）
+            if len(parts) > 1 and '[' in parts[1] and ']' in parts[1]:
+                period_match = PERIOD_PATTERN.search(parts[1])
+                if period_match:
+                    periods = period_match.group(1)
+
+            # 解析周次
+            for week_range in week_part.split(','):
+                week_range = week_range.strip()
+                if '-' in week_range:
+                    # 连续周次，如 "1-16"
+                    try:
+                        start, end = map(int, week_range.split('-'))
+                        weeks.update(range(start, end + 1))
+                    except ValueError:
+                        print(f"⚠️ 无法解析周次范围: {week_range}")
+                elif week_range.isdigit():
+                    # 单个周次
+                    weeks.add(int(week_range))
+
+    except Exception as e:
+        print(f"⚠️ 解析时间信息失败: {e}")
+        return (1,), ''  # 默认第1周
+
+    return tuple(sorted(weeks)), periods
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def extract_course_name(text: str) -> str:
+    """
+    从课程名称和教师的混合文本中提取课程名称（带缓存），依次尝试五种策略
+
+    Args:
+        text: 包含课程名称和教师的混合文本
+
+    Returns:
+        提取出的课程名称
+    """
+    text = text.strip()
+    if not text:
+        return ''
+
+    # 策略1: 基于教师职称分割
+    teacher_match = COURSE_TEACHER_PATTERN.search(text)
+    if teacher_match:
+        potential_name = teacher_match.group(1).strip()
+        if len(potential_name) >= 2 and not TEACHER_TITLE_PATTERN.search(potential_name):
+            return potential_name
+
+    # 策略2: 基于常见的中文姓名模式分割（在数字或周次前的2-4个字符）
+    for pattern in COURSE_NAME_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            potential_name = match.group(1).strip()
+            teacher_name = match.group(2).strip()
+
+            # 验证提取的课程名称合理性
+            if (len(potential_name) >= 2 and
+                len(teacher_name) >= 2 and
+                not LEADING_DIGIT_PATTERN.search(potential_name) and  # 不以数字开头
+                not TEACHER_TITLE_PATTERN.search(potential_name)):  # 不包含职称
+                return potential_name
+
+    # 策略3: 基于课程名称的语义特征（以常见课程结尾词结束的部分）
+    for pattern in COURSE_ENDING_PATTERNS:
+        match = pattern.match(text)
+        if match:
+            potential_name = match.group(1).strip()
+            # 验证不包含明显的教师信息
+            if len(potential_name) >= 2 and not TEACHER_TITLE_PATTERN.search(potential_name):
+                return potential_name
+
+    # 策略4: 基于中文字符连续性（开头的连续中文字符、括号、方括号）
+    chinese_match = CHINESE_PREFIX_PATTERN.match(text)
+    if chinese_match:
+        potential_name = chinese_match.group(1).strip()
+        if len(potential_name) >= 2:
+            return potential_name
+
+    # 策略5: 最后的备选方案，提取前面的非数字部分并移除可能的教师名称后缀
+    fallback_match = NON_DIGIT_PREFIX_PATTERN.match(text)
+    if fallback_match:
+        potential_name = TEACHER_TITLE_SUFFIX_PATTERN.sub('', fallback_match.group(1).strip()).strip()
+        if len(potential_name) >= 2:
+            return potential_name
+
+    return text  # 如果所有策略都失败，返回原文本
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def match_teacher(text: str) -> str:
+    """按教师名称模式匹配课程名称之后的文本（带缓存），没有匹配返回空字符串"""
+    for pattern in TEACHER_PATTERNS:
+        teacher_match = pattern.search(text)
+        if teacher_match:
+            teacher = teacher_match.group(1).strip()
+            for cleanup in TEACHER_CLEANUP_PATTERNS:
+                teacher = cleanup.sub('', teacher)
+            return teacher
+    return ''
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def match_classroom(text: str) -> str:
+    """按教室名称模式匹配时间信息之后的文本（带缓存），没有匹配返回空字符串"""
+    for pattern in CLASSROOM_PATTERNS:
+        classroom_match = pattern.search(text)
+        if classroom_match:
+            return classroom_match.group(1).strip()
+    return ''
+
+
+# 带缓存的文本解析函数
+_MEMOIZED = {
+    'time_info': parse_time_info,
+    'course_name': extract_course_name,
+    'teacher': match_teacher,
+    'classroom': match_classroom,
+}
+
+
+def get_parse_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    文本解析缓存的命中统计
+
+    Returns:
+        {函数: {'hits': 命中次数, 'misses': 未命中次数, 'hit_rate': 命中率, 'size': 缓存条数}}
+    """
+    stats = {}
+    for name, func in _MEMOIZED.items():
+        info = func.cache_info()
+        total = info.hits + info.misses
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / total if total else 0.0,
+            "size": info.currsize,
+        }
+    return stats
+
+
+def clear_parse_caches() -> None:
+    """清空文本解析缓存和命中统计"""
+    for func in _MEMOIZED.values():
+        func.cache_clear()
 
 
 class CurriculumParser:
@@ -48,60 +285,130 @@ class CurriculumParser:
             7: '星期日'
         }
 
-    def fetch_curriculum(self, zc: str = "", xnxq01id: str = "") -> List[Dict[str, Any]]:
+        # 节次信息 -> (时间段, 节次名称) 的查表缓存
+        self._period_cache: Dict[str, tuple] = {}
+
+    def fetch_curriculum(self, zc: str = "", xnxq01id: str = "", account: Optional[str] = None,
+                         compact: bool = False) -> Union[List[Dict[str, Any]], List[CourseSession]]:
         """
         获取课程表数据
 
         Args:
             zc: 周次，为空表示所有周次
             xnxq01id: 学年学期ID（如2025-2026-1），为空表示当前学期
+            account: 账号，为空表示默认账号
+            compact: 是否返回紧凑的CourseSession列表（每门课每个时间段一条，周次为位图）
 
         Returns:
-            课程表数据列表
+            课程表数据列表（默认每个周次一条记录）
         """
         try:
-            # 确保已登录
-            if not ensure_logged_in():
-                print("❌ 登录失败，无法获取课程表数据")
-                return []
-
-            # 使用全局session发送请求
-            session = get_session()
             print("🔍 正在获取课程表数据...")
             print(f"📋 参数: 周次={zc or '所有周次'}, 学期={xnxq01id or '当前学期'}")
 
-            # 准备POST参数（固定其他参数）
-            post_data = {
-                'cj0701id': '',      # 固定为空，表示当前用户班级
-                'zc': zc,            # 周次参数
-                'demo': '',          # 固定为空，非演示模式
-                'xnxq01id': xnxq01id, # 学期参数
-                'sfFD': '1'          # 固定为1，表示放大方法
-            }
-
-            # 发送POST请求获取课程表页面
-            response = session.post(self.base_url, data=post_data, timeout=30)
+            # 直接请求课程表页面，会话失效时session管理器会重新登录并重放请求
+            response = session_manager.request(
+                'POST', self.base_url, account=account,
+                data=self._build_post_data(zc, xnxq01id)
+            )
+            response.raise_for_status()
+
+            sessions = self._process_html(response.text)
+            result_cache.put(self._cache_name(zc, xnxq01id), account, [session.to_dict() for session in sessions])
+            return self._output(sessions, compact)
+
+        except Exception as e:
+            print(f"❌ 获取课程表失败: {e}")
+            return self._serve_stale(zc, xnxq01id, account, e, compact)
+
+    async def async_fetch_curriculum(self, zc: str = "", xnxq01id: str = "", account: Optional[str] = None,
+                                     compact: bool = False) -> Union[List[Dict[str, Any]], List[CourseSession]]:
+        """
+        异步获取课程表数据
+
+        Args:
+            zc: 周次，为空表示所有周次
+            xnxq01id: 学年学期ID（如2025-2026-1），为空表示当前学期
+            account: 账号，为空表示默认账号
+            compact: 是否返回紧凑的CourseSession列表
+
+        Returns:
+            课程表数据列表（默认每个周次一条记录）
+        """
+        try:
+            from src.auth.async_session import async_session_manager
+            response = await async_session_manager.request(
+                'POST', self.base_url, account=account,
+                data=self._build_post_data(zc, xnxq01id)
+            )
             response.raise_for_status()
 
+            sessions = self._process_html(response.text)
+            result_cache.put(self._cache_name(zc, xnxq01id), account, [session.to_dict() for session in sessions])
+            return self._output(sessions, compact)
+
+        except Exception as e:
+            print(f"❌ 异步获取课程表失败: {e}")
+            return self._serve_stale(zc, xnxq01id, account, e, compact)
+
+    def _output(self, sessions: List[CourseSession], compact: bool):
+        """按调用方需要返回紧凑记录或逐周记录"""
+        return sessions if compact else expand_sessions(sessions)
+
+    def _serve_stale(self, zc: str, xnxq01id: str, account: Optional[str], error: BaseException, compact: bool):
+        """教务系统不可用时返回缓存的课程表（标记为过期数据）"""
+        cached = serve_stale(self._cache_name(zc, xnxq01id), account, error)
+        if cached is None:
+            return []
+        return mark_stale(self._output(load_sessions(cached), compact), cached.cached_at)
+
+    def _cache_name(self, zc: str, xnxq01id: str) -> str:
+        """课程表结果缓存的名称（按学期和周次区分）"""
+        return f"curriculum:{xnxq01id or 'current'}:{zc or 'all'}"
+
+    def _build_post_data(self, zc: str, xnxq01id: str) -> Dict[str, str]:
+        """构造课程表查询的POST参数（固定其他参数）"""
+        return {
+            'cj0701id': '',      # 固定为空，表示当前用户班级
+            'zc': zc,            # 周次参数
+            'demo': '',          # 固定为空，非演示模式
+            'xnxq01id': xnxq01id, # 学期参数
+            'sfFD': '1'          # 固定为1，表示放大方法
+        }
+
+    def _process_html(self, html_content: str) -> List[CourseSession]:
+        """
+        解析课程表并以紧凑形式写入JSON文件
+
+        页面与之前解析过的页面逐字节相同时直接使用缓存的解析结果，
+        JSON文件已经是该页面的结果时不再重写。
+        """
+        body_hash = content_hash(html_content)
+        cached = parse_cache.get('curriculum', PARSER_VERSION, body_hash)
+
+        if cached is not None:
+            sessions = load_sessions(cached)
+            print(f"✅ 课程表页面未变化，使用已解析的结果（{len(sessions)} 个课程时段）")
+        else:
             # 保存HTML源码到同目录
             html_file = Path(__file__).parent / "curriculum_source.html"
             with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+                f.write(html_content)
             print(f"✅ HTML源码已保存到: {html_file}")
 
-            # 解析HTML获取课程表
-            curriculum_data = self._parse_html_table(response.text)
+            # 解析HTML获取课程表（没有解析出课程的页面可能是错误页，不缓存）
+            sessions = self._parse_sessions(html_content)
+            if sessions:
+                parse_cache.put('curriculum', PARSER_VERSION, body_hash, [session.to_dict() for session in sessions])
 
-            # 保存到JSON文件
-            if curriculum_data:
-                self._save_to_json(curriculum_data)
+        # 保存到JSON文件
+        json_path = self._json_path()
+        if sessions and not parse_cache.output_current(json_path, body_hash):
+            if self._save_to_json([session.to_dict() for session in sessions]):
+                parse_cache.mark_output(json_path, body_hash)
                 print(f"✅ 课程表数据已保存到: {self.json_file}")
 
-            return curriculum_data
-
-        except Exception as e:
-            print(f"❌ 获取课程表失败: {e}")
-            return []
+        return sessions
 
     def _parse_html_table(self, html_content: str) -> List[Dict[str, Any]]:
         """
@@ -111,10 +418,22 @@ class CurriculumParser:
             html_content: HTML内容
 
         Returns:
-            解析后的课程表数据列表
+            解析后的课程表数据列表（每个周次一条记录）
+        """
+        return expand_sessions(self._parse_sessions(html_content))
+
+    def _parse_sessions(self, html_content: str) -> List[CourseSession]:
+        """
+        解析HTML课程表为紧凑记录
+
+        Args:
+            html_content: HTML内容
+
+        Returns:
+            CourseSession列表
         """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = parse_html(html_content)
 
             # 查找课程表表格
             table = soup.find('table', {'id': 'kbtable'})
@@ -127,7 +446,7 @@ class CurriculumParser:
 
             print("✅ 找到课程表表格，开始解析...")
 
-            curriculum_data = []
+            sessions = []
 
             # 获取所有详细课程内容div（包含老师信息的隐藏div）
             course_divs = soup.find_all('div', class_='kbcontent')
@@ -141,31 +460,86 @@ class CurriculumParser:
                     if not div_id:
                         continue
 
-                    print(f"📋 解析div: {div_id}")
-
-                    # 解析课程信息
-                    course_info = self._parse_course_div(div, div_id)
-                    if course_info:
-                        curriculum_data.extend(course_info)
-                        print(f"✅ 解析出 {len(course_info)} 条课程记录")
+                    # 解析课程信息（直接在已解析的文档树上提取，不再重新序列化和解析div）
+                    sessions.extend(self._parse_course_div_fast(div, div_id))
 
                 except Exception as e:
                     print(f"⚠️ 解析课程div时出错: {e}")
                     continue
 
-            print(f"✅ 成功解析 {len(curriculum_data)} 条课程记录")
-            return curriculum_data
+            week_count = sum(session.week_count for session in sessions)
+            print(f"✅ 成功解析 {len(sessions)} 个课程时段（共 {week_count} 条逐周课程记录）")
+            return sessions
 
         except Exception as e:
             print(f"❌ 解析HTML课程表失败: {e}")
             return []
 
+    def _parse_course_div_fast(self, div, div_id: str) -> List[CourseSession]:
+        """
+        在已解析的文档树上解析课程div
+
+        直接从文档树中取出课程名称（第一个紧跟<br>的文本）以及老师、周次(节次)、教室，
+        结果与 _parse_course_div 基于标签的解析相同（多课程div同样只取第一门课程）；
+        缺少课程名称或周次时交给 _parse_course_div 的文本解析兜底。
+
+        Args:
+            div: div元素（src.academic.html_backend.HtmlNode）
+            div_id: div的id属性
+
+        Returns:
+            CourseSession列表
+        """
+        id_parts = div_id.split('-')
+        if len(id_parts) < 3:
+            print(f"⚠️ div_id格式不正确: {div_id}")
+            return []
+
+        weekday = int(id_parts[1]) if id_parts[1].isdigit() else 0
+        if weekday < 1 or weekday > 7:
+            print(f"⚠️ 星期数不正确: {weekday}")
+            return []
+
+        course_name, fields = self._scan_course_div(div)
+        if course_name is None and not fields and not div.get_text(strip=True):
+            # 空时间槽
+            return []
+
+        time_info = fields.get('周次(节次)', '')
+        if not course_name or not time_info:
+            return group_records(self._parse_course_div(div, div_id))
+
+        weeks, period_info = self._parse_time_info(time_info, verbose=False)
+        if not weeks:
+            return []
+        time_slot, time_name = self._lookup_period(period_info)
+        return [CourseSession(
+            course_name, fields.get('老师', ''), fields.get('教室', ''),
+            weekday, self.weekdays.get(weekday, f'星期{weekday}'),
+            period_info, time_name, time_slot, div_id, weeks_to_mask(weeks)
+        )]
+
+    def _scan_course_div(self, div) -> tuple:
+        """
+        取出div中的课程名称和各字段font标签的文本
+
+        Returns:
+            (课程名称, {font的title: 文本})，没有紧跟<br>的文本时课程名称为None
+        """
+        course_name = div.first_text_before('br')
+        fields = {}
+        for font in div.find_all('font', title=True):
+            title = font.get('title')
+            if title in COURSE_FONT_TITLES and title not in fields:
+                fields[title] = font.get_text(strip=True)
+        return course_name, fields
+
     def _parse_course_div(self, div, div_id: str) -> List[Dict[str, Any]]:
         """
         解析单个课程div
 
         Args:
-            div: BeautifulSoup div元素
+            div: div元素
             div_id: div的id属性
 
         Returns:
@@ -254,8 +628,7 @@ class CurriculumParser:
             # 方法2: 如果方法1失败，直接从HTML中提取
             if not course_name:
                 # 使用正则表达式直接从HTML中提取第一个<br>之前的内容
-                import re
-                match = re.search(r'>([^<]+)<br', div_html)
+                match = TEXT_BEFORE_BR_PATTERN.search(div_html)
                 if match:
                     course_name = match.group(1).strip()
                     print(f"🔍 正则提取课程名称: '{course_name}'")
@@ -343,7 +716,7 @@ class CurriculumParser:
 
                     # 🎯 改进的解析逻辑
                     # 1. 提取时间信息（包含周次和节次）
-                    time_match = re.search(r'(\d+(?:[-,]\d+)*)\(周\)\[([^\]]+)\]', full_text)
+                    time_match = TIME_INFO_PATTERN.search(full_text)
                     if time_match:
                         week_part = time_match.group(1)
                         period_part = time_match.group(2)
@@ -375,53 +748,28 @@ class CurriculumParser:
                         # 从完整文本中移除课程名称和时间信息，剩下的就是教师和教室
                         remaining_text = text_before_time.replace(course_name, '', 1).strip()
 
-                        # 教师名称模式（包含职称的优先）
-                        teacher_patterns = [
-                            r'^([^0-9\[\(]*?(?:讲师|教授|护师|副教授)(?:\（[^）]*\）)?)',  # 包含职称
-                            r'^([^0-9\[\(]{2,8}?)(?=\d|\s|$)',  # 简单姓名
-                        ]
-
-                        for pattern in teacher_patterns:
-                            teacher_match = re.search(pattern, remaining_text)
-                            if teacher_match:
-                                teacher = teacher_match.group(1).strip()
-                                # 清理教师名称
-                                teacher = re.sub(r'[,，].*$', '', teacher)  # 移除逗号后的内容
-                                teacher = re.sub(r'\]', '', teacher)  # 移除残留的]符号
-                                break
+                        # 按教师名称模式（TEACHER_PATTERNS，包含职称的优先）匹配
+                        teacher = match_teacher(remaining_text)
 
                     # 4. 提取教室信息（在时间信息之后）
                     classroom = ''
                     if time_info:
                         text_after_time = full_text.split(time_info)[-1].strip()
 
-                        # 教室名称模式
-                        classroom_patterns = [
-                            r'(护理楼\d+)',                    # 护理楼+数字
-                            r'(实验楼\d+)',                    # 实验楼+数字
-                            r'(临床技能中心\d+)',              # 临床技能中心+数字
-                            r'(长沙医学院第一附属医院)',        # 附属医院
-                            r'(第一附属医院[^0-9\[\(]*)',      # 附属医院相关
-                            r'([^0-9\[\(]*(?:楼|室|院|中心)\d*)', # 通用地点模式
-                        ]
-
-                        for pattern in classroom_patterns:
-                            classroom_match = re.search(pattern, text_after_time)
-                            if classroom_match:
-                                classroom = classroom_match.group(1).strip()
-                                break
+                        # 按教室名称模式（CLASSROOM_PATTERNS）匹配
+                        classroom = match_classroom(text_after_time)
 
                     print(f"📝 优化解析结果 - 课程: {course_name}, 教师: {teacher}, 教室: {classroom}, 时间: {time_info}")
 
                     # 如果没有找到教师，尝试从原始HTML中提取
                     if not teacher:
-                        teacher_match = re.search(r'<font title=[\'"]老师[\'"]>(.*?)</font>', div_html)
+                        teacher_match = FONT_TEACHER_PATTERN.search(div_html)
                         if teacher_match:
                             teacher = teacher_match.group(1)
 
                     # 如果没有找到教室，尝试从原始HTML中提取
                     if not classroom:
-                        classroom_match = re.search(r'<font title=[\'"]教室[\'"]>(.*?)</font>', div_html)
+                        classroom_match = FONT_CLASSROOM_PATTERN.search(div_html)
                         if classroom_match:
                             classroom = classroom_match.group(1)
 
@@ -544,7 +892,7 @@ class CurriculumParser:
 
     def _extract_course_name_smart(self, text: str) -> str:
         """
-        智能提取课程名称的通用方法
+        智能提取课程名称的通用方法（见 extract_course_name，结果按文本缓存）
 
         Args:
             text: 包含课程名称和教师的混合文本
@@ -552,194 +900,106 @@ class CurriculumParser:
         Returns:
             提取出的课程名称
         """
-        text = text.strip()
-        if not text:
-            return ''
-
-        # 策略1: 基于教师职称分割
-        # 查找明确的教师职称标识
-        teacher_titles = r'(?:讲师|教授|护师|副教授|实验师)(?:\（[^）]*\）)?'
-        teacher_match = re.search(rf'([^0-9]*?)([A-Za-z\u4e00-\u9fff]{{2,4}}{teacher_titles})', text)
-        if teacher_match:
-            potential_name = teacher_match.group(1).strip()
-            if len(potential_name) >= 2 and not re.search(teacher_titles, potential_name):
-                return potential_name
+        return extract_course_name(text)
 
-        # 策略2: 基于常见的中文姓名模式分割
-        # 查找2-4个中文字符的姓名（在数字或周次前）
-        name_patterns = [
-            r'^(.*?)([A-Za-z\u4e00-\u9fff]{2,4})(?=\d+(?:[-,]\d+)*\(周\))',  # 姓名+周次模式
-            r'^(.*?)([A-Za-z\u4e00-\u9fff]{2,4})(?=\d)',                     # 姓名+数字模式
-        ]
-
-        for pattern in name_patterns:
-            match = re.search(pattern, text)
-            if match:
-                potential_name = match.group(1).strip()
-                teacher_name = match.group(2).strip()
-
-                # 验证提取的课程名称合理性
-                if (len(potential_name) >= 2 and
-                    len(teacher_name) >= 2 and
-                    not re.search(r'^\d', potential_name) and  # 不以数字开头
-                    not re.search(teacher_titles, potential_name)):  # 不包含职称
-                    return potential_name
-
-        # 策略3: 基于课程名称的语义特征
-        # 查找以常见课程结尾词结束的部分
-        course_endings = [
-            r'(.*?护理学(?:\[实践\])?)',     # 护理学类
-            r'(.*?(?:学|教育|指导|规划|原理|概论|政策|管理学|生物学|实验学)(?:\[实践\])?)',  # 通用学科结尾
-            r'(.*?(?:\（[^）]*\）)(?:\[实践\])?)',  # 带括号的课程名称
-        ]
-
-        for pattern in course_endings:
-            match = re.match(pattern, text)
-            if match:
-                potential_name = match.group(1).strip()
-                # 验证不包含明显的教师信息
-                if (len(potential_name) >= 2 and
-                    not re.search(teacher_titles, potential_name)):
-                    return potential_name
-
-        # 策略4: 基于中文字符连续性
-        # 提取开头的连续中文字符、括号、方括号
-        chinese_match = re.match(r'^([\u4e00-\u9fff（）\[\]]+)', text)
-        if chinese_match:
-            potential_name = chinese_match.group(1).strip()
-            if len(potential_name) >= 2:
-                return potential_name
-
-        # 策略5: 最后的备选方案
-        # 如果以上都失败，尝试提取前面的非数字部分
-        fallback_match = re.match(r'^([^0-9]+)', text)
-        if fallback_match:
-            potential_name = fallback_match.group(1).strip()
-            # 移除可能的教师名称后缀
-            potential_name = re.sub(rf'{teacher_titles}.*$', '', potential_name).strip()
-            if len(potential_name) >= 2:
-                return potential_name
+    def _lookup_period(self, period_info: str) -> tuple:
+        """
+        查节次表获取 (时间段, 节次名称)
 
-        return text  # 如果所有策略都失败，返回原文本
+        按 PERIOD_TABLE 的顺序匹配，结果按节次信息缓存，重复出现的节次直接查表。
+        """
+        cached = self._period_cache.get(period_info)
+        if cached is None:
+            cached = next(
+                ((slot, name) for key, slot, name in PERIOD_TABLE if key in period_info),
+                ('12', period_info or '未知时间')  # 默认时间段
+            )
+            self._period_cache[period_info] = cached
+        return cached
 
     def _determine_time_slot(self, div_id: str, period_info: str) -> str:
         """根据div_id和节次信息确定时间段"""
-        # 从课程表的行位置推断时间段
-        # 这需要根据实际的表格结构来调整
-        if '01-02' in period_info:
-            return '12'
-        elif '03-04' in period_info:
-            return '34'
-        elif '05-06' in period_info:
-            return '56'
-        elif '07-08' in period_info:
-            return '78'
-        elif '09-10' in period_info:
-            return '910'
-        elif '11-12' in period_info:
-            return '1112'
-        else:
-            return '12'  # 默认
+        return self._lookup_period(period_info)[0]
 
     def _get_time_name(self, period_info: str) -> str:
         """根据节次信息获取时间名称"""
-        if '01-02' in period_info:
-            return '第1-2节'
-        elif '03-04' in period_info:
-            return '第3-4节'
-        elif '05-06' in period_info:
-            return '第5-6节'
-        elif '07-08' in period_info:
-            return '第7-8节'
-        elif '09-10' in period_info:
-            return '第9-10节'
-        elif '11-12' in period_info:
-            return '第11-12节'
-        else:
-            return period_info or '未知时间'
+        return self._lookup_period(period_info)[1]
 
-    def _parse_time_info(self, time_info: str) -> tuple:
+    def _parse_time_info(self, time_info: str, verbose: bool = True) -> tuple:
         """
-        解析时间信息（周次和节次）
+        解析时间信息（周次和节次），结果按时间信息文本缓存
 
         Args:
             time_info: 时间信息字符串，如 "1-15(周)[01-02节]"
+            verbose: 是否输出解析过程
 
         Returns:
             (周次列表, 节次信息)
         """
-        weeks = []
-        periods = ''
-
-        try:
+        if verbose:
             print(f"🔍 解析时间信息: {time_info}")
 
-            # 分离周次和节次信息
-            if '(周)' in time_info:
-                parts = time_info.split('(周)')
-                week_part = parts[0]
-
-                # 解析节次信息（在方括号中）
-                if len(parts) > 1 and '[' in parts[1] and ']' in parts[1]:
-                    period_match = re.search(r'\[(.*?)\]', parts[1])
-                    if period_match:
-                        periods = period_match.group(1)
-
-                # 解析周次
-                week_ranges = week_part.split(',')
-                for week_range in week_ranges:
-                    week_range = week_range.strip()
-                    if '-' in week_range:
-                        # 连续周次，如 "1-16"
-                        try:
-                            start, end = map(int, week_range.split('-'))
-                            weeks.extend(list(range(start, end + 1)))
-                        except ValueError:
-                            print(f"⚠️ 无法解析周次范围: {week_range}")
-                    elif week_range.isdigit():
-                        # 单个周次
-                        weeks.append(int(week_range))
-
-                # 去重并排序
-                weeks = sorted(list(set(weeks)))
-
-            print(f"✅ 解析结果 - 周次: {weeks}, 节次: {periods}")
+        weeks, periods = parse_time_info(time_info)
 
-        except Exception as e:
-            print(f"⚠️ 解析时间信息失败: {e}")
-            weeks = [1]  # 默认第1周
-            periods = ''
+        if verbose:
+            print(f"✅ 解析结果 - 周次: {list(weeks)}, 节次: {periods}")
+
+        return list(weeks), periods
 
-        return weeks, periods
+    def _json_path(self) -> Path:
+        """JSON输出文件路径"""
+        return Path(__file__).parent.parent.parent / "data" / self.json_file
 
-    def _save_to_json(self, data: List[Dict[str, Any]]) -> None:
-        """保存数据到JSON文件"""
+    def _save_to_json(self, data: List[Dict[str, Any]]) -> bool:
+        """保存数据到JSON文件，返回是否保存成功"""
         try:
             # 确保data目录存在
-            data_dir = Path(__file__).parent.parent.parent / "data"
-            data_dir.mkdir(exist_ok=True)
+            json_path = self._json_path()
+            json_path.parent.mkdir(exist_ok=True)
 
-            json_path = data_dir / self.json_file
             with open(json_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            return True
 
         except Exception as e:
             print(f"❌ 保存JSON文件失败: {e}")
+            return False
 
 
-def curriculum(zc: str = "", xnxq01id: str = "") -> List[Dict[str, Any]]:
+def curriculum(zc: str = "", xnxq01id: str = "", account: Optional[str] = None,
+               compact: bool = False) -> Union[List[Dict[str, Any]], List[CourseSession]]:
     """
     获取课程表信息的主函数
 
     Args:
         zc: 周次，为空表示所有周次
         xnxq01id: 学年学期ID（如2025-2026-1），为空表示当前学期
+        account: 账号，为空表示默认账号
+        compact: 是否返回紧凑的CourseSession列表
+
+    Returns:
+        List[Dict[str, Any]]: 课程表数据列表（compact为True时为CourseSession列表）
+    """
+    parser = CurriculumParser()
+    return parser.fetch_curriculum(zc, xnxq01id, account, compact)
+
+
+async def async_curriculum(zc: str = "", xnxq01id: str = "", account: Optional[str] = None,
+                           compact: bool = False) -> Union[List[Dict[str, Any]], List[CourseSession]]:
+    """
+    异步获取课程表信息的主函数
+
+    Args:
+        zc: 周次，为空表示所有周次
+        xnxq01id: 学年学期ID（如2025-2026-1），为空表示当前学期
+        account: 账号，为空表示默认账号
+        compact: 是否返回紧凑的CourseSession列表
 
     Returns:
-        List[Dict[str, Any]]: 课程表数据列表
+        List[Dict[str, Any]]: 课程表数据列表（compact为True时为CourseSession列表）
     """
     parser = CurriculumParser()
-    return parser.fetch_curriculum(zc, xnxq01id)
+    return await parser.async_fetch_curriculum(zc, xnxq01id, account, compact)
 
 
 if __name__ == "__main__":
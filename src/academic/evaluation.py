@@ -7,64 +7,114 @@
 """
 
 import requests
-from bs4 import BeautifulSoup
 from typing import List, Dict, Any, Optional
 
-def get_evaluation_list(session: requests.Session = None) -> Optional[List[Dict[str, Any]]]:
+def get_evaluation_list(session: requests.Session = None, account: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
     """
     获取可评价的课程列表
 
     Args:
         session: 已登录的session对象，如果为None则使用session_manager
+        account: 使用session_manager时的账号，为空表示默认账号
 
     Returns:
         可评价课程列表
     """
+    from src.academic.result_cache import result_cache, serve_stale, serve_stale_response
+
+    # 传入了session但没有指定账号时无法确定结果属于哪个账号，不读写结果缓存
+    use_cache = session is None or account is not None
+
     try:
-        # 如果没有提供session，使用session_manager
-        if session is None:
-            from src.auth.session_manager import session_manager
-            if not session_manager.ensure_logged_in():
-                print("❌ 无法获取有效的登录session")
-                return None
-            session = session_manager.session
         url = 'http://oa.csmu.edu.cn:8099/jsxsd/xspj/xspj_find.do'
-        response = session.get(url, timeout=10)
+        if session is not None:
+            from src.auth.transport import get_timeout
+            response = session.get(url, timeout=get_timeout(url))
+        else:
+            # 直接请求目标页面，会话失效时session_manager会重新登录并重放请求
+            from src.auth.session_manager import session_manager
+            response = session_manager.request('GET', url, account=account)
         
         if response.status_code != 200:
             print(f"❌ 获取评价列表失败: {response.status_code}")
-            return None
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
+            return serve_stale_response('evaluation', account, response) if use_cache else None
         
-        # 解析评价列表
-        courses = []
-        tables = soup.find_all('table')
-        
-        for table in tables:
-            rows = table.find_all('tr')
-            headers = []
-            
-            if rows:
-                header_row = rows[0]
-                headers = [th.get_text(strip=True) for th in header_row.find_all(['th', 'td'])]
-            
-            for row in rows[1:]:
-                cells = row.find_all(['td', 'th'])
-                if len(cells) >= len(headers):
-                    course_info = {}
-                    for i, cell in enumerate(cells[:len(headers)]):
-                        if i < len(headers):
-                            course_info[headers[i]] = cell.get_text(strip=True)
-                    
-                    if course_info:
-                        courses.append(course_info)
-        
-        return courses
+        result = parse_evaluation_list(response.text)
+        if use_cache:
+            result_cache.put('evaluation', account, result)
+        return result
         
     except Exception as e:
         print(f"❌ 获取评价列表时发生错误: {e}")
-        return None
+        return serve_stale('evaluation', account, e) if use_cache else None
+
+async def async_get_evaluation_list(account: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    异步获取可评价的课程列表
+
+    Args:
+        account: 账号，为空表示默认账号
+
+    Returns:
+        可评价课程列表
+    """
+    from src.academic.result_cache import result_cache, serve_stale, serve_stale_response
+
+    try:
+        from src.auth.async_session import async_session_manager
+        url = 'http://oa.csmu.edu.cn:8099/jsxsd/xspj/xspj_find.do'
+        response = await async_session_manager.request('GET', url, account=account)
+
+        if response.status_code != 200:
+            print(f"❌ 获取评价列表失败: {response.status_code}")
+            return serve_stale_response('evaluation', account, response)
+
+        result = parse_evaluation_list(response.text)
+        result_cache.put('evaluation', account, result)
+        return result
+
+    except Exception as e:
+        print(f"❌ 获取评价列表时发生错误: {e}")
+        return serve_stale('evaluation', account, e)
+
+def parse_evaluation_list(html_content: str) -> List[Dict[str, Any]]:
+    """
+    解析评价列表页面
+
+    Args:
+        html_content: 评价列表页面HTML
+
+    Returns:
+        可评价课程列表
+    """
+    from src.academic.html_backend import parse_html
+
+    soup = parse_html(html_content)
+    
+    # 解析评价列表
+    courses = []
+    tables = soup.find_all('table')
+    
+    for table in tables:
+        rows = table.find_all('tr')
+        headers = []
+        
+        if rows:
+            header_row = rows[0]
+            headers = [th.get_text(strip=True) for th in header_row.find_all(['th', 'td'])]
+        
+        for row in rows[1:]:
+            cells = row.find_all(['td', 'th'])
+            if len(cells) >= len(headers):
+                course_info = {}
+                for i, cell in enumerate(cells[:len(headers)]):
+                    if i < len(headers):
+                        course_info[headers[i]] = cell.get_text(strip=True)
+                
+                if course_info:
+                    courses.append(course_info)
+    
+    return courses
 
 def format_evaluation_list(courses: List[Dict[str, Any]]) -> str:
     """格式化评价列表输出"""
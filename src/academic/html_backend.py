@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML解析后端
+
+教务系统各页面的解析函数只用到BeautifulSoup接口的一小部分（find / find_all / get_text / get / str），
+本模块用同一组接口包装三种解析器，解析函数通过 parse_html() 获取文档，不直接依赖某个解析库：
+    selectolax: Lexbor引擎，C实现的CSS选择器，最快
+    lxml:       libxml2，速度和容错都较好
+    bs4:        BeautifulSoup + html.parser，纯Python实现，作为兜底
+
+selectolax和lxml是可选依赖（pip install -r requirements-optional.txt），默认仍使用BeautifulSoup，
+需要时通过环境变量切换。
+
+环境变量：
+    HTML_PARSER_BACKEND: bs4 / selectolax / lxml / auto（默认bs4；auto按上面的顺序选择已安装的第一个）
+
+各后端解析时间和内存占用的对比见 src.academic.parser_benchmark。
+"""
+
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.env_loader import env_loader
+
+# 按优先级排列的后端
+BACKENDS = ('selectolax', 'lxml', 'bs4')
+
+# 标签名参数：单个标签名或标签名列表
+TagNames = Union[str, List[str], Tuple[str, ...], None]
+
+
+def _normalize_query(name: TagNames, attrs: Optional[dict], kwargs: dict) -> Tuple[Optional[Tuple[str, ...]], dict]:
+    """把BeautifulSoup风格的查找参数统一为 (标签名元组, 属性条件)"""
+    if isinstance(name, str):
+        names = (name,)
+    elif name:
+        names = tuple(name)
+    else:
+        names = None
+
+    conditions = dict(attrs or {})
+    for key, value in kwargs.items():
+        conditions['class' if key == 'class_' else key] = value
+    return names, conditions
+
+
+def _attr_matches(key: str, expected, actual: Optional[str]) -> bool:
+    """按BeautifulSoup的规则比较属性：True表示存在即可，class按空格分隔的任一类名匹配"""
+    if expected is True:
+        return actual is not None
+    if actual is None:
+        return False
+    if key == 'class':
+        return expected in actual.split()
+    return actual == expected
+
+
+class HtmlNode(ABC):
+    """解析后的HTML元素（各后端共用的接口）"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """标签名"""
+
+    @abstractmethod
+    def get(self, key: str, default=None):
+        """获取属性值，没有值的布尔属性返回空字符串"""
+
+    @abstractmethod
+    def find_all(self, name: TagNames = None, attrs: Optional[dict] = None, **kwargs) -> List['HtmlNode']:
+        """
+        按文档顺序查找所有匹配的后代元素
+
+        Args:
+            name: 标签名或标签名列表，为空表示任意标签
+            attrs: 属性条件
+            **kwargs: 属性条件（class_ 表示 class）
+
+        Returns:
+            匹配的元素列表（不包含自身）
+        """
+
+    def find(self, name: TagNames = None, attrs: Optional[dict] = None, **kwargs) -> Optional['HtmlNode']:
+        """查找第一个匹配的后代元素，没有返回None"""
+        for node in self.find_all(name, attrs, **kwargs):
+            return node
+        return None
+
+    @abstractmethod
+    def get_text(self, strip: bool = False) -> str:
+        """元素内的全部文本；strip为True时去掉每段文本首尾的空白后直接拼接"""
+
+    @abstractmethod
+    def text_nodes(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """按文档顺序遍历后代文本节点，返回 (文本, 紧随其后的兄弟元素标签名)"""
+
+    def first_text_before(self, tag: str) -> Optional[str]:
+        """第一个紧跟着指定标签的文本节点（去掉首尾空白），没有返回None"""
+        for text, next_tag in self.text_nodes():
+            if next_tag == tag:
+                return text.strip()
+        return None
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class Bs4Node(HtmlNode):
+    """BeautifulSoup元素"""
+
+    __slots__ = ()
+
+    @property
+    def name(self) -> str:
+        return self._node.name
+
+    def get(self, key: str, default=None):
+        value = self._node.get(key, default)
+        # BeautifulSoup把class等多值属性解析为列表
+        return ' '.join(value) if isinstance(value, list) else value
+
+    def find_all(self, name: TagNames = None, attrs: Optional[dict] = None, **kwargs) -> List[HtmlNode]:
+        return [Bs4Node(node) for node in self._node.find_all(name, attrs or {}, **kwargs)]
+
+    def find(self, name: TagNames = None, attrs: Optional[dict] = None, **kwargs) -> Optional[HtmlNode]:
+        node = self._node.find(name, attrs or {}, **kwargs)
+        return Bs4Node(node) if node is not None else None
+
+    def get_text(self, strip: bool = False) -> str:
+        return self._node.get_text(strip=strip)
+
+    def text_nodes(self) -> Iterator[Tuple[str, Optional[str]]]:
+        from bs4 import NavigableString, Tag
+
+        for node in self._node.descendants:
+            if type(node) is NavigableString:
+                sibling = node.next_sibling
+                yield str(node), sibling.name if isinstance(sibling, Tag) else None
+
+    def __str__(self) -> str:
+        return str(self._node)
+
+
+class LxmlNode(HtmlNode):
+    """lxml元素"""
+
+    __slots__ = ()
+
+    @property
+    def name(self) -> str:
+        return self._node.tag
+
+    def get(self, key: str, default=None):
+        return self._node.get(key, default)
+
+    def find_all(self, name: TagNames = None, attrs: Optional[dict] = None, **kwargs) -> List[HtmlNode]:
+        names, conditions = _normalize_query(name, attrs, kwargs)
+        nodes = self._node.iterdescendants(*names) if names else self._node.iterdescendants()
+        return [
+            LxmlNode(node) for node in nodes
+            if isinstance(node.tag, str)
+            and all(_attr_matches(key, value, node.get(key)) for key, value in conditions.items())
+        ]
+
+    def get_text(self, strip: bool = False) -> str:
+        if strip:
+            return ''.join(text.strip() for text in self._node.itertext())
+        return ''.join(self._node.itertext())
+
+    def text_nodes(self) -> Iterator[Tuple[str, Optional[str]]]:
+        # lxml把文本挂在元素的text（第一个子元素之前）和tail（元素之后）上
+        def tag_of(element):
+            # 注释等节点的tag不是字符串
+            return element.tag if element is not None and isinstance(element.tag, str) else None
+
+        def walk(element):
+            if element.text:
+                yield element.text, tag_of(element[0]) if len(element) else None
+            for child in element:
+                if isinstance(child.tag, str):
+                    yield from walk(child)
+                if child.tail:
+                    yield child.tail, tag_of(child.getnext())
+
+        return walk(self._node)
+
+    def __str__(self) -> str:
+        import lxml.html
+        return lxml.html.tostring(self._node, encoding='unicode', with_tail=False)
+
+
+class SelectolaxNode(HtmlNode):
+    """selectolax（Lexbor）元素"""
+
+    __slots__ = ()
+
+    @property
+    def name(self) -> str:
+        return self._node.tag
+
+    def get(self, key: str, default=None):
+        attributes = self._node.attributes
+        if key not in attributes:
+            return default
+        value = attributes[key]
+        return '' if value is None else value
+
+    def _selector(self, names: Optional[Tuple[str, ...]], conditions: dict) -> str:
+        """把查找条件转换为CSS选择器"""
+        attr_selector = ''
+        for key, value in conditions.items():
+            if value is True:
+                attr_selector += f'[{key}]'
+            else:
+                escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+                operator = '~=' if key == 'class' else '='
+                attr_selector += f'[{key}{operator}"{escaped}"]'
+        return ', '.join(f'{tag}{attr_selector}' for tag in (names or ('*',)))
+
+    def find_all(self, name: TagNames = None, attrs: Optional[dict] = None, **kwargs) -> List[HtmlNode]:
+        names, conditions = _normalize_query(name, attrs, kwargs)
+        nodes = self._node.css(self._selector(names, conditions))
+        # Lexbor的css()在自身匹配时也会返回自身（总是第一个）
+        if nodes and nodes[0].mem_id == self._node.mem_id:
+            nodes = nodes[1:]
+        return [SelectolaxNode(node) for node in nodes]
+
+    def find(self, name: TagNames = None, attrs: Optional[dict] = None, **kwargs) -> Optional[HtmlNode]:
+        names, conditions = _normalize_query(name, attrs, kwargs)
+        selector = self._selector(names, conditions)
+        node = self._node.css_first(selector)
+        if node is not None and node.mem_id == self._node.mem_id:
+            nodes = self._node.css(selector)
+            node = nodes[1] if len(nodes) > 1 else None
+        return SelectolaxNode(node) if node is not None else None
+
+    def get_text(self, strip: bool = False) -> str:
+        return self._node.text(deep=True, separator='', strip=strip)
+
+    def text_nodes(self) -> Iterator[Tuple[str, Optional[str]]]:
+        for node in self._node.traverse(include_text=True):
+            if node.tag == '-text':
+                sibling = node.next
+                yield node.text(deep=False), sibling.tag if sibling is not None else None
+
+    def __str__(self) -> str:
+        return self._node.html
+
+
+def _parse_bs4(html: str) -> HtmlNode:
+    from bs4 import BeautifulSoup
+    return Bs4Node(BeautifulSoup(html, 'html.parser'))
+
+
+def _parse_lxml(html: str) -> HtmlNode:
+    import lxml.html
+    from lxml.etree import ParserError
+
+    try:
+        return LxmlNode(lxml.html.document_fromstring(html))
+    except ValueError:
+        # 带编码声明的字符串需要以字节形式解析
+        return LxmlNode(lxml.html.document_fromstring(html.encode('utf-8')))
+    except ParserError:
+        # 空文档
+        return LxmlNode(lxml.html.document_fromstring('<html></html>'))
+
+
+def _parse_selectolax(html: str) -> HtmlNode:
+    from selectolax.lexbor import LexborHTMLParser
+    return SelectolaxNode(LexborHTMLParser(html).root)
+
+
+_PARSERS = {
+    'selectolax': (_parse_selectolax, 'selectolax.lexbor'),
+    'lxml': (_parse_lxml, 'lxml.html'),
+    'bs4': (_parse_bs4, 'bs4'),
+}
+
+# 当前使用的后端（首次解析时根据配置确定）
+_backend: Optional[str] = None
+
+
+def is_available(backend: str) -> bool:
+    """后端依赖是否已安装"""
+    import importlib.util
+
+    try:
+        return importlib.util.find_spec(_PARSERS[backend][1]) is not None
+    except ImportError:
+        return False
+
+
+def available_backends() -> List[str]:
+    """已安装的后端（按优先级排列）"""
+    return [backend for backend in BACKENDS if is_available(backend)]
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    确定使用的后端
+
+    Args:
+        backend: 后端名称，为空或auto时按优先级选择已安装的第一个
+
+    Returns:
+        后端名称；指定的后端未安装时退回BeautifulSoup
+    """
+    backend = (backend or 'auto').lower()
+    if backend == 'auto':
+        return next((name for name in BACKENDS if is_available(name)), 'bs4')
+
+    if backend not in _PARSERS:
+        print(f"⚠️ 未知的HTML解析后端: {backend}，使用BeautifulSoup")
+        return 'bs4'
+    if not is_available(backend):
+        print(f"⚠️ HTML解析后端 {backend} 未安装，使用BeautifulSoup")
+        return 'bs4'
+    return backend
+
+
+def get_backend() -> str:
+    """当前使用的后端（读取环境变量HTML_PARSER_BACKEND）"""
+    global _backend
+    if _backend is None:
+        _backend = resolve_backend(env_loader.get('HTML_PARSER_BACKEND', 'bs4'))
+    return _backend
+
+
+def set_backend(backend: Optional[str]) -> str:
+    """切换后端（为空时重新读取配置），返回实际使用的后端"""
+    global _backend
+    _backend = resolve_backend(backend) if backend else None
+    return get_backend()
+
+
+def parse_html(html: str, backend: Optional[str] = None) -> HtmlNode:
+    """
+    解析HTML文档
+
+    Args:
+        html: HTML内容
+        backend: 后端名称，为空时使用当前配置的后端
+
+    Returns:
+        文档根元素
+    """
+    backend = resolve_backend(backend) if backend else get_backend()
+    return _PARSERS[backend][0](html or '')
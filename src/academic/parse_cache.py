@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面解析结果缓存
+
+课程表和历史成绩很少变化，但每次查询都会重新解析整个页面并重写JSON文件。
+本模块按 (接口, 解析器版本, 响应内容的sha256) 保存解析结果：
+    页面逐字节相同时直接返回上次的解析结果，不再解析
+    解析器版本变化（解析逻辑或结果格式修改）后，该接口旧版本的缓存自动删除
+    记录每个输出文件最近一次写入时对应的页面哈希，页面未变化且文件仍在时跳过重写
+
+结果保存在SQLite中，程序重启后缓存仍然有效。
+
+环境变量：
+    PARSE_CACHE_ENABLED: 是否启用（默认true）
+    PARSE_CACHE_DB: 数据库路径（默认 data/parse_cache.db）
+    PARSE_CACHE_MAX_ENTRIES: 每个接口保留的最大条数，超出后删除最久未使用的（默认256）
+"""
+
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional, Union
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.env_loader import env_loader
+
+
+def content_hash(content: Union[str, bytes]) -> str:
+    """响应内容的sha256"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+class ParseCache:
+    """按页面内容哈希缓存解析结果"""
+
+    def __init__(self, db_path: Optional[Path] = None, enabled: Optional[bool] = None,
+                 max_entries: Optional[int] = None):
+        if enabled is None:
+            enabled = env_loader.get_bool('PARSE_CACHE_ENABLED', True)
+        self.enabled = enabled
+        self.db_path = Path(db_path or env_loader.get('PARSE_CACHE_DB') or project_root / "data" / "parse_cache.db")
+        self.max_entries = max_entries or env_loader.get_int('PARSE_CACHE_MAX_ENTRIES', 256)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+        self._versions: Dict[str, str] = {}
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "skipped_writes": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        """首次使用时打开数据库（调用方持有锁）"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "endpoint TEXT NOT NULL, version TEXT NOT NULL, body_hash TEXT NOT NULL, "
+                "data TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL, "
+                "PRIMARY KEY (endpoint, version, body_hash))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outputs ("
+                "path TEXT PRIMARY KEY, body_hash TEXT NOT NULL, written REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _check_version(self, conn: sqlite3.Connection, endpoint: str, version: str) -> None:
+        """解析器版本变化时删除该接口旧版本的缓存（调用方持有锁）"""
+        if self._versions.get(endpoint) == version:
+            return
+        deleted = conn.execute(
+            "DELETE FROM results WHERE endpoint = ? AND version != ?", (endpoint, version)
+        ).rowcount
+        if deleted:
+            print(f"🧹 {endpoint} 解析器版本已更新为 {version}，清除 {deleted} 条旧的解析缓存")
+        self._versions[endpoint] = version
+
+    def get(self, endpoint: str, version: Union[str, int], body_hash: str) -> Optional[Any]:
+        """
+        获取页面的解析结果
+
+        Args:
+            endpoint: 接口名称，如 curriculum、achievement
+            version: 解析器版本
+            body_hash: 页面内容哈希（content_hash）
+
+        Returns:
+            上次的解析结果，没有缓存返回None
+        """
+        if not self.enabled:
+            return None
+
+        version = str(version)
+        try:
+            with self._lock:
+                conn = self._connect()
+                self._check_version(conn, endpoint, version)
+                row = conn.execute(
+                    "SELECT data FROM results WHERE endpoint = ? AND version = ? AND body_hash = ?",
+                    (endpoint, version, body_hash)
+                ).fetchone()
+                if row is None:
+                    self._stats["misses"] += 1
+                    return None
+                conn.execute(
+                    "UPDATE results SET last_used = ? WHERE endpoint = ? AND version = ? AND body_hash = ?",
+                    (time.time(), endpoint, version, body_hash)
+                )
+                self._stats["hits"] += 1
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"⚠️ 读取解析缓存失败: {e}")
+            return None
+
+    def put(self, endpoint: str, version: Union[str, int], body_hash: str, result: Any) -> None:
+        """
+        保存页面的解析结果
+
+        Args:
+            endpoint: 接口名称
+            version: 解析器版本
+            body_hash: 页面内容哈希
+            result: 解析结果（可JSON序列化）
+        """
+        if not self.enabled:
+            return
+
+        version = str(version)
+        now = time.time()
+        try:
+            data = json.dumps(result, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            print(f"⚠️ 保存解析缓存失败: {e}")
+            return
+
+        with self._lock:
+            conn = None
+            try:
+                conn = self._connect()
+                self._check_version(conn, endpoint, version)
+                conn.execute("BEGIN")
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (endpoint, version, body_hash, data, created, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (endpoint, version, body_hash, data, now, now)
+                )
+                # 超出容量时删除最久未使用的结果
+                conn.execute(
+                    "DELETE FROM results WHERE endpoint = ? AND version = ? AND body_hash NOT IN ("
+                    "SELECT body_hash FROM results WHERE endpoint = ? AND version = ? "
+                    "ORDER BY last_used DESC LIMIT ?)",
+                    (endpoint, version, endpoint, version, self.max_entries)
+                )
+                conn.execute("COMMIT")
+                self._stats["stores"] += 1
+            except sqlite3.Error as e:
+                # 回滚未完成的事务，否则连接停留在事务中，之后的BEGIN都会失败
+                if conn is not None and conn.in_transaction:
+                    conn.rollback()
+                print(f"⚠️ 保存解析缓存失败: {e}")
+
+    def output_current(self, path: Path, body_hash: str) -> bool:
+        """
+        输出文件是否已经是该页面的解析结果（文件存在且最近一次写入时的页面哈希相同）
+
+        Args:
+            path: 输出文件路径
+            body_hash: 页面内容哈希
+
+        Returns:
+            为True时可以跳过重写
+        """
+        if not self.enabled or not Path(path).exists():
+            return False
+
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT body_hash FROM outputs WHERE path = ?", (str(path),)
+                ).fetchone()
+                current = row is not None and row[0] == body_hash
+                if current:
+                    self._stats["skipped_writes"] += 1
+            return current
+        except sqlite3.Error:
+            return False
+
+    def mark_output(self, path: Path, body_hash: str) -> None:
+        """记录输出文件已写入该页面的解析结果"""
+        if not self.enabled:
+            return
+
+        try:
+            with self._lock:
+                self._connect().execute(
+                    "INSERT OR REPLACE INTO outputs (path, body_hash, written) VALUES (?, ?, ?)",
+                    (str(path), body_hash, time.time())
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️ 记录输出文件失败: {e}")
+
+    def clear(self, endpoint: Optional[str] = None) -> None:
+        """清空缓存（指定接口时只清空该接口）"""
+        if not self.db_path.exists():
+            return
+
+        with self._lock:
+            conn = self._connect()
+            if endpoint:
+                conn.execute("DELETE FROM results WHERE endpoint = ?", (endpoint,))
+            else:
+                conn.execute("DELETE FROM results")
+                conn.execute("DELETE FROM outputs")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        缓存统计
+
+        Returns:
+            {'hits': 命中次数, 'misses': 未命中次数, 'hit_rate': 命中率, 'stores': 保存次数,
+             'skipped_writes': 跳过的文件重写次数, 'entries': {接口: 缓存条数}}
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        stats["entries"] = {}
+
+        if self.db_path.exists():
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT endpoint, COUNT(*) FROM results GROUP BY endpoint"
+                ).fetchall()
+            stats["entries"] = dict(rows)
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 全局解析结果缓存
+parse_cache = ParseCache()
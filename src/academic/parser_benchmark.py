@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML解析后端评测
+
+对保存下来的教务系统页面，分别用各解析后端（src.academic.html_backend）运行对应页面的解析函数，
+统计解析耗时、内存峰值，并检查结果是否与BeautifulSoup一致。
+
+页面类型由文件名前缀确定：curriculum / achievement / student_info / exam_schedule / evaluation / semester，
+例如课表页面保存的 src/academic/curriculum_source.html。
+
+内存在独立的子进程中测量：
+    Python堆峰值: tracemalloc统计的解析期间Python对象分配峰值
+    RSS增量: 解析前后进程最大常驻内存之差，包含lxml/Lexbor在C层分配的内存
+
+用法:
+    python -m src.academic.parser_benchmark src/academic/curriculum_source.html
+    python -m src.academic.parser_benchmark data/pages --repeat 50 --json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 支持的页面类型（按文件名前缀匹配，较长的前缀优先）
+PAGE_TYPES = ('curriculum', 'achievement', 'student_info', 'exam_schedule', 'evaluation', 'semester')
+
+
+def get_page_parser(page_type: str):
+    """获取页面类型对应的解析函数"""
+    if page_type == 'curriculum':
+        from src.academic.curriculum import CurriculumParser
+        return CurriculumParser()._parse_html_table
+    if page_type == 'achievement':
+        from src.academic.achievement import AchievementParser
+        return AchievementParser()._parse_html_table
+    if page_type == 'student_info':
+        from src.academic.student_info import parse_student_info
+        return parse_student_info
+    if page_type == 'exam_schedule':
+        from src.academic.exam_schedule import parse_exam_schedule
+        return parse_exam_schedule
+    if page_type == 'evaluation':
+        from src.academic.evaluation import parse_evaluation_list
+        return parse_evaluation_list
+    if page_type == 'semester':
+        from src.academic.semester import parse_semester
+        return parse_semester
+    raise ValueError(f"未知的页面类型: {page_type}")
+
+
+def page_type_of(path: Path) -> Optional[str]:
+    """根据文件名确定页面类型"""
+    name = path.name.lower()
+    for page_type in sorted(PAGE_TYPES, key=len, reverse=True):
+        if name.startswith(page_type):
+            return page_type
+    return None
+
+
+def collect_pages(paths: List[Path]) -> List[Tuple[str, Path]]:
+    """
+    收集待评测的页面
+
+    Args:
+        paths: HTML文件或目录
+
+    Returns:
+        [(页面类型, 文件路径)]，无法确定类型的文件被跳过
+    """
+    files = []
+    for path in paths:
+        files.extend(sorted(path.glob("*.html")) if path.is_dir() else [path])
+
+    pages = []
+    for path in files:
+        page_type = page_type_of(path)
+        if page_type:
+            pages.append((page_type, path))
+        else:
+            print(f"⚠️ 无法确定页面类型，已跳过: {path}")
+    return pages
+
+
+def _run_parser(page_type: str, html: str, backend: str):
+    """用指定后端解析一次页面（屏蔽解析函数的日志输出）"""
+    from src.academic.html_backend import set_backend
+
+    set_backend(backend)
+    parser = get_page_parser(page_type)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser(html)
+
+
+def _measure_memory(page_type: str, path: str, backend: str) -> Dict[str, Optional[float]]:
+    """在子进程中测量一次解析的内存峰值（KB）"""
+    import tracemalloc
+
+    html = Path(path).read_text(encoding='utf-8')
+    # 先完整解析一次，模块导入和解析库的一次性初始化不计入解析内存
+    _run_parser(page_type, html, backend)
+
+    try:
+        import resource
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        resource = None
+        rss_before = 0
+
+    tracemalloc.start()
+    _run_parser(page_type, html, backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rss_delta = None
+    if resource is not None:
+        rss_delta = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+        if sys.platform == 'darwin':
+            # macOS的ru_maxrss单位是字节
+            rss_delta /= 1024
+
+    return {"python_peak_kb": peak / 1024, "rss_delta_kb": rss_delta}
+
+
+def measure_memory(page_type: str, path: Path, backend: str) -> Dict[str, Optional[float]]:
+    """启动一个新进程测量内存，避免前一次解析的内存影响结果"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(_measure_memory, page_type, str(path), backend).result()
+
+
+def run_benchmark(pages: List[Tuple[str, Path]], backends: List[str], repeat: int = 20,
+                  memory: bool = True) -> List[Dict[str, Any]]:
+    """
+    运行评测
+
+    Args:
+        pages: [(页面类型, 文件路径)]
+        backends: 参与评测的后端
+        repeat: 每个后端重复解析的次数
+        memory: 是否测量内存
+
+    Returns:
+        每个 (页面, 后端) 的评测结果
+    """
+    results = []
+    for page_type, path in pages:
+        html = path.read_text(encoding='utf-8')
+        reference = _run_parser(page_type, html, 'bs4')
+
+        for backend in backends:
+            # 预热一次，排除模块导入的耗时
+            output = _run_parser(page_type, html, backend)
+            page_parser = get_page_parser(page_type)
+            timings = []
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    page_parser(html)
+                    timings.append(time.perf_counter() - start)
+
+            result = {
+                "page": page_type,
+                "file": path.name,
+                "size_kb": len(html.encode('utf-8')) / 1024,
+                "backend": backend,
+                "median_ms": statistics.median(timings) * 1000,
+                "min_ms": min(timings) * 1000,
+                "records": len(output) if output else 0,
+                "same_as_bs4": output == reference,
+            }
+            if memory:
+                result.update(measure_memory(page_type, path, backend))
+            results.append(result)
+
+    return results
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    """格式化评测结果"""
+    output = ["📊 HTML解析后端评测"]
+    output.append("=" * 80)
+    output.append(f"{'页面':<16}{'后端':<12}{'中位耗时':>10}{'最快':>10}{'Python堆峰值':>14}{'RSS增量':>10}  结果")
+
+    baseline = {}
+    for result in results:
+        if result["backend"] == 'bs4':
+            baseline[result["file"]] = result["median_ms"]
+
+    current_file = None
+    for result in results:
+        if result["file"] != current_file:
+            current_file = result["file"]
+            output.append(f"\n📄 {current_file} ({result['size_kb']:.1f} KB)")
+
+        python_peak = result.get("python_peak_kb")
+        rss_delta = result.get("rss_delta_kb")
+        speedup = baseline.get(result["file"], 0) / result["median_ms"] if result["median_ms"] else 0
+        check = f"{result['records']}条 {'✅一致' if result['same_as_bs4'] else '❌与bs4不一致'}"
+        if speedup and result["backend"] != 'bs4':
+            check += f" (x{speedup:.1f})"
+
+        output.append(
+            f"{result['page']:<16}{result['backend']:<12}"
+            f"{result['median_ms']:>8.2f}ms{result['min_ms']:>8.2f}ms"
+            f"{(f'{python_peak:.0f}KB' if python_peak is not None else '-'):>14}"
+            f"{(f'{rss_delta:.0f}KB' if rss_delta is not None else '-'):>10}  {check}"
+        )
+
+    return "\n".join(output)
+
+
+def main() -> int:
+    from src.academic.html_backend import BACKENDS, available_backends
+
+    parser = argparse.ArgumentParser(description='HTML解析后端评测')
+    parser.add_argument('paths', nargs='+', help='保存的页面HTML文件或目录（文件名以页面类型开头）')
+    parser.add_argument('--backends', default=','.join(BACKENDS), help='参与评测的后端，逗号分隔')
+    parser.add_argument('--repeat', type=int, default=20, help='每个后端重复解析的次数')
+    parser.add_argument('--no-memory', action='store_true', help='不测量内存')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+
+    installed = available_backends()
+    backends = [backend for backend in args.backends.split(',') if backend in installed]
+    missing = set(args.backends.split(',')) - set(backends)
+    if missing:
+        print(f"⚠️ 以下后端未安装，已跳过: {', '.join(sorted(missing))}")
+
+    pages = collect_pages([Path(path) for path in args.paths])
+    if not pages:
+        print("❌ 没有找到可评测的页面")
+        return 1
+
+    results = run_benchmark(pages, backends, repeat=max(1, args.repeat), memory=not args.no_memory)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
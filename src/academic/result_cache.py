@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+查询结果缓存
+
+保存每个账号各类查询最近一次成功的结果。教务系统不可用（熔断器打开、超时、连接失败）时，
+查询函数返回缓存的结果并标记为过期数据，调用方可以通过 is_stale() 判断。
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Dict, Any
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+
+class StaleList(list):
+    """过期的列表结果"""
+    stale = True
+    cached_at: Optional[float] = None
+
+
+class StaleDict(dict):
+    """过期的字典结果"""
+    stale = True
+    cached_at: Optional[float] = None
+
+
+class StaleTuple(tuple):
+    """过期的元组结果"""
+    stale = True
+    cached_at: Optional[float] = None
+
+
+_STALE_TYPES = {'list': StaleList, 'dict': StaleDict, 'tuple': StaleTuple}
+
+
+def mark_stale(result: Any, cached_at: Optional[float] = None) -> Any:
+    """
+    把结果标记为过期数据
+
+    Args:
+        result: 列表、字典或元组结果
+        cached_at: 缓存时间戳
+
+    Returns:
+        带 stale 标记的同类型结果，不支持的类型原样返回
+    """
+    stale_type = _STALE_TYPES.get(type(result).__name__)
+    if stale_type is None:
+        return result
+    stale = stale_type(result)
+    stale.cached_at = cached_at
+    return stale
+
+
+def is_stale(result: Any) -> bool:
+    """判断结果是否为教务系统不可用时返回的缓存数据"""
+    return getattr(result, 'stale', False)
+
+
+class UpstreamStatusError(Exception):
+    """教务系统返回了错误状态码"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"教务系统返回状态码 {status_code}")
+        self.status_code = status_code
+
+
+def is_upstream_unavailable(error: BaseException) -> bool:
+    """判断异常是否表示教务系统不可用（熔断、超时、连接失败、5xx响应）"""
+    import requests
+    from src.auth.circuit_breaker import CircuitOpenError
+
+    if isinstance(error, (CircuitOpenError, requests.Timeout, requests.ConnectionError)):
+        return True
+
+    if isinstance(error, UpstreamStatusError):
+        return error.status_code >= 500
+
+    # raise_for_status() 抛出的5xx错误（如系统维护）
+    response = getattr(error, 'response', None)
+    if isinstance(error, requests.HTTPError) and response is not None:
+        return response.status_code >= 500
+
+    try:
+        import httpx
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        return isinstance(error, httpx.TransportError)
+    except ImportError:
+        return False
+
+
+class ResultCache:
+    """按 (查询类型, 账号) 保存最近一次成功结果，内存中一份，data/cache 下持久化一份"""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir or project_root / "data" / "cache")
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = Lock()
+
+    def _key(self, name: str, account: Optional[str]) -> str:
+        if not account:
+            from src.auth.session_manager import session_manager
+            account = session_manager._default_account()
+        return f"{name}:{account}"
+
+    def _path(self, key: str) -> Path:
+        safe_name = re.sub(r'[^0-9A-Za-z_.-]', '_', key)
+        return self.cache_dir / f"{safe_name}.json"
+
+    def put(self, name: str, account: Optional[str], result: Any) -> None:
+        """
+        保存一次成功的查询结果
+
+        Args:
+            name: 查询类型，如 exam_schedule、curriculum:2024-2025-1:1
+            account: 账号，为空表示默认账号
+            result: 查询结果（列表、字典或元组）
+        """
+        if result is None or is_stale(result):
+            return
+
+        key = self._key(name, account)
+        entry = {"type": type(result).__name__, "cached_at": time.time(), "data": result}
+        with self._lock:
+            self._entries[key] = entry
+
+        try:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再替换，避免中途崩溃产生损坏的文件
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".cache-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            print(f"⚠️ 保存查询缓存失败: {e}")
+
+    def get(self, name: str, account: Optional[str]) -> Optional[Any]:
+        """
+        获取缓存的结果（标记为过期数据）
+
+        Args:
+            name: 查询类型
+            account: 账号，为空表示默认账号
+
+        Returns:
+            带 stale 标记的结果，没有缓存返回None
+        """
+        key = self._key(name, account)
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            path = self._path(key)
+            if not path.exists():
+                return None
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                return None
+            with self._lock:
+                self._entries[key] = entry
+
+        data = entry["data"]
+        if entry.get("type") == "tuple":
+            data = tuple(data)
+        return mark_stale(data, entry.get("cached_at"))
+
+
+# 全局查询结果缓存
+result_cache = ResultCache()
+
+
+def serve_stale(name: str, account: Optional[str], error: BaseException) -> Optional[Any]:
+    """
+    查询失败时的降级处理：教务系统不可用时返回缓存结果
+
+    Args:
+        name: 查询类型
+        account: 账号，为空表示默认账号
+        error: 查询时发生的异常
+
+    Returns:
+        带 stale 标记的缓存结果；不是上游不可用的错误或没有缓存时返回None
+    """
+    if not is_upstream_unavailable(error):
+        return None
+
+    cached = result_cache.get(name, account)
+    if cached is not None:
+        cached_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(cached.cached_at or 0))
+        print(f"⚠️ 教务系统暂不可用，返回 {cached_time} 缓存的数据")
+    return cached
+
+
+def serve_stale_response(name: str, account: Optional[str], response: Any) -> Optional[Any]:
+    """
+    响应状态码不是200时的降级处理：5xx（如系统维护）时返回缓存结果
+
+    熔断器在连续失败达到阈值后才打开，在此之前的5xx响应同样返回缓存结果。
+
+    Args:
+        name: 查询类型
+        account: 账号，为空表示默认账号
+        response: requests或httpx的响应对象
+
+    Returns:
+        带 stale 标记的缓存结果；不是5xx或没有缓存时返回None
+    """
+    return serve_stale(name, account, UpstreamStatusError(response.status_code))
@@ -7,83 +7,131 @@
 """
 
 import requests
-from bs4 import BeautifulSoup
 from typing import Tuple, List, Optional
 
-def get_semester(session: requests.Session = None) -> Optional[Tuple[List[str], str, str]]:
+def get_semester(session: requests.Session = None, account: Optional[str] = None) -> Optional[Tuple[List[str], str, str]]:
     """
     获取学期信息
 
     Args:
         session: 已登录的session对象，如果为None则使用session_manager
+        account: 使用session_manager时的账号，为空表示默认账号
 
     Returns:
         元组 (学期列表, 当前选中学期, 用户姓名)，失败返回None
     """
-    try:
-        # 如果没有提供session，使用session_manager
-        if session is None:
-            from src.auth.session_manager import session_manager
-            if not session_manager.ensure_logged_in():
-                print("❌ 无法获取有效的登录session")
-                return None
-            session = session_manager.session
-            print("✅ 使用session_manager获取有效session")
+    from src.academic.result_cache import result_cache, serve_stale, serve_stale_response
+
+    # 传入了session但没有指定账号时无法确定结果属于哪个账号，不读写结果缓存
+    use_cache = session is None or account is not None
 
+    try:
         url = 'http://oa.csmu.edu.cn:8099/jsxsd/xskb/xskb_list.do'
         print(f"🌐 正在访问学期信息页面: {url}")
 
-        response = session.get(url, timeout=10)
+        if session is not None:
+            from src.auth.transport import get_timeout
+            response = session.get(url, timeout=get_timeout(url))
+        else:
+            # 直接请求目标页面，会话失效时session_manager会重新登录并重放请求
+            from src.auth.session_manager import session_manager
+            response = session_manager.request('GET', url, account=account)
 
         if response.status_code != 200:
             print(f"❌ 获取学期信息失败: {response.status_code}")
-            return None
+            return serve_stale_response('semester', account, response) if use_cache else None
 
         print(f"✅ 成功获取页面内容: {len(response.text)} 字符")
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # 获取学期选择框
-        options_select = soup.find('select', id='xnxq01id')
-        if not options_select:
-            print("❌ 未找到学期选择框")
-            return None
-
-        # 获取用户姓名
-        name_div = soup.find('div', id='Top1_divLoginName')
-        user_name = ""
-        if name_div:
-            user_name = name_div.get_text(strip=True).split('(')[0]
-            print(f"👤 用户姓名: {user_name}")
-
-        # 获取当前选中的学期
-        selected_option = options_select.find('option', attrs={'selected': 'selected'})
-        current_semester = ""
-        if selected_option:
-            current_semester = selected_option.get_text(strip=True)
-            print(f"📅 当前学期: {current_semester}")
-
-        # 获取所有可用学期
-        all_options = options_select.find_all('option')
-        semester_list = []
-        for option in all_options:
-            semester_text = option.get_text(strip=True)
-            if semester_text:
-                semester_list.append(semester_text)
-
-        print(f"📋 可用学期: {len(semester_list)} 个")
-        for i, semester in enumerate(semester_list):
-            status = " (当前)" if semester == current_semester else ""
-            print(f"   {i+1}. {semester}{status}")
-
-        return semester_list, current_semester, user_name
+        result = parse_semester(response.text)
+        if use_cache:
+            result_cache.put('semester', account, result)
+        return result
 
     except Exception as e:
         print(f"❌ 获取学期信息时发生错误: {e}")
         import traceback
         traceback.print_exc()
+        return serve_stale('semester', account, e) if use_cache else None
+
+async def async_get_semester(account: Optional[str] = None) -> Optional[Tuple[List[str], str, str]]:
+    """
+    异步获取学期信息
+
+    Args:
+        account: 账号，为空表示默认账号
+
+    Returns:
+        元组 (学期列表, 当前选中学期, 用户姓名)，失败返回None
+    """
+    from src.academic.result_cache import result_cache, serve_stale, serve_stale_response
+
+    try:
+        from src.auth.async_session import async_session_manager
+        url = 'http://oa.csmu.edu.cn:8099/jsxsd/xskb/xskb_list.do'
+        response = await async_session_manager.request('GET', url, account=account)
+
+        if response.status_code != 200:
+            print(f"❌ 获取学期信息失败: {response.status_code}")
+            return serve_stale_response('semester', account, response)
+
+        result = parse_semester(response.text)
+        result_cache.put('semester', account, result)
+        return result
+
+    except Exception as e:
+        print(f"❌ 获取学期信息时发生错误: {e}")
+        return serve_stale('semester', account, e)
+
+def parse_semester(html_content: str) -> Optional[Tuple[List[str], str, str]]:
+    """
+    解析课表页面中的学期选择框
+
+    Args:
+        html_content: 课表页面HTML
+
+    Returns:
+        元组 (学期列表, 当前选中学期, 用户姓名)，未找到学期选择框返回None
+    """
+    from src.academic.html_backend import parse_html
+
+    soup = parse_html(html_content)
+
+    # 获取学期选择框
+    options_select = soup.find('select', id='xnxq01id')
+    if not options_select:
+        print("❌ 未找到学期选择框")
         return None
 
+    # 获取用户姓名
+    name_div = soup.find('div', id='Top1_divLoginName')
+    user_name = ""
+    if name_div:
+        user_name = name_div.get_text(strip=True).split('(')[0]
+        print(f"👤 用户姓名: {user_name}")
+
+    # 获取当前选中的学期
+    selected_option = options_select.find('option', attrs={'selected': 'selected'})
+    current_semester = ""
+    if selected_option:
+        current_semester = selected_option.get_text(strip=True)
+        print(f"📅 当前学期: {current_semester}")
+
+    # 获取所有可用学期
+    all_options = options_select.find_all('option')
+    semester_list = []
+    for option in all_options:
+        semester_text = option.get_text(strip=True)
+        if semester_text:
+            semester_list.append(semester_text)
+
+    print(f"📋 可用学期: {len(semester_list)} 个")
+    for i, semester in enumerate(semester_list):
+        status = " (当前)" if semester == current_semester else ""
+        print(f"   {i+1}. {semester}{status}")
+
+    return semester_list, current_semester, user_name
+
 if __name__ == "__main__":
     import sys
     from pathlib import Path
@@ -7,36 +7,39 @@
 """
 
 import requests
-from bs4 import BeautifulSoup
 import re
 from typing import Dict, Any, Optional
 
-def get_student_info(session: requests.Session = None) -> Optional[Dict[str, Any]]:
+def get_student_info(session: requests.Session = None, account: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     获取学生个人信息
 
     Args:
         session: 已登录的session对象，如果为None则使用session_manager
+        account: 使用session_manager时的账号，为空表示默认账号
 
     Returns:
         学生信息字典，包含基本信息、学籍信息等
     """
+    from src.academic.result_cache import result_cache, serve_stale, serve_stale_response
+
+    # 传入了session但没有指定账号时无法确定结果属于哪个账号，不读写结果缓存
+    use_cache = session is None or account is not None
+
     try:
-        # 如果没有提供session，使用session_manager
-        if session is None:
-            from src.auth.session_manager import session_manager
-            if not session_manager.ensure_logged_in():
-                print("❌ 无法获取有效的登录session")
-                return None
-            session = session_manager.session
-            print("✅ 使用session_manager获取有效session")
         url = 'http://oa.csmu.edu.cn:8099/jsxsd/grxx/xsxx'
         print(f"🌐 正在访问学生信息页面: {url}")
-        response = session.get(url, timeout=10)
+        if session is not None:
+            from src.auth.transport import get_timeout
+            response = session.get(url, timeout=get_timeout(url))
+        else:
+            # 直接请求目标页面，会话失效时session_manager会重新登录并重放请求
+            from src.auth.session_manager import session_manager
+            response = session_manager.request('GET', url, account=account)
         
         if response.status_code != 200:
             print(f"❌ 获取学生信息失败: {response.status_code}")
-            return None
+            return serve_stale_response('student_info', account, response) if use_cache else None
         
         print(f"✅ 成功获取页面内容: {len(response.text)} 字符")
         
@@ -47,51 +50,97 @@ def get_student_info(session: requests.Session = None) -> Optional[Dict[str, Any
             f.write(response.text)
         print(f"✅ HTML源码已保存到: {source_file}")
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # 解析学生信息
-        student_info = {}
-        
-        # 查找页面标题
-        title = soup.find('title')
-        if title:
-            student_info['页面标题'] = title.get_text(strip=True)
-            print(f"📄 页面标题: {student_info['页面标题']}")
-        
-        # 专门解析学籍卡片表格
-        main_table = soup.find('table', id='xjkpTable')
-        if main_table:
-            print("📊 找到学籍卡片主表格，开始详细解析...")
-            parsed_info = parse_student_card_table(main_table)
-            student_info.update(parsed_info)
-        else:
-            print("⚠️ 未找到学籍卡片主表格")
-        
-        # 查找学生照片
-        img_tags = soup.find_all('img')
-        for img in img_tags:
-            src = img.get('src', '')
-            alt = img.get('alt', '')
-            if 'xszpLoad' in src or '照片' in alt:
-                student_info['学生照片URL'] = src
-                print(f"✅ 找到学生照片: {src}")
-                break
-        
-        print(f"\n✅ 总共解析出 {len(student_info)} 项学生信息")
-        return student_info
+        result = parse_student_info(response.text)
+        if use_cache:
+            result_cache.put('student_info', account, result)
+        return result
         
     except Exception as e:
         print(f"❌ 获取学生信息时发生错误: {e}")
         import traceback
         traceback.print_exc()
-        return None
+        return serve_stale('student_info', account, e) if use_cache else None
+
+async def async_get_student_info(account: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    异步获取学生个人信息
+
+    Args:
+        account: 账号，为空表示默认账号
+
+    Returns:
+        学生信息字典，包含基本信息、学籍信息等
+    """
+    from src.academic.result_cache import result_cache, serve_stale, serve_stale_response
+
+    try:
+        from src.auth.async_session import async_session_manager
+        url = 'http://oa.csmu.edu.cn:8099/jsxsd/grxx/xsxx'
+        response = await async_session_manager.request('GET', url, account=account)
+
+        if response.status_code != 200:
+            print(f"❌ 获取学生信息失败: {response.status_code}")
+            return serve_stale_response('student_info', account, response)
+
+        result = parse_student_info(response.text)
+        result_cache.put('student_info', account, result)
+        return result
+
+    except Exception as e:
+        print(f"❌ 获取学生信息时发生错误: {e}")
+        return serve_stale('student_info', account, e)
+
+def parse_student_info(html_content: str) -> Dict[str, Any]:
+    """
+    解析学生信息页面
+
+    Args:
+        html_content: 学生信息页面HTML
+
+    Returns:
+        学生信息字典
+    """
+    from src.academic.html_backend import parse_html
+
+    soup = parse_html(html_content)
+    
+    # 解析学生信息
+    student_info = {}
+    
+    # 查找页面标题
+    title = soup.find('title')
+    if title:
+        student_info['页面标题'] = title.get_text(strip=True)
+        print(f"📄 页面标题: {student_info['页面标题']}")
+    
+    # 专门解析学籍卡片表格
+    main_table = soup.find('table', id='xjkpTable')
+    if main_table:
+        print("📊 找到学籍卡片主表格，开始详细解析...")
+        parsed_info = parse_student_card_table(main_table)
+        student_info.update(parsed_info)
+    else:
+        print("⚠️ 未找到学籍卡片主表格")
+    
+    # 查找学生照片
+    img_tags = soup.find_all('img')
+    for img in img_tags:
+        src = img.get('src', '')
+        alt = img.get('alt', '')
+        if 'xszpLoad' in src or '照片' in alt:
+            student_info['学生照片URL'] = src
+            print(f"✅ 找到学生照片: {src}")
+            break
+    
+    print(f"\n✅ 总共解析出 {len(student_info)} 项学生信息")
+    return student_info
 
 def parse_student_card_table(table) -> Dict[str, Any]:
     """
     专门解析学籍卡片表格
     
     Args:
-        table: BeautifulSoup表格对象
+        table: 表格元素（src.academic.html_backend.HtmlNode）
         
     Returns:
         解析出的学生信息字典
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课表查询
+
+Timetable 由课程表解析结果（CourseSession列表或逐周记录）构建，预先建立以下索引：
+    (周次, 星期) -> 当天的课程（按节次排序）和已占用节次的位图
+    节次 -> 课程
+    课程名称 -> 课程
+    按 (周次, 星期, 开始节次) 排序的上课时间列表，用二分查找下一节课
+
+日视图、周视图、空闲时段都是查表，下一节课是一次二分查找，不需要重新获取或遍历课程表。
+
+环境变量：
+    SEMESTER_START_DATE: 第1周星期一的日期（如 2025-09-01），用于把日期换算为周次和星期
+"""
+
+import re
+import sys
+from bisect import bisect_right
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.env_loader import env_loader
+from src.academic.course_session import CourseSession, load_sessions
+from src.academic.curriculum import PERIOD_TABLE
+
+
+def _period_numbers(text: str) -> Tuple[int, ...]:
+    """节次文本中的节次，如 "01-02-03-04节" -> (1, 2, 3, 4)"""
+    return tuple(sorted({int(number) for number in re.findall(r'\d+', text or '') if 0 < int(number) <= 20}))
+
+
+def session_periods(session: CourseSession) -> Tuple[int, ...]:
+    """
+    课程占用的节次
+
+    优先从节次标识（jcdm）中取出节次；没有时按时间段（time_slot）查节次表。
+
+    Returns:
+        升序的节次元组，无法确定时为空元组
+    """
+    periods = _period_numbers(session.jcdm)
+    if periods:
+        return periods
+    for key, slot, _ in PERIOD_TABLE:
+        if slot == session.time_slot:
+            return _period_numbers(key)
+    return ()
+
+
+def _periods_mask(periods: Iterable[int]) -> int:
+    mask = 0
+    for period in periods:
+        mask |= 1 << period
+    return mask
+
+
+def format_session(session: CourseSession) -> str:
+    """课程的单行描述，如 "第3-4节 护理学基础 @教室 (老师)" """
+    text = f"{session.jcmc} {session.kcmc}"
+    if session.jxcdmc:
+        text += f" @{session.jxcdmc}"
+    if session.teaxms:
+        text += f" ({session.teaxms})"
+    return text
+
+
+def get_semester_start() -> Optional[date]:
+    """读取环境变量SEMESTER_START_DATE（第1周星期一的日期），未配置或格式错误返回None"""
+    value = env_loader.get('SEMESTER_START_DATE', '')
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.strip(), '%Y-%m-%d').date()
+    except ValueError:
+        print(f"⚠️ SEMESTER_START_DATE格式不正确（应为YYYY-MM-DD）: {value}")
+        return None
+
+
+class Timetable:
+    """带索引的课表"""
+
+    def __init__(self, data: Iterable[Union[CourseSession, Dict[str, Any]]] = (),
+                 semester_start: Optional[date] = None):
+        """
+        Args:
+            data: CourseSession列表、to_dict()的结果或逐周记录（curriculum()的返回值）
+            semester_start: 第1周星期一的日期，为空时读取SEMESTER_START_DATE
+        """
+        items = list(data or [])
+        if items and not isinstance(items[0], CourseSession):
+            items = load_sessions(items)
+        self.sessions: List[CourseSession] = items
+        self.semester_start = semester_start or get_semester_start()
+
+        self._by_day: Dict[Tuple[int, int], List[CourseSession]] = {}
+        self._busy: Dict[Tuple[int, int], int] = {}
+        self._by_period: Dict[str, List[CourseSession]] = {}
+        self._by_course: Dict[str, List[CourseSession]] = {}
+        self._weeks: Dict[int, List[int]] = {}
+        self._starts: List[Tuple[int, int, int]] = []
+        self._start_sessions: List[CourseSession] = []
+        self._build_indexes()
+
+    def _build_indexes(self) -> None:
+        """建立各查询索引"""
+        occurrences = []
+        for index, session in enumerate(self.sessions):
+            periods = session_periods(session)
+            first_period = periods[0] if periods else 0
+            periods_mask = _periods_mask(periods)
+
+            self._by_period.setdefault(session.jcdm, []).append(session)
+            self._by_course.setdefault(session.kcmc, []).append(session)
+
+            for week in session.week_list:
+                key = (week, session.xq)
+                self._by_day.setdefault(key, []).append((first_period, index, session))
+                self._busy[key] = self._busy.get(key, 0) | periods_mask
+                occurrences.append((week, session.xq, first_period, index))
+
+        # 当天课程按开始节次排序（同一节次保持原顺序）
+        for key, entries in self._by_day.items():
+            entries.sort(key=lambda entry: entry[:2])
+            self._by_day[key] = [session for _, _, session in entries]
+            self._weeks.setdefault(key[0], []).append(key[1])
+        for weekdays in self._weeks.values():
+            weekdays.sort()
+        for sessions in self._by_course.values():
+            sessions.sort(key=lambda session: (session.xq, session_periods(session)))
+
+        occurrences.sort()
+        self._starts = [occurrence[:3] for occurrence in occurrences]
+        self._start_sessions = [self.sessions[occurrence[3]] for occurrence in occurrences]
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    @property
+    def weeks(self) -> List[int]:
+        """有课的周次（升序）"""
+        return sorted(self._weeks)
+
+    def day(self, week: int, weekday: int) -> List[CourseSession]:
+        """
+        日视图
+
+        Args:
+            week: 周次
+            weekday: 星期（1-7）
+
+        Returns:
+            当天的课程（按节次排序）
+        """
+        return list(self._by_day.get((week, weekday), []))
+
+    def week(self, week: int) -> Dict[int, List[CourseSession]]:
+        """
+        周视图
+
+        Returns:
+            {星期: 当天的课程}，只包含有课的日子
+        """
+        return {weekday: self.day(week, weekday) for weekday in self._weeks.get(week, [])}
+
+    def course(self, name: str) -> List[CourseSession]:
+        """某门课程的全部上课时段（按星期和节次排序）"""
+        return list(self._by_course.get(name, []))
+
+    def courses(self) -> List[str]:
+        """课程名称列表"""
+        return sorted(self._by_course)
+
+    def period(self, jcdm: str) -> List[CourseSession]:
+        """某个节次的全部课程"""
+        return list(self._by_period.get(jcdm, []))
+
+    def free_slots(self, week: int, weekday: int) -> List[str]:
+        """
+        空闲时段
+
+        Args:
+            week: 周次
+            weekday: 星期（1-7）
+
+        Returns:
+            当天没有课程的节次名称（按节次表顺序）
+        """
+        busy = self._busy.get((week, weekday), 0)
+        return [name for key, _, name in PERIOD_TABLE if not busy & _periods_mask(_period_numbers(key))]
+
+    def next_class(self, week: int, weekday: int, after_period: int = 0) -> Optional[Tuple[int, int, CourseSession]]:
+        """
+        下一节课
+
+        Args:
+            week: 当前周次
+            weekday: 当前星期（1-7）
+            after_period: 当天已经过去的节次（0表示从当天第一节课开始查找）
+
+        Returns:
+            (周次, 星期, 课程)，之后没有课返回None
+        """
+        index = bisect_right(self._starts, (week, weekday, after_period))
+        if index >= len(self._starts):
+            return None
+        next_week, next_weekday, _ = self._starts[index]
+        return next_week, next_weekday, self._start_sessions[index]
+
+    def position(self, when: Optional[date] = None) -> Optional[Tuple[int, int]]:
+        """
+        日期对应的 (周次, 星期)
+
+        Args:
+            when: 日期，为空表示今天
+
+        Returns:
+            (周次, 星期)；未配置学期开始日期或日期在学期开始之前返回None
+        """
+        if self.semester_start is None:
+            return None
+        when = when or date.today()
+        if isinstance(when, datetime):
+            when = when.date()
+        days = (when - self.semester_start).days
+        if days < 0:
+            return None
+        return days // 7 + 1, days % 7 + 1
+
+    def today(self) -> List[CourseSession]:
+        """今天的课程（未配置学期开始日期时为空）"""
+        position = self.position()
+        return self.day(*position) if position else []
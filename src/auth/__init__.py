@@ -4,15 +4,22 @@
 """
 
 from .login import (
-    login, isValid, getname, auto_login,
-    refresh_session, get_session_with_auto_refresh
+    login, async_login, isValid, getname, auto_login,
+    refresh_session, get_session_with_auto_refresh, get_last_login_timings
 )
 from .credentials import get_login_credentials, clear_credentials
 from .session_manager import session_manager
+from .keepalive import session_keepalive, start_keepalive, stop_keepalive
+from .pacing import login_pacing
+from .rate_limit import rate_limiter
+from .circuit_breaker import circuit_breaker, CircuitOpenError
 
 __all__ = [
-    'login', 'isValid', 'getname', 'auto_login',
-    'refresh_session', 'get_session_with_auto_refresh',
+    'login', 'async_login', 'isValid', 'getname', 'auto_login',
+    'refresh_session', 'get_session_with_auto_refresh', 'get_last_login_timings',
     'get_login_credentials', 'clear_credentials',
-    'session_manager'
+    'session_manager',
+    'session_keepalive', 'start_keepalive', 'stop_keepalive',
+    'login_pacing', 'rate_limiter',
+    'circuit_breaker', 'CircuitOpenError'
 ]
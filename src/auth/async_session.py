@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步Session管理器
+
+基于httpx.AsyncClient为每个账号维护一个异步客户端，并通过信号量限制同时进行中的请求数，
+使一个事件循环可以同时为大量学生刷新数据。登录状态与同步的session_manager共享cookies。
+"""
+
+import asyncio
+import copy
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+import httpx
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.env_loader import env_loader
+from src.auth.session_manager import session_manager, SessionExpiredError, is_login_response
+from src.auth.transport import DEFAULT_HEADERS, classify_endpoint, get_timeout, transport_config
+from src.auth.rate_limit import rate_limiter
+from src.auth.circuit_breaker import circuit_breaker
+
+# 默认最大并发请求数
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+async def _apply_endpoint_timeout(request: httpx.Request):
+    """按接口类型设置请求的连接/读取超时（与同步传输层一致）"""
+    connect, read = get_timeout(str(request.url))
+    request.extensions['timeout'] = httpx.Timeout(read, connect=connect).as_dict()
+
+
+async def _apply_rate_limit(request: httpx.Request):
+    """发送前经过全局限流器（与同步传输层共享预算）"""
+    await rate_limiter.acquire_async(classify_endpoint(str(request.url)))
+
+
+class CircuitBreakerTransport(httpx.AsyncHTTPTransport):
+    """发送前检查熔断器，并把5xx响应和超时/连接错误计入熔断器的异步传输层"""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        probe = circuit_breaker.before_request()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            circuit_breaker.record_failure()
+            raise
+
+        circuit_breaker.record_response(response.status_code, probe)
+        return response
+
+
+class AsyncSessionManager:
+    """异步Session管理器"""
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self._max_concurrency = max(1, max_concurrency or env_loader.get_int('ASYNC_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+        self._clients: "OrderedDict[str, httpx.AsyncClient]" = OrderedDict()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._login_tasks: Dict[str, "asyncio.Task[bool]"] = {}
+
+    @property
+    def max_concurrency(self) -> int:
+        """最大并发请求数"""
+        return self._max_concurrency
+
+    @max_concurrency.setter
+    def max_concurrency(self, value: int):
+        # 新的并发上限在下一个事件循环或下一次重建信号量时生效
+        self._max_concurrency = max(1, int(value))
+        self._semaphore = None
+
+    def _bind_loop(self):
+        """
+        绑定当前事件循环
+
+        httpx客户端和信号量不能跨事件循环使用，事件循环变化时（如多次调用asyncio.run）
+        先把cookies写回同步会话池，再丢弃旧的客户端。
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            for account in list(self._clients):
+                self._store_cookies(account)
+            self._clients.clear()
+            self._login_tasks.clear()
+            self._semaphore = None
+            self._loop = loop
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+    def get_client(self, account: Optional[str] = None) -> httpx.AsyncClient:
+        """
+        获取账号的异步客户端，首次创建时从同步会话池复制cookies
+
+        Args:
+            account: 账号，为空表示默认账号
+
+        Returns:
+            账号的httpx.AsyncClient
+        """
+        self._bind_loop()
+        key = session_manager._resolve_account(account)
+
+        client = self._clients.get(key)
+        if client is not None:
+            self._clients.move_to_end(key)
+            return client
+
+        client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            transport=CircuitBreakerTransport(
+                retries=transport_config.max_retries,
+                limits=httpx.Limits(max_connections=self._max_concurrency),
+            ),
+            event_hooks={'request': [_apply_rate_limit, _apply_endpoint_timeout]},
+        )
+        self._load_cookies(key, client)
+        self._clients[key] = client
+
+        # 与同步会话池保持相同的容量上限
+        while len(self._clients) > session_manager.max_sessions:
+            evicted_key, evicted = self._clients.popitem(last=False)
+            self._store_cookies(evicted_key, evicted)
+            asyncio.ensure_future(evicted.aclose())
+
+        return client
+
+    def _load_cookies(self, account: str, client: httpx.AsyncClient):
+        """
+        从同步会话池复制cookies到异步客户端
+
+        逐个复制Cookie对象并保留domain和path：站点会在不同路径下设置同名cookie（如 / 和 /jsxsd 的JSESSIONID），
+        转换为字典会抛出CookieConflictError。
+        """
+        for cookie in session_manager.get_session(account).cookies:
+            client.cookies.jar.set_cookie(copy.copy(cookie))
+
+    def _store_cookies(self, account: str, client: Optional[httpx.AsyncClient] = None):
+        """将异步客户端的cookies写回同步会话池（与 _load_cookies 一样逐个复制Cookie对象）"""
+        client = client or self._clients.get(account)
+        if client is None:
+            return
+        jar = session_manager.get_session(account).cookies
+        for cookie in client.cookies.jar:
+            jar.set_cookie(copy.copy(cookie))
+
+    async def send(self, method: str, url: str, account: Optional[str] = None, **kwargs) -> httpx.Response:
+        """
+        在并发上限内发送请求（不检查登录状态）
+
+        Args:
+            method: HTTP方法
+            url: 请求地址
+            account: 账号，为空表示默认账号
+            **kwargs: 透传给httpx的参数
+
+        Returns:
+            响应对象
+        """
+        client = self.get_client(account)
+        async with self._semaphore:
+            return await client.request(method, url, **kwargs)
+
+    async def request(self, method: str, url: str, account: Optional[str] = None, **kwargs) -> httpx.Response:
+        """
+        乐观地直接请求目标地址，只有响应表明会话已失效时才重新登录并重放一次请求
+
+        Args:
+            method: HTTP方法
+            url: 请求地址
+            account: 账号，为空表示默认账号
+            **kwargs: 透传给httpx的参数
+
+        Returns:
+            响应对象
+
+        Raises:
+            SessionExpiredError: 会话失效且重新登录失败
+        """
+        key = session_manager._resolve_account(account)
+        state = session_manager._get_state(key)
+        client = self.get_client(key)
+
+        # 冷启动：客户端没有任何cookies时先尝试从文件恢复，仍没有则直接登录
+        if not state.is_logged_in and not client.cookies:
+            if session_manager.load_cookies(key):
+                self._load_cookies(key, client)
+            elif not await self._login(key):
+                raise SessionExpiredError(f"账号 {key} 未登录且自动登录失败")
+
+        response = await self.send(method, url, account=key, **kwargs)
+        if not is_login_response(str(response.url), response.text):
+            # 只有成功的响应才能证明会话有效，5xx维护页等不延长验证有效期
+            if response.status_code < 400:
+                session_manager._mark_valid(state)
+            return response
+
+        print(f"🔄 异步Session管理器：{key} 的会话已失效，重新登录后重放请求")
+        if not await self._login(key):
+            raise SessionExpiredError(f"账号 {key} 会话已失效且重新登录失败")
+
+        response = await self.send(method, url, account=key, **kwargs)
+        if is_login_response(str(response.url), response.text):
+            raise SessionExpiredError(f"账号 {key} 重新登录后仍被重定向到登录页")
+
+        if response.status_code < 400:
+            session_manager._mark_valid(state)
+        return response
+
+    async def is_session_valid(self, account: Optional[str] = None) -> bool:
+        """
+        检查账号的异步会话是否有效
+
+        Args:
+            account: 账号，为空表示默认账号
+
+        Returns:
+            session是否有效
+        """
+        try:
+            url = 'http://oa.csmu.edu.cn:8099/jsxsd/framework/xsMain.jsp'
+            response = await self.send('GET', url, account=account)
+            final_url = str(response.url)
+
+            if response.status_code != 200:
+                return False
+
+            if is_login_response(final_url, response.text):
+                session_manager.set_logged_out(account)
+                return False
+
+            if "姓名：" in response.text and "xsMain.jsp" in final_url:
+                session_manager._mark_valid(session_manager._get_state(account))
+                return True
+
+            session_manager.set_logged_out(account)
+            return False
+
+        except Exception as e:
+            print(f"❌ 异步Session管理器：验证session失败: {e}")
+            return False
+
+    async def _login(self, key: str) -> bool:
+        """
+        异步重新登录账号，同一账号的并发登录合并为一个任务
+
+        Args:
+            key: 账号
+
+        Returns:
+            是否登录成功
+        """
+        self._bind_loop()
+        task = self._login_tasks.get(key)
+        if task is not None and not task.done():
+            session_manager._record_login(coalesced=True)
+            return await asyncio.shield(task)
+
+        session_manager._record_login(coalesced=False)
+        task = asyncio.ensure_future(self._do_login(key))
+        self._login_tasks[key] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._login_tasks.get(key) is task and task.done():
+                del self._login_tasks[key]
+
+    async def _do_login(self, key: str) -> bool:
+        """使用缓存或环境变量中的凭据异步重新登录账号"""
+        print(f"🔄 异步Session管理器：尝试自动登录 {key}...")
+        username, password = session_manager._get_login_credentials(session_manager._get_state(key))
+        if username and password:
+            from src.auth.login import async_login
+            if await async_login(username, password):
+                return True
+
+        print("❌ 异步Session管理器：自动登录失败")
+        return False
+
+    async def ensure_logged_in(self, account: Optional[str] = None) -> bool:
+        """
+        确保账号已登录，如果未登录则尝试异步登录
+
+        Args:
+            account: 账号，为空表示默认账号
+
+        Returns:
+            是否成功登录
+        """
+        key = session_manager._resolve_account(account)
+        if session_manager._is_recently_validated(session_manager._get_state(key)):
+            return True
+
+        if await self.is_session_valid(key):
+            return True
+
+        # 尝试从cookies文件恢复
+        if session_manager.load_cookies(key):
+            self._load_cookies(key, self.get_client(key))
+            if await self.is_session_valid(key):
+                return True
+
+        return await self._login(key)
+
+    def save_cookies(self, account: Optional[str] = None) -> bool:
+        """将异步客户端的cookies写回同步会话池并持久化"""
+        key = session_manager._resolve_account(account)
+        self._store_cookies(key)
+        return session_manager.save_cookies(key)
+
+    async def aclose(self):
+        """关闭所有异步客户端"""
+        for account, client in list(self._clients.items()):
+            self._store_cookies(account, client)
+            await client.aclose()
+        self._clients.clear()
+
+
+# 全局异步session管理器实例
+async_session_manager = AsyncSessionManager()
+
+
+async def run_for_accounts(
+    fetcher: Callable[..., Awaitable[Any]],
+    accounts: List[str],
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    对多个账号并发执行同一个异步获取函数
+
+    Args:
+        fetcher: 接受account关键字参数的异步函数，如async_achievement
+        accounts: 账号列表
+        **kwargs: 透传给fetcher的其他参数
+
+    Returns:
+        账号到结果的映射，失败的账号对应异常对象
+    """
+    results = await asyncio.gather(
+        *(fetcher(account=account, **kwargs) for account in accounts),
+        return_exceptions=True
+    )
+    return dict(zip(accounts, results))
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上游熔断器
+
+教务系统维护或宕机时，连续的5xx响应和超时会使熔断器打开，之后的请求立即失败（CircuitOpenError），
+不再等待10-30秒的超时；调用方可以改用缓存数据。冷却时间过后只放行一个探测请求（半开状态），
+探测成功才恢复正常流量，失败则重新打开。
+"""
+
+import sys
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Dict, Any
+
+import requests
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.env_loader import env_loader
+
+# 熔断器状态
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 连续失败多少次后打开
+DEFAULT_FAILURE_THRESHOLD = 5
+
+# 打开后多久允许探测（秒）
+DEFAULT_RECOVERY_TIMEOUT = 30
+
+
+class CircuitOpenError(requests.RequestException):
+    """熔断器打开，请求未发送"""
+
+
+class CircuitBreaker:
+    """上游熔断器"""
+
+    def __init__(self, failure_threshold: Optional[int] = None, recovery_timeout: Optional[float] = None):
+        # 显式传入的0也有效，只有未传入时读取环境变量
+        if failure_threshold is None:
+            failure_threshold = env_loader.get_int('CIRCUIT_FAILURE_THRESHOLD', DEFAULT_FAILURE_THRESHOLD)
+        if recovery_timeout is None:
+            recovery_timeout = env_loader.get_float('CIRCUIT_RECOVERY_TIMEOUT', DEFAULT_RECOVERY_TIMEOUT)
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.enabled = env_loader.get_bool('CIRCUIT_BREAKER_ENABLED', True)
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = Lock()
+        self._stats = {"rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        """当前状态：closed / open / half_open"""
+        return self._state
+
+    def before_request(self) -> bool:
+        """
+        发送请求前检查熔断状态
+
+        Returns:
+            本次请求是否为半开状态下的探测请求（记录结果时传给 record_response）
+
+        Raises:
+            CircuitOpenError: 熔断器打开，或半开状态下已有探测请求在进行
+        """
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+
+            if self._state == OPEN:
+                remaining = self._opened_at + self.recovery_timeout - time.monotonic()
+                if remaining > 0:
+                    self._stats["rejected"] += 1
+                    raise CircuitOpenError(f"教务系统暂不可用，熔断器打开中（{remaining:.0f}秒后重试）")
+                # 冷却结束，放行一个探测请求
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._probe_in_flight:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError("教务系统暂不可用，正在探测恢复情况")
+
+            self._probe_in_flight = True
+            print("🔎 熔断器半开，发送探测请求...")
+            return True
+
+    def record_success(self, probe: bool = False) -> None:
+        """
+        记录一次成功的请求
+
+        Args:
+            probe: 是否为探测请求；熔断器未关闭时只有探测请求成功才关闭，
+                熔断器打开前就已发出的请求成功不能说明教务系统已恢复
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if self._state != CLOSED:
+                if not probe:
+                    return
+                print("✅ 教务系统已恢复，熔断器关闭")
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """记录一次失败的请求（5xx响应或超时/连接错误）"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._stats["opened"] += 1
+                    print(f"⚠️ 教务系统连续失败 {self._failures} 次，熔断器打开 {self.recovery_timeout:.0f} 秒")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def record_response(self, status_code: int, probe: bool = False) -> None:
+        """根据响应状态码记录结果（probe为 before_request 的返回值）"""
+        if status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success(probe)
+
+    def reset(self) -> None:
+        """手动关闭熔断器"""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取熔断器状态统计"""
+        return {
+            "enabled": self.enabled,
+            "state": self._state,
+            "consecutive_failures": self._failures,
+            "opened": self._stats["opened"],
+            "rejected": self._stats["rejected"],
+        }
+
+
+# 全局熔断器实例（所有账号共享同一个上游）
+circuit_breaker = CircuitBreaker()
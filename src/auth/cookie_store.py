@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cookies持久化存储模块
+
+按账号保存登录cookies，支持以下后端：
+- sqlite: 嵌入式SQLite数据库（WAL模式），默认后端
+- redis: 多个工作进程共享登录状态
+- json: 每个账号一个JSON文件（兼容旧的 data/cookies.json）
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Dict, Any, List
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.env_loader import env_loader
+
+# cookies有效期（秒）
+COOKIE_MAX_AGE = 24 * 3600
+
+
+def build_cookie_record(cookies: Dict[str, str], user_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """构造一条cookies记录（与旧版cookies.json格式一致）"""
+    return {
+        "cookies": cookies,
+        "timestamp": time.time(),
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "user_info": user_info or {}
+    }
+
+
+class CookieStore(ABC):
+    """cookies存储后端基类"""
+
+    name = "base"
+
+    @abstractmethod
+    def load(self, account: str) -> Optional[Dict[str, Any]]:
+        """读取账号的cookies记录，不存在返回None"""
+
+    @abstractmethod
+    def save(self, account: str, record: Dict[str, Any]) -> None:
+        """原子地写入账号的cookies记录"""
+
+    @abstractmethod
+    def delete(self, account: str) -> bool:
+        """删除账号的cookies记录，返回记录是否存在"""
+
+    @abstractmethod
+    def purge_expired(self, max_age: float = COOKIE_MAX_AGE) -> int:
+        """批量删除过期记录，返回删除数量"""
+
+    @abstractmethod
+    def accounts(self) -> List[str]:
+        """列出已保存cookies的账号"""
+
+
+class JsonCookieStore(CookieStore):
+    """JSON文件后端：默认账号使用 data/cookies.json，其他账号使用 data/cookies/<账号>.json"""
+
+    name = "json"
+
+    def __init__(self, data_dir: Optional[Path] = None, default_account: Optional[str] = None):
+        self.data_dir = Path(data_dir or project_root / "data")
+        self.default_account = default_account
+
+    def path_for(self, account: str) -> Path:
+        """获取账号对应的cookies文件路径"""
+        if account == (self.default_account or env_loader.get('EDU_USERNAME')):
+            return self.data_dir / "cookies.json"
+        safe_name = re.sub(r'[^0-9A-Za-z_.-]', '_', account)
+        return self.data_dir / "cookies" / f"{safe_name}.json"
+
+    def load(self, account: str) -> Optional[Dict[str, Any]]:
+        path = self.path_for(account)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        # 兼容旧格式（直接保存的cookies字典，没有时间戳）
+        if isinstance(data, dict) and "cookies" not in data:
+            return {"cookies": data, "timestamp": None, "created_at": "未知", "user_info": {}}
+        return data
+
+    def save(self, account: str, record: Dict[str, Any]) -> None:
+        path = self.path_for(account)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 先写临时文件再替换，避免并发写入或中途崩溃产生损坏的文件
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".cookies-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def delete(self, account: str) -> bool:
+        path = self.path_for(account)
+        if not path.exists():
+            return False
+        path.unlink()
+        return True
+
+    def _paths(self) -> List[Path]:
+        paths = list((self.data_dir / "cookies").glob("*.json"))
+        if (self.data_dir / "cookies.json").exists():
+            paths.append(self.data_dir / "cookies.json")
+        return paths
+
+    def purge_expired(self, max_age: float = COOKIE_MAX_AGE) -> int:
+        removed = 0
+        cutoff = time.time() - max_age
+        for path in self._paths():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    timestamp = json.load(f).get("timestamp") or 0
+                if timestamp < cutoff:
+                    path.unlink()
+                    removed += 1
+            except (OSError, ValueError, AttributeError):
+                continue
+        return removed
+
+    def accounts(self) -> List[str]:
+        return [
+            (self.default_account or env_loader.get('EDU_USERNAME') or "default") if path.name == "cookies.json" else path.stem
+            for path in self._paths()
+        ]
+
+
+class SqliteCookieStore(CookieStore):
+    """SQLite后端：单表按账号存储，WAL模式下读写互不阻塞"""
+
+    name = "sqlite"
+
+    def __init__(self, db_path: Optional[Path] = None, legacy_store: Optional[JsonCookieStore] = None):
+        self.db_path = Path(db_path or project_root / "data" / "sessions.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 从旧的JSON文件迁移：账号第一次读取时导入
+        self.legacy_store = legacy_store
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cookies ("
+            " account TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " timestamp REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cookies_timestamp ON cookies(timestamp)")
+
+    def load(self, account: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM cookies WHERE account = ?", (account,)).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+
+        if self.legacy_store is not None:
+            record = self.legacy_store.load(account)
+            if record is not None and record.get("timestamp"):
+                self.save(account, record)
+            return record
+        return None
+
+    def save(self, account: str, record: Dict[str, Any]) -> None:
+        data = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cookies (account, data, timestamp) VALUES (?, ?, ?) "
+                "ON CONFLICT(account) DO UPDATE SET data = excluded.data, timestamp = excluded.timestamp",
+                (account, data, record.get("timestamp") or time.time())
+            )
+
+    def delete(self, account: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM cookies WHERE account = ?", (account,))
+        if self.legacy_store is not None:
+            self.legacy_store.delete(account)
+        return cursor.rowcount > 0
+
+    def purge_expired(self, max_age: float = COOKIE_MAX_AGE) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM cookies WHERE timestamp < ?", (time.time() - max_age,))
+        return cursor.rowcount
+
+    def accounts(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT account FROM cookies ORDER BY account")]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisCookieStore(CookieStore):
+    """Redis后端：多个工作进程共享登录状态，过期由Redis的TTL自动完成"""
+
+    name = "redis"
+
+    def __init__(self, client=None, prefix: str = "qz:cookies:", max_age: float = COOKIE_MAX_AGE):
+        if client is None:
+            from database.redis1 import connect_redis
+            client = connect_redis()
+            if client is None:
+                raise ConnectionError("Redis连接失败，无法使用Redis cookies存储")
+        self._redis = client
+        self.prefix = prefix
+        self.max_age = max_age
+
+    def _key(self, account: str) -> str:
+        return f"{self.prefix}{account}"
+
+    def load(self, account: str) -> Optional[Dict[str, Any]]:
+        data = self._redis.get(self._key(account))
+        return json.loads(data) if data else None
+
+    def save(self, account: str, record: Dict[str, Any]) -> None:
+        age = time.time() - (record.get("timestamp") or time.time())
+        ttl = max(1, int(self.max_age - age))
+        self._redis.set(self._key(account), json.dumps(record, ensure_ascii=False), ex=ttl)
+
+    def delete(self, account: str) -> bool:
+        return bool(self._redis.delete(self._key(account)))
+
+    def purge_expired(self, max_age: float = COOKIE_MAX_AGE) -> int:
+        # 过期记录已由Redis的TTL删除
+        return 0
+
+    def accounts(self) -> List[str]:
+        keys = self._redis.scan_iter(match=f"{self.prefix}*")
+        return sorted(
+            (key.decode() if isinstance(key, bytes) else key)[len(self.prefix):]
+            for key in keys
+        )
+
+
+def create_cookie_store(backend: Optional[str] = None) -> CookieStore:
+    """
+    根据配置创建cookies存储后端
+
+    Args:
+        backend: sqlite / redis / json，为空时读取环境变量COOKIE_STORE（默认sqlite）
+
+    Returns:
+        cookies存储后端
+    """
+    backend = (backend or env_loader.get('COOKIE_STORE', 'sqlite')).lower()
+
+    if backend == 'redis':
+        try:
+            return RedisCookieStore()
+        except Exception as e:
+            print(f"⚠️ Redis cookies存储不可用，改用SQLite: {e}")
+            backend = 'sqlite'
+
+    if backend == 'json':
+        return JsonCookieStore()
+
+    db_path = env_loader.get('COOKIE_DB_PATH')
+    return SqliteCookieStore(Path(db_path) if db_path else None, legacy_store=JsonCookieStore())
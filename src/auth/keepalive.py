@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会话保活模块
+
+后台线程定期检查会话池中每个账号的登录时长和最后活动时间：
+空闲的会话发送轻量请求保持服务器端会话，接近过期的会话提前重新登录，
+使用户请求不必等待验证码识别和登录。
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+from threading import Event, Thread
+from typing import Optional, Dict, Any
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.env_loader import env_loader
+from src.auth.session_manager import session_manager, SessionManager
+from src.auth.circuit_breaker import circuit_breaker, OPEN
+
+# 会话登录后多久主动续期（秒），cookies有效期为24小时
+DEFAULT_REFRESH_AFTER = 22 * 3600
+
+# 随机提前续期的最大时长（秒），避免多个账号同时登录
+DEFAULT_REFRESH_JITTER = 600
+
+# 会话空闲多久后发送保活请求（秒）
+DEFAULT_PING_INTERVAL = 600
+
+# 后台检查间隔（秒）
+DEFAULT_CHECK_INTERVAL = 60
+
+# 批量清理过期cookies记录的间隔（秒）
+PURGE_INTERVAL = 3600
+
+
+class SessionKeepAlive:
+    """会话保活调度器"""
+
+    def __init__(
+        self,
+        manager: Optional[SessionManager] = None,
+        refresh_after: Optional[int] = None,
+        refresh_jitter: Optional[int] = None,
+        ping_interval: Optional[int] = None,
+        check_interval: Optional[int] = None
+    ):
+        self.manager = manager or session_manager
+        self.refresh_after = refresh_after or env_loader.get_int('SESSION_REFRESH_AFTER', DEFAULT_REFRESH_AFTER)
+        self.refresh_jitter = refresh_jitter if refresh_jitter is not None else env_loader.get_int('SESSION_REFRESH_JITTER', DEFAULT_REFRESH_JITTER)
+        self.ping_interval = ping_interval or env_loader.get_int('SESSION_PING_INTERVAL', DEFAULT_PING_INTERVAL)
+        self.check_interval = check_interval or env_loader.get_int('SESSION_KEEPALIVE_INTERVAL', DEFAULT_CHECK_INTERVAL)
+
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+        # 每个账号在每次登录后抽取一次随机提前量：account -> (logged_in_at, jitter)
+        self._jitters: Dict[str, tuple] = {}
+        self._last_purge = 0.0
+        self.stats = {"checks": 0, "pings": 0, "refreshes": 0, "failures": 0}
+
+    @property
+    def is_running(self) -> bool:
+        """后台线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动后台保活线程"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, name="session-keepalive", daemon=True)
+        self._thread.start()
+        print(f"🫀 会话保活已启动（每 {self.check_interval} 秒检查一次）")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """停止后台保活线程"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"⚠️ 会话保活检查失败: {e}")
+
+    def _refresh_deadline(self, account: str, logged_in_at: float) -> float:
+        """计算账号的续期时间点（登录时间 + 续期阈值 - 随机提前量）"""
+        cached = self._jitters.get(account)
+        if cached is None or cached[0] != logged_in_at:
+            cached = (logged_in_at, random.uniform(0, self.refresh_jitter))
+            self._jitters[account] = cached
+        return logged_in_at + self.refresh_after - cached[1]
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        检查一遍会话池中的所有账号
+
+        Returns:
+            本次检查的结果统计
+        """
+        now = time.time()
+        result = {"pinged": [], "refreshed": [], "failed": []}
+        self.stats["checks"] += 1
+
+        # 教务系统不可用时跳过本轮，避免保活请求失败导致会话被误判为失效
+        if circuit_breaker.state == OPEN:
+            result["skipped"] = True
+            return result
+
+        for account in self.manager.accounts():
+            state = self.manager._peek_state(account)
+            if state is None or not state.is_logged_in or not state.logged_in_at:
+                continue
+
+            if now >= self._refresh_deadline(account, state.logged_in_at):
+                print(f"🔄 会话保活：{account} 的会话即将过期，提前重新登录")
+                if self.manager.refresh_login(account):
+                    self.stats["refreshes"] += 1
+                    result["refreshed"].append(account)
+                else:
+                    self.stats["failures"] += 1
+                    result["failed"].append(account)
+                continue
+
+            idle = now - max(state.last_activity, state.validated_at)
+            if idle >= self.ping_interval:
+                self.stats["pings"] += 1
+                if self.manager.ping(account):
+                    result["pinged"].append(account)
+                elif self.manager.refresh_login(account):
+                    # 服务器端会话已失效，立即重新登录
+                    self.stats["refreshes"] += 1
+                    result["refreshed"].append(account)
+                else:
+                    self.stats["failures"] += 1
+                    result["failed"].append(account)
+
+        # 清理已被淘汰账号的随机提前量
+        for account in set(self._jitters) - set(self.manager.accounts()):
+            self._jitters.pop(account, None)
+
+        # 定期批量删除过期的cookies记录
+        if now - self._last_purge >= PURGE_INTERVAL:
+            self._last_purge = now
+            result["purged"] = self.manager.purge_expired_cookies()
+
+        return result
+
+
+# 全局会话保活实例
+session_keepalive = SessionKeepAlive()
+
+def start_keepalive() -> SessionKeepAlive:
+    """启动全局会话保活线程"""
+    session_keepalive.start()
+    return session_keepalive
+
+def stop_keepalive() -> None:
+    """停止全局会话保活线程"""
+    session_keepalive.stop()
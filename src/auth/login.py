@@ -1,19 +1,20 @@
 import requests
 import re
-import json
 import sys
-import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, Tuple
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from utils.conwork import encodeInp
-from utils.code1 import code_ocr
+from utils.code1 import code_ocr, async_code_ocr
+from utils.captcha_feedback import captcha_feedback, ACCEPTED, REJECTED
 from src.auth.credentials import get_login_credentials
 from src.auth.session_manager import session_manager
+from src.auth.pacing import LoginPacing, LoginTimings, login_pacing
+from src.auth.circuit_breaker import CircuitOpenError, circuit_breaker, OPEN
 
 # 全局变量存储登录凭据（仅在内存中，不持久化）
 _cached_credentials = {
@@ -37,131 +38,298 @@ def get_credentials() -> tuple[Optional[str], Optional[str]]:
     """获取缓存的登录凭据"""
     return _cached_credentials["username"], _cached_credentials["password"]
 
-def login(username: str, password: str, max_retries: int = 3) -> Optional[requests.Session]:
+LOGIN_URL = 'http://oa.csmu.edu.cn:8099/jsxsd/xk/LoginToXk'
+MAIN_URL = "http://oa.csmu.edu.cn:8099/jsxsd/framework/xsMain.jsp"
+
+# 每个账号最近一次登录的分阶段耗时
+_last_login_timings: Dict[str, Dict[str, float]] = {}
+
+
+def get_last_login_timings(account: Optional[str] = None) -> Optional[Dict[str, float]]:
+    """
+    获取最近一次登录的分阶段耗时
+
+    Args:
+        account: 账号，为空表示默认账号
+
+    Returns:
+        {'warmup': 秒, 'captcha_fetch': 秒, 'ocr': 秒, 'post': 秒, 'total': 秒}，未登录过返回None
+    """
+    account = account or session_manager._default_account()
+    return _last_login_timings.get(account)
+
+
+def _record_timings(username: str, timings: LoginTimings) -> None:
+    """记录并输出本次登录的分阶段耗时"""
+    _last_login_timings[username] = timings.finish()
+    print(f"⏱️ 登录耗时: {timings.format()}")
+
+
+def _build_login_data(username: str, password: str, code: str) -> Dict[str, str]:
+    """编码用户名和密码，准备登录表单"""
+    account = encodeInp(username)
+    passwd = encodeInp(password)
+    return {
+        "userAccount": account,
+        "userPassword": passwd,
+        "encoded": account + "%%%" + passwd,
+        "RANDOMCODE": code
+    }
+
+
+def _classify_login_response(status_code: int, final_url: str, text: str) -> Tuple[str, str]:
+    """
+    根据服务器响应判断登录结果，决定是否以及如何重试
+
+    Args:
+        status_code: 响应状态码
+        final_url: 重定向后的最终地址
+        text: 响应内容
+
+    Returns:
+        (结果, 说明)，结果为以下之一：
+        success 登录成功；captcha 验证码错误，立即重试；credentials 用户名或密码错误，不重试；
+        maintenance 服务器维护，不重试；server_error 限流或服务器异常，退避后重试；unknown 未知错误
+    """
+    if status_code == 503 or '503 Service Unavailable' in text:
+        return 'maintenance', '服务器维护中'
+
+    if status_code == 429 or status_code >= 500:
+        return 'server_error', f'服务器响应异常: {status_code}'
+
+    if status_code != 200:
+        return 'unknown', f'服务器响应异常: {status_code}'
+
+    if final_url == MAIN_URL:
+        return 'success', ''
+
+    if "login" in final_url.lower():
+        # 重定向回登录页面，可能是验证码错误或用户名密码错误
+        error_message = re.findall(r'<font.*?color.*?>(.*?)</font>', text)
+        if not error_message:
+            return 'unknown', '登录失败，未知错误'
+
+        error_text = error_message[0].strip()
+        if "验证码" in error_text or "RANDOMCODE" in error_text:
+            return 'captcha', error_text
+        return 'credentials', error_text
+
+    return 'unknown', f'登录重定向异常: {final_url}'
+
+
+def _record_captcha_verdict(username: str, outcome: str, attempt: int) -> None:
+    """把服务器对验证码的判定记入反馈记录，无法判断验证码对错的结果丢弃"""
+    if outcome == 'success':
+        captcha_feedback.record(username, ACCEPTED, attempt)
+    elif outcome == 'captcha':
+        captcha_feedback.record(username, REJECTED, attempt)
+    else:
+        captcha_feedback.discard(username)
+
+
+def _on_login_success(username: str, password: str) -> None:
+    """缓存凭据并更新session管理器状态"""
+    # 缓存凭据用于重新登录
+    set_credentials(username, password)
+    session_manager.set_credentials(username, password)
+
+    # 更新session管理器状态
+    session_manager.set_logged_in({"username": username}, account=username)
+
+
+def login(username: str, password: str, max_retries: int = 3,
+          pacing: Optional[LoginPacing] = None) -> Optional[requests.Session]:
     """
     用户登录函数
 
+    重试节奏由服务器响应决定：验证码错误立即重试，限流/服务器异常/超时按退避等待，
+    用户名密码错误或服务器维护直接返回。各阶段耗时可通过 get_last_login_timings() 获取。
+
     Args:
         username: 用户名
         password: 密码
         max_retries: 最大重试次数
+        pacing: 登录节奏配置，为空时使用全局配置（LOGIN_FAST_MODE）
 
     Returns:
         成功返回session对象，失败返回None
     """
-    url = 'http://oa.csmu.edu.cn:8099/jsxsd/xk/LoginToXk'
+    pacing = pacing or login_pacing
+    timings = LoginTimings()
 
-    for attempt in range(max_retries):
-        try:
-            print(f"🔐 登录尝试 {attempt + 1}/{max_retries}")
+    # 使用会话池中该账号独立的session
+    session = session_manager.get_session(username)
 
-            # 获取验证码
-            print("正在获取验证码...")
-            code = code_ocr(username, session_manager.session)
-            if not code:
-                print(f"❌ 验证码获取失败 (尝试 {attempt + 1}/{max_retries})")
-                if attempt < max_retries - 1:
-                    import random
-                    delay = random.uniform(5, 10)  # 5-10秒随机延迟
-                    print(f"⏳ 等待 {delay:.1f} 秒后重试...")
-                    time.sleep(delay)
-                    continue
-                else:
+    try:
+        for attempt in range(max_retries):
+            try:
+                print(f"🔐 登录尝试 {attempt + 1}/{max_retries}")
+
+                # 获取验证码
+                print("正在获取验证码...")
+                code = code_ocr(username, session, pacing=pacing, timings=timings)
+                if not code:
+                    print(f"❌ 验证码获取失败 (尝试 {attempt + 1}/{max_retries})")
+                    if circuit_breaker.state == OPEN:
+                        print("⚠️ 教务系统暂不可用，停止登录")
+                        return None
+                    if attempt < max_retries - 1:
+                        pacing.wait(pacing.delay('ocr_failed'))
+                        continue
                     print("❌ 验证码获取失败，已达到最大重试次数")
                     return None
 
-            # 编码用户名和密码
-            account = encodeInp(username)
-            passwd = encodeInp(password)
-            encoded = account + "%%%" + passwd
-
-            # 准备登录数据
-            data = {
-                "userAccount": account,
-                "userPassword": passwd,
-                "encoded": encoded,
-                "RANDOMCODE": code
-            }
-
-            print(f"正在登录... (验证码: {code})")
-            res = session_manager.session.post(url=url, data=data, timeout=10)
-
-            # 检查响应状态
-            if res.status_code == 200:
-                # 检查是否成功重定向到主页
-                if res.url == "http://oa.csmu.edu.cn:8099/jsxsd/framework/xsMain.jsp":
-                    print("✅ 登录成功！")
+                print(f"正在登录... (验证码: {code})")
+                with timings.stage('post'):
+                    res = session.post(url=LOGIN_URL, data=_build_login_data(username, password, code))
 
-                    # 缓存凭据用于重新登录
-                    set_credentials(username, password)
+                outcome, message = _classify_login_response(res.status_code, res.url, res.text)
+                _record_captcha_verdict(username, outcome, attempt)
 
-                    # 更新session管理器状态
-                    session_manager.set_logged_in({"username": username})
+                if outcome == 'success':
+                    print("✅ 登录成功！")
+                    _on_login_success(username, password)
 
-                    # 保存cookies到文件
-                    if session_manager.save_cookies():
+                    # 保存cookies
+                    if session_manager.save_cookies(username):
                         print("✅ Cookies已保存")
 
-                    return session_manager.session
-
-                elif "login" in res.url.lower():
-                    # 重定向回登录页面，可能是验证码错误或用户名密码错误
-                    error_message = re.findall(r'<font.*?color.*?>(.*?)</font>', res.text)
-                    if error_message:
-                        error_text = error_message[0].strip()
-                        print(f"❌ 登录失败: {error_text}")
-
-                        # 如果是验证码错误，可以重试
-                        if "验证码" in error_text or "RANDOMCODE" in error_text:
-                            if attempt < max_retries - 1:
-                                print("🔄 验证码错误，重新尝试...")
-                                time.sleep(1)
-                                continue
-                        else:
-                            # 用户名密码错误，不需要重试
-                            print("❌ 用户名或密码错误，请检查凭据")
-                            return None
+                    return session
+
+                if outcome == 'maintenance':
+                    print("⚠️ 服务器维护中，请稍后再试")
+                    return None
+
+                print(f"❌ 登录失败: {message}")
+
+                if outcome == 'credentials':
+                    # 用户名密码错误，不需要重试
+                    print("❌ 用户名或密码错误，请检查凭据")
+                    return None
+
+                if attempt < max_retries - 1:
+                    if outcome == 'captcha':
+                        print("🔄 验证码错误，重新尝试...")
+                        pacing.wait(pacing.delay('captcha_wrong'))
+                    elif outcome == 'server_error':
+                        pacing.wait(pacing.backoff(attempt, res))
                     else:
-                        print("❌ 登录失败，未知错误")
-                        if attempt < max_retries - 1:
-                            time.sleep(1)
-                            continue
-                else:
-                    print(f"❌ 登录重定向异常: {res.url}")
+                        pacing.wait(pacing.delay('unknown'))
+
+            except CircuitOpenError as e:
+                # 教务系统不可用，重试没有意义
+                print(f"⚠️ {e}")
+                return None
+
+            except requests.exceptions.Timeout:
+                print(f"⏰ 登录请求超时 (尝试 {attempt + 1}/{max_retries})")
+                if attempt < max_retries - 1:
+                    pacing.wait(pacing.backoff(attempt))
+
+            except requests.exceptions.RequestException as e:
+                print(f"🌐 网络请求异常: {e}")
+                if attempt < max_retries - 1:
+                    pacing.wait(pacing.backoff(attempt))
+
+            except Exception as e:
+                print(f"❌ 登录过程中发生异常: {e}")
+                if attempt < max_retries - 1:
+                    pacing.wait(pacing.delay('unknown'))
+
+        print(f"❌ 登录失败，已尝试 {max_retries} 次")
+        return None
+
+    finally:
+        _record_timings(username, timings)
+
+async def async_login(username: str, password: str, max_retries: int = 3,
+                      pacing: Optional[LoginPacing] = None) -> bool:
+    """
+    异步用户登录函数
+
+    使用异步Session管理器中该账号的httpx客户端完成验证码识别和登录，
+    登录成功后cookies会写回同步会话池并持久化。重试节奏与 login() 相同。
+
+    Args:
+        username: 用户名
+        password: 密码
+        max_retries: 最大重试次数
+        pacing: 登录节奏配置，为空时使用全局配置
+
+    Returns:
+        是否登录成功
+    """
+    import asyncio
+    from src.auth.async_session import async_session_manager
+
+    pacing = pacing or login_pacing
+    timings = LoginTimings()
+    client = async_session_manager.get_client(username)
+
+    try:
+        for attempt in range(max_retries):
+            try:
+                print(f"🔐 [{username}] 异步登录尝试 {attempt + 1}/{max_retries}")
+
+                code = await async_code_ocr(username, client, pacing=pacing, timings=timings)
+                if not code:
+                    print(f"❌ 验证码获取失败 (尝试 {attempt + 1}/{max_retries})")
+                    if circuit_breaker.state == OPEN:
+                        print("⚠️ 教务系统暂不可用，停止登录")
+                        return False
                     if attempt < max_retries - 1:
-                        time.sleep(1)
+                        await asyncio.sleep(pacing.delay('ocr_failed'))
                         continue
+                    print("❌ 验证码获取失败，已达到最大重试次数")
+                    return False
 
-            elif res.status_code == 503 or '503 Service Unavailable' in res.text:
-                print("⚠️ 服务器维护中，请稍后再试")
-                return None
+                with timings.stage('post'):
+                    res = await async_session_manager.send(
+                        'POST', LOGIN_URL, account=username,
+                        data=_build_login_data(username, password, code)
+                    )
+
+                outcome, message = _classify_login_response(res.status_code, str(res.url), res.text)
+                _record_captcha_verdict(username, outcome, attempt)
+
+                if outcome == 'success':
+                    print(f"✅ [{username}] 异步登录成功！")
+                    _on_login_success(username, password)
+                    async_session_manager.save_cookies(username)
+                    return True
+
+                if outcome == 'maintenance':
+                    print("⚠️ 服务器维护中，请稍后再试")
+                    return False
+
+                print(f"❌ 登录失败: {message}")
 
-            else:
-                print(f"❌ 服务器响应异常: {res.status_code}")
+                if outcome == 'credentials':
+                    # 用户名密码错误，不需要重试
+                    return False
+
+                if attempt < max_retries - 1:
+                    if outcome == 'captcha':
+                        await asyncio.sleep(pacing.delay('captcha_wrong'))
+                    elif outcome == 'server_error':
+                        await asyncio.sleep(pacing.backoff(attempt, res))
+                    else:
+                        await asyncio.sleep(pacing.delay('unknown'))
+
+            except CircuitOpenError as e:
+                print(f"⚠️ {e}")
+                return False
+
+            except Exception as e:
+                print(f"❌ 异步登录过程中发生异常: {e}")
                 if attempt < max_retries - 1:
-                    time.sleep(2)
-                    continue
-
-        except requests.exceptions.Timeout:
-            print(f"⏰ 登录请求超时 (尝试 {attempt + 1}/{max_retries})")
-            if attempt < max_retries - 1:
-                time.sleep(2)
-                continue
-
-        except requests.exceptions.RequestException as e:
-            print(f"🌐 网络请求异常: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2)
-                continue
-
-        except Exception as e:
-            print(f"❌ 登录过程中发生异常: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(1)
-                continue
-
-    print(f"❌ 登录失败，已尝试 {max_retries} 次")
-    return None
+                    await asyncio.sleep(pacing.backoff(attempt))
+
+        print(f"❌ 异步登录失败，已尝试 {max_retries} 次")
+        return False
+
+    finally:
+        _record_timings(username, timings)
 
 # save_cookies 函数已移至 session_manager.py，避免重复代码
 
@@ -169,16 +337,19 @@ def login(username: str, password: str, max_retries: int = 3) -> Optional[reques
 
 # is_cookie_valid 函数已移至 session_manager.py，避免重复代码
 
-def refresh_session() -> Optional[requests.Session]:
+def refresh_session(account: Optional[str] = None) -> Optional[requests.Session]:
     """
     刷新会话 - 使用session管理器
 
+    Args:
+        account: 账号，为空表示默认账号
+
     Returns:
         有效的session对象或None
     """
     try:
-        if session_manager.ensure_logged_in():
-            return session_manager.session
+        if session_manager.ensure_logged_in(account):
+            return session_manager.get_session(account)
         else:
             return None
 
@@ -186,31 +357,24 @@ def refresh_session() -> Optional[requests.Session]:
         print(f"❌ 刷新会话失败: {e}")
         return None
 
-def getname() -> Optional[str]:
-    """获取用户姓名"""
-    session_obj = isValid()  # 确保会话有效
-    if session_obj:
-        url = 'http://oa.csmu.edu.cn:8099/jsxsd/framework/xsMain.jsp'
-        try:
-            res = session_obj.get(url)
-            if res.status_code == 200:
-                name_match = re.findall('姓名：(.*?)<br/>', res.text)
-                if name_match:
-                    name = name_match[0]
-                    print(f"获取到用户姓名: {name}")
-                    return name
-        except Exception as e:
-            print(f"获取用户姓名失败: {e}")
-    return None
-
-def isValid() -> Optional[requests.Session]:
+def getname(account: Optional[str] = None) -> Optional[str]:
+    """获取用户姓名（直接请求主页，会话失效时自动重新登录）"""
+    name = session_manager.get_user_name(account)
+    if name:
+        print(f"获取到用户姓名: {name}")
+    return name
+
+def isValid(account: Optional[str] = None) -> Optional[requests.Session]:
     """
     检查当前会话是否有效，如果无效则尝试刷新
 
+    Args:
+        account: 账号，为空表示默认账号
+
     Returns:
         有效的session对象或None
     """
-    return refresh_session()
+    return refresh_session(account)
 
 
 def auto_login() -> Optional[requests.Session]:
@@ -234,34 +398,36 @@ def auto_login() -> Optional[requests.Session]:
         return None
 
 
-def get_session_with_auto_refresh() -> Optional[requests.Session]:
+def get_session_with_auto_refresh(account: Optional[str] = None) -> Optional[requests.Session]:
     """
     获取会话，如果cookie即将过期则自动刷新
 
+    会话年龄取自session管理器的内存状态，不再每次读取cookies文件。
+    后台保活线程（src.auth.keepalive）启动后通常会在此之前完成续期。
+
+    Args:
+        account: 账号，为空表示默认账号
+
     Returns:
         有效的session对象或None
     """
     try:
-        cookies_file = project_root / "data" / "cookies.json"
-        if cookies_file.exists():
-            with open(cookies_file, 'r', encoding='utf-8') as f:
-                cookies_data = json.load(f)
-
-            if isinstance(cookies_data, dict) and "timestamp" in cookies_data:
-                timestamp = cookies_data.get("timestamp", 0)
-                current_time = time.time()
-
-                # 如果cookie在2小时内过期，提前刷新
-                if current_time - timestamp > 22 * 3600:  # 22小时后刷新
-                    print("🔄 Cookie即将过期，提前刷新...")
-                    return refresh_session()
+        from src.auth.keepalive import session_keepalive
+
+        age = session_manager.session_age(account)
+        # 如果cookie在2小时内过期，提前刷新
+        if age is not None and age > session_keepalive.refresh_after:
+            print("🔄 Cookie即将过期，提前刷新...")
+            if session_manager.refresh_login(account):
+                return session_manager.get_session(account)
+            return None
 
         # 正常检查会话有效性
-        return isValid()
+        return isValid(account)
 
     except Exception as e:
         print(f"❌ 自动刷新检查失败: {e}")
-        return isValid()
+        return isValid(account)
 
 
 # clear_cookies 函数已移至 session_manager.py，避免重复代码
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+登录节奏控制
+
+快速模式下登录流程不再插入固定的随机等待：仅在cookie中没有JSESSIONID时预热首页，
+验证码错误立即重试，只有服务器返回限流、5xx或超时时才按指数退避（优先使用Retry-After）。
+快速模式需要通过 LOGIN_FAST_MODE=true 开启，默认保持原有的随机延迟。同时记录每次登录各阶段耗时。
+"""
+
+import random
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Tuple
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.env_loader import env_loader
+
+# 慢速模式（原有行为）下各类等待的随机区间，单位秒
+LEGACY_DELAYS: Dict[str, Tuple[float, float]] = {
+    'warmup': (1.5, 3),          # 访问首页后
+    'captcha_retry': (3, 8),     # 验证码获取/识别失败后重新获取
+    'ocr_failed': (5, 10),       # 验证码多次识别失败后重新登录
+    'captcha_wrong': (1, 1),     # 服务器提示验证码错误
+    'unknown': (1, 1),           # 未知的登录失败
+}
+
+# 慢速模式下服务器异常/超时后的固定等待
+LEGACY_BACKOFF = 2
+
+# 快速模式下指数退避的基数和上限（秒）
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 8.0
+
+# 阶段耗时的输出顺序
+STAGES = ('warmup', 'captcha_fetch', 'ocr', 'post')
+
+
+class LoginPacing:
+    """登录重试节奏"""
+
+    def __init__(
+        self,
+        fast_mode: Optional[bool] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None
+    ):
+        self.fast_mode = fast_mode if fast_mode is not None else env_loader.get_bool('LOGIN_FAST_MODE', False)
+        self.backoff_base = backoff_base if backoff_base is not None else env_loader.get_float('LOGIN_BACKOFF_BASE', DEFAULT_BACKOFF_BASE)
+        self.backoff_max = backoff_max if backoff_max is not None else env_loader.get_float('LOGIN_BACKOFF_MAX', DEFAULT_BACKOFF_MAX)
+
+    def delay(self, kind: str) -> float:
+        """
+        获取某类等待的时长
+
+        Args:
+            kind: warmup / captcha_retry / ocr_failed / captcha_wrong / unknown
+
+        Returns:
+            等待秒数，快速模式下为0
+        """
+        if self.fast_mode:
+            return 0.0
+        low, high = LEGACY_DELAYS.get(kind, (1, 1))
+        return random.uniform(low, high)
+
+    def backoff(self, attempt: int, response=None) -> float:
+        """
+        服务器异常或超时后的等待时长
+
+        Args:
+            attempt: 当前尝试序号（从0开始）
+            response: 服务器响应，包含Retry-After时优先使用
+
+        Returns:
+            等待秒数
+        """
+        if not self.fast_mode:
+            return LEGACY_BACKOFF
+
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return min(self.backoff_base * (2 ** attempt), self.backoff_max)
+
+    def wait(self, seconds: float) -> None:
+        """同步等待"""
+        if seconds > 0:
+            print(f"⏳ 等待 {seconds:.1f} 秒后重试...")
+            time.sleep(seconds)
+
+
+class LoginTimings:
+    """单次登录的分阶段耗时"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.started_at = time.perf_counter()
+        self.total: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """统计一个阶段的耗时，同一阶段多次执行时累加"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def finish(self) -> Dict[str, float]:
+        """结束计时并返回各阶段耗时"""
+        self.total = time.perf_counter() - self.started_at
+        return self.as_dict()
+
+    def as_dict(self) -> Dict[str, float]:
+        """各阶段耗时（秒），包含总耗时"""
+        result = {name: round(self.stages[name], 3) for name in STAGES if name in self.stages}
+        if self.total is not None:
+            result['total'] = round(self.total, 3)
+        return result
+
+    def format(self) -> str:
+        """格式化为单行文本"""
+        return ' '.join(f"{name}={seconds:.2f}s" for name, seconds in self.as_dict().items())
+
+
+# 全局登录节奏配置
+login_pacing = LoginPacing()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上游请求限流
+
+进程级令牌桶限流器，由传输层对发往教务系统的每个请求统一调用。
+登录/验证码接口与数据接口使用独立的预算；可选Redis后端，使多个工作进程共享同一预算。
+
+令牌桶采用预约语义：reserve() 立即扣除令牌并返回需要等待的时长（令牌可以透支），
+同步请求用 time.sleep 等待，异步请求用 asyncio.sleep 等待，不阻塞事件循环。
+"""
+
+import sys
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Dict, Any
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.env_loader import env_loader
+
+# 接口类型（见 transport.classify_endpoint）到限流预算的映射
+BUDGET_BY_KIND = {
+    'login': 'login',
+    'captcha': 'login',
+    'page': 'data',
+    'data': 'data',
+}
+
+# 各预算默认的 (每秒令牌数, 桶容量)
+DEFAULT_BUDGETS = {
+    'login': (1.0, 3),
+    'data': (5.0, 10),
+}
+
+# Redis键前缀
+REDIS_PREFIX = "qz:ratelimit:"
+
+# Redis令牌桶脚本：按经过的时间补充令牌后扣除请求的数量，返回需要等待的毫秒数
+REDIS_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1])
+local updated_at = tonumber(state[2])
+if tokens == nil then
+    tokens = burst
+    updated_at = now
+end
+
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+tokens = tokens - requested
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+
+if tokens >= 0 then
+    return 0
+end
+return math.ceil(-tokens / rate * 1000)
+"""
+
+
+class TokenBucket:
+    """进程内令牌桶"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = Lock()
+
+    def reserve(self, tokens: int = 1) -> float:
+        """
+        预约令牌
+
+        Args:
+            tokens: 需要的令牌数
+
+        Returns:
+            需要等待的秒数，0表示立即可用
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RedisTokenBucket:
+    """Redis令牌桶：多个进程共享同一预算，补充和扣除在Lua脚本中原子完成"""
+
+    def __init__(self, client, key: str, rate: float, burst: int):
+        self._redis = client
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self._script = client.register_script(REDIS_BUCKET_SCRIPT)
+
+    def reserve(self, tokens: int = 1) -> float:
+        """
+        预约令牌
+
+        Args:
+            tokens: 需要的令牌数
+
+        Returns:
+            需要等待的秒数，0表示立即可用
+        """
+        wait_ms = self._script(keys=[self.key], args=[self.rate, self.burst, time.time(), tokens])
+        return int(wait_ms) / 1000
+
+
+class RateLimiter:
+    """按预算分组的上游请求限流器"""
+
+    def __init__(self, enabled: Optional[bool] = None, backend: Optional[str] = None):
+        self.enabled = enabled if enabled is not None else env_loader.get_bool('RATE_LIMIT_ENABLED', True)
+        self.backend = (backend or env_loader.get('RATE_LIMIT_BACKEND', 'memory')).lower()
+        self._buckets: Optional[Dict[str, Any]] = None
+        self._lock = Lock()
+        self._stats_lock = Lock()
+        self._stats = {name: {"requests": 0, "throttled": 0, "waited": 0.0} for name in DEFAULT_BUDGETS}
+
+    def _load_budgets(self) -> Dict[str, tuple]:
+        """读取各预算配置：RATE_LIMIT_<预算>_RATE 每秒令牌数，RATE_LIMIT_<预算>_BURST 桶容量"""
+        budgets = {}
+        for name, (rate, burst) in DEFAULT_BUDGETS.items():
+            rate = env_loader.get_float(f'RATE_LIMIT_{name.upper()}_RATE', rate)
+            burst = env_loader.get_int(f'RATE_LIMIT_{name.upper()}_BURST', burst)
+            budgets[name] = (max(rate, 0.01), max(burst, 1))
+        return budgets
+
+    def _create_buckets(self) -> Dict[str, Any]:
+        """按配置创建令牌桶，Redis不可用时回退为进程内令牌桶"""
+        budgets = self._load_budgets()
+
+        if self.backend == 'redis':
+            try:
+                from database.redis1 import connect_redis
+                client = connect_redis()
+                if client is None:
+                    raise ConnectionError("Redis连接失败")
+                return {
+                    name: RedisTokenBucket(client, f"{REDIS_PREFIX}{name}", rate, burst)
+                    for name, (rate, burst) in budgets.items()
+                }
+            except Exception as e:
+                print(f"⚠️ Redis限流不可用，改用进程内限流: {e}")
+                self.backend = 'memory'
+
+        return {name: TokenBucket(rate, burst) for name, (rate, burst) in budgets.items()}
+
+    @property
+    def buckets(self) -> Dict[str, Any]:
+        """各预算的令牌桶（首次使用时创建）"""
+        if self._buckets is None:
+            with self._lock:
+                if self._buckets is None:
+                    self._buckets = self._create_buckets()
+        return self._buckets
+
+    def reserve(self, kind: str) -> float:
+        """
+        为一次请求预约令牌
+
+        Args:
+            kind: 接口类型 login / captcha / page / data
+
+        Returns:
+            发送请求前需要等待的秒数
+        """
+        if not self.enabled:
+            return 0.0
+
+        budget = BUDGET_BY_KIND.get(kind, 'data')
+        try:
+            wait = self.buckets[budget].reserve()
+        except Exception as e:
+            # 限流后端异常不影响请求本身
+            print(f"⚠️ 限流检查失败: {e}")
+            return 0.0
+
+        with self._stats_lock:
+            stats = self._stats[budget]
+            stats["requests"] += 1
+            if wait > 0:
+                stats["throttled"] += 1
+                stats["waited"] += wait
+        return wait
+
+    def acquire(self, kind: str) -> float:
+        """
+        同步获取令牌，必要时阻塞等待
+
+        Args:
+            kind: 接口类型
+
+        Returns:
+            实际等待的秒数
+        """
+        wait = self.reserve(kind)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, kind: str) -> float:
+        """
+        异步获取令牌，等待期间不阻塞事件循环
+
+        Args:
+            kind: 接口类型
+
+        Returns:
+            实际等待的秒数
+        """
+        import asyncio
+
+        wait = self.reserve(kind)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取各预算的请求数、被限流次数和累计等待时长"""
+        with self._stats_lock:
+            budgets = {
+                name: dict(stats, waited=round(stats["waited"], 3))
+                for name, stats in self._stats.items()
+            }
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend,
+            "budgets": budgets,
+        }
+
+    def reset(self) -> None:
+        """重新读取配置并重建令牌桶"""
+        with self._lock:
+            self._buckets = None
+
+
+# 全局限流器实例
+rate_limiter = RateLimiter()
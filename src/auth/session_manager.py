@@ -3,24 +3,87 @@
 """
 全局Session管理器
 
-提供整个项目的统一session管理，确保所有模块共享同一个登录状态。
+提供整个项目的统一session管理。每个账号拥有独立的session、cookies记录和登录状态，
+由一个带LRU淘汰的会话池统一管理，使同一进程可以同时为多个用户提供服务。
 """
 
 import requests
 import time
-import json
+import re
 import sys
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict, Any
-from threading import Lock
+from typing import Optional, Dict, Any, List, Tuple
+from threading import Event, Lock, RLock
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.utils.env_loader import env_loader
+from src.auth.cookie_store import CookieStore, COOKIE_MAX_AGE, build_cookie_record, create_cookie_store
+from src.auth.transport import DEFAULT_HEADERS, create_session, release_session
+
+# 未配置EDU_USERNAME时默认账号使用的键
+DEFAULT_ACCOUNT = "default"
+
+# 会话池默认容量
+DEFAULT_MAX_SESSIONS = 32
+
+# 会话验证通过后免于再次验证的时间（秒）
+DEFAULT_VALIDATION_TTL = 300
+
+# 等待其他线程登录结果的最长时间（秒）
+LOGIN_WAIT_TIMEOUT = 120
+
+# 登录页表单字段，出现在响应中说明会话已失效
+LOGIN_PAGE_MARKERS = ('name="RANDOMCODE"', "name='RANDOMCODE'")
+
+class SessionExpiredError(requests.RequestException):
+    """会话已失效且重新登录失败"""
+
+
+def is_login_response(url: str, text: str = '') -> bool:
+    """
+    根据响应判断会话是否已失效（被重定向到登录页或返回了登录表单）
+
+    Args:
+        url: 响应的最终URL
+        text: 响应正文
+
+    Returns:
+        是否为登录页响应
+    """
+    if "login" in url.lower() or "verifycode" in url:
+        return True
+    return any(marker in text for marker in LOGIN_PAGE_MARKERS)
+
+
+class AccountSession:
+    """单个账号的会话状态"""
+
+    def __init__(self, account: str):
+        self.account = account
+        self.session = create_session()
+        self.is_logged_in = False
+        self.logged_in_at = 0.0
+        self.validated_at = 0.0
+        self.last_activity = 0.0
+        self.user_info: Dict[str, Any] = {}
+        # 仅保存在内存中，用于会话失效后自动重新登录
+        self.password: Optional[str] = None
+
+
+class _LoginFlight:
+    """一次进行中的登录，其他线程等待它的结果而不是各自登录"""
+
+    def __init__(self):
+        self.done = Event()
+        self.result = False
+
 
 class SessionManager:
-    """全局Session管理器 - 单例模式"""
+    """全局Session管理器 - 单例模式，内部按账号维护会话池"""
     
     _instance = None
     _lock = Lock()
@@ -34,308 +97,627 @@ class SessionManager:
     
     def __init__(self):
         if not hasattr(self, 'initialized'):
-            self._session = requests.Session()
-            self._is_logged_in = False
-            self._last_activity = 0
-            self._user_info = {}
-            self._cookies_file = project_root / "data" / "cookies.json"
+            self._pool: "OrderedDict[str, AccountSession]" = OrderedDict()
+            self._pool_lock = RLock()
+            self._max_sessions = max(1, env_loader.get_int('SESSION_POOL_SIZE', DEFAULT_MAX_SESSIONS))
+            self.validation_ttl = env_loader.get_int('SESSION_VALIDATION_TTL', DEFAULT_VALIDATION_TTL)
+            self._login_flights: Dict[str, _LoginFlight] = {}
+            self._login_lock = Lock()
+            self._login_stats = {"attempts": 0, "coalesced": 0}
+            self._cookie_store: Optional[CookieStore] = None
             self.initialized = True
-            
-            # 设置默认headers
-            self._session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            })
     
+    # ------------------------------------------------------------------
+    # 会话池
+    # ------------------------------------------------------------------
+
+    def _default_account(self) -> str:
+        """默认账号键（.env中的EDU_USERNAME）"""
+        return env_loader.get('EDU_USERNAME') or DEFAULT_ACCOUNT
+
+    def _resolve_account(self, account: Optional[str]) -> str:
+        """将可选的账号参数解析为会话池中的键"""
+        return account or self._default_account()
+
+    def _get_state(self, account: Optional[str] = None) -> AccountSession:
+        """
+        获取账号的会话状态，不存在时创建，并按LRU顺序淘汰超出容量的会话
+
+        Args:
+            account: 账号（学号），为空表示默认账号
+
+        Returns:
+            账号会话状态
+        """
+        key = self._resolve_account(account)
+        with self._pool_lock:
+            state = self._pool.get(key)
+            if state is not None:
+                self._pool.move_to_end(key)
+                return state
+
+            state = AccountSession(key)
+            self._pool[key] = state
+
+            while len(self._pool) > self._max_sessions:
+                evicted_key, evicted = self._pool.popitem(last=False)
+                release_session(evicted.session)
+                print(f"♻️ Session管理器：会话池已满，淘汰最久未使用的账号 {evicted_key}")
+
+            return state
+
+    def _peek_state(self, account: Optional[str] = None) -> Optional[AccountSession]:
+        """获取账号的会话状态，不创建、不改变LRU顺序（供后台任务使用）"""
+        with self._pool_lock:
+            return self._pool.get(self._resolve_account(account))
+
+    def accounts(self) -> List[str]:
+        """获取会话池中的账号列表（按最近使用排序，最新的在最后）"""
+        with self._pool_lock:
+            return list(self._pool.keys())
+
+    def remove_account(self, account: str) -> bool:
+        """
+        从会话池中移除账号（不删除cookies文件）
+
+        Returns:
+            账号是否存在
+        """
+        with self._pool_lock:
+            state = self._pool.pop(self._resolve_account(account), None)
+        if state is None:
+            return False
+        release_session(state.session)
+        return True
+
+    @property
+    def max_sessions(self) -> int:
+        """会话池容量"""
+        return self._max_sessions
+
+    @max_sessions.setter
+    def max_sessions(self, value: int):
+        with self._pool_lock:
+            self._max_sessions = max(1, int(value))
+            while len(self._pool) > self._max_sessions:
+                _, evicted = self._pool.popitem(last=False)
+                release_session(evicted.session)
+
+    # ------------------------------------------------------------------
+    # 会话状态
+    # ------------------------------------------------------------------
+
     @property
     def session(self) -> requests.Session:
-        """获取当前session对象"""
-        self._update_activity()
-        return self._session
+        """获取默认账号的session对象"""
+        return self.get_session()
     
     @property
     def is_logged_in(self) -> bool:
-        """检查是否已登录"""
-        return self._is_logged_in
+        """检查默认账号是否已登录"""
+        return self._get_state().is_logged_in
     
     @property
     def user_info(self) -> Dict[str, Any]:
-        """获取用户信息"""
-        return self._user_info.copy()
+        """获取默认账号的用户信息"""
+        return self._get_state().user_info.copy()
+
+    def get_session(self, account: Optional[str] = None) -> requests.Session:
+        """获取账号的session对象"""
+        state = self._get_state(account)
+        self._update_activity(state)
+        return state.session
+
+    def get_user_info(self, account: Optional[str] = None) -> Dict[str, Any]:
+        """获取账号的用户信息"""
+        return self._get_state(account).user_info.copy()
+
+    def is_account_logged_in(self, account: Optional[str] = None) -> bool:
+        """检查账号是否已登录"""
+        return self._get_state(account).is_logged_in
     
-    def _update_activity(self):
+    def _update_activity(self, state: AccountSession):
         """更新最后活动时间"""
-        self._last_activity = time.time()
+        state.last_activity = time.time()
+
+    def _mark_valid(self, state: AccountSession):
+        """记录会话刚刚被确认有效（不改变用户信息）"""
+        state.is_logged_in = True
+        state.validated_at = time.time()
+        self._update_activity(state)
+
+    def _is_recently_validated(self, state: AccountSession) -> bool:
+        """会话是否在TTL内被确认过有效"""
+        return state.is_logged_in and time.time() - state.validated_at < self.validation_ttl
     
-    def set_logged_in(self, user_info: Optional[Dict[str, Any]] = None):
+    def set_logged_in(self, user_info: Optional[Dict[str, Any]] = None, account: Optional[str] = None):
         """设置登录状态"""
-        self._is_logged_in = True
-        self._user_info = user_info or {}
-        self._update_activity()
-        print("✅ Session管理器：用户已登录")
+        state = self._get_state(account)
+        self._mark_valid(state)
+        state.logged_in_at = state.validated_at
+        state.user_info = user_info or {}
+        print(f"✅ Session管理器：用户 {state.account} 已登录")
     
-    def set_logged_out(self):
+    def set_logged_out(self, account: Optional[str] = None):
         """设置登出状态"""
-        self._is_logged_in = False
-        self._user_info = {}
-        print("📝 Session管理器：用户已登出")
+        state = self._get_state(account)
+        state.is_logged_in = False
+        state.validated_at = 0.0
+        state.user_info = {}
+        print(f"📝 Session管理器：用户 {state.account} 已登出")
+
+    def set_credentials(self, account: str, password: str):
+        """缓存账号密码（仅在内存中），用于会话失效后自动重新登录"""
+        self._get_state(account).password = password
     
-    def load_cookies(self) -> bool:
+    @property
+    def cookie_store(self) -> CookieStore:
+        """cookies持久化存储后端（首次使用时按COOKIE_STORE配置创建）"""
+        if self._cookie_store is None:
+            with self._pool_lock:
+                if self._cookie_store is None:
+                    self._cookie_store = create_cookie_store()
+        return self._cookie_store
+
+    @cookie_store.setter
+    def cookie_store(self, store: CookieStore):
+        self._cookie_store = store
+
+    def load_cookies(self, account: Optional[str] = None) -> bool:
         """
-        从文件加载cookies到session
+        从cookies存储加载cookies到账号的session
         
+        Args:
+            account: 账号，为空表示默认账号
+
         Returns:
             是否加载成功
         """
+        state = self._get_state(account)
         try:
-            if not self._cookies_file.exists():
-                print("📝 Session管理器：Cookies文件不存在")
+            cookies_data = self.cookie_store.load(state.account)
+            if cookies_data is None:
+                print("📝 Session管理器：没有已保存的Cookies")
                 return False
             
-            with open(self._cookies_file, 'r', encoding='utf-8') as f:
-                cookies_data = json.load(f)
-            
-            # 检查是否是新格式（包含时间戳）
-            if isinstance(cookies_data, dict) and "cookies" in cookies_data:
-                timestamp = cookies_data.get("timestamp", 0)
-                current_time = time.time()
-                
+            timestamp = cookies_data.get("timestamp")
+            if timestamp is not None:
                 # 检查cookies是否过期（24小时）
-                if current_time - timestamp > 24 * 3600:
+                if time.time() - timestamp > COOKIE_MAX_AGE:
                     print("⏰ Session管理器：Cookies已过期")
                     return False
-                
-                cookies = cookies_data["cookies"]
+                state.logged_in_at = timestamp
                 print(f"✅ Session管理器：加载有效cookies（创建时间: {cookies_data.get('created_at', '未知')}）")
             else:
                 # 兼容旧格式
-                cookies = cookies_data if isinstance(cookies_data, dict) else {}
                 print("📝 Session管理器：加载旧格式cookies")
             
             # 更新session的cookies
-            self._session.cookies.update(cookies)
+            state.session.cookies.update(cookies_data.get("cookies") or {})
             return True
             
         except Exception as e:
             print(f"❌ Session管理器：加载cookies失败: {e}")
             return False
     
-    def save_cookies(self) -> bool:
+    def save_cookies(self, account: Optional[str] = None) -> bool:
         """
-        保存当前session的cookies到文件
+        保存账号session的cookies到cookies存储
         
+        Args:
+            account: 账号，为空表示默认账号
+
         Returns:
             是否保存成功
         """
+        state = self._get_state(account)
         try:
-            self._cookies_file.parent.mkdir(exist_ok=True)
-            
             # 处理重复的cookie名称，只保留最后一个
             cookies_dict = {}
-            for cookie in self._session.cookies:
+            for cookie in state.session.cookies:
                 cookies_dict[cookie.name] = cookie.value
 
-            cookies_data = {
-                "cookies": cookies_dict,
-                "timestamp": time.time(),
-                "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "user_info": self._user_info
-            }
-            
-            with open(self._cookies_file, 'w', encoding='utf-8') as f:
-                json.dump(cookies_data, f, ensure_ascii=False, indent=2)
+            self.cookie_store.save(state.account, build_cookie_record(cookies_dict, state.user_info))
             
-            print(f"✅ Session管理器：Cookies已保存到 {self._cookies_file}")
+            print(f"✅ Session管理器：{state.account} 的Cookies已保存（{self.cookie_store.name}）")
             return True
             
         except Exception as e:
             print(f"❌ Session管理器：保存cookies失败: {e}")
             return False
     
-    def clear_cookies(self) -> bool:
+    def clear_cookies(self, account: Optional[str] = None) -> bool:
         """
-        清除cookies文件和session中的cookies
+        清除账号已保存的cookies和session中的cookies
         
+        Args:
+            account: 账号，为空表示默认账号
+
         Returns:
             是否清除成功
         """
+        state = self._get_state(account)
         try:
             # 清除session中的cookies
-            self._session.cookies.clear()
+            state.session.cookies.clear()
             
-            # 删除cookies文件
-            if self._cookies_file.exists():
-                self._cookies_file.unlink()
-                print("✅ Session管理器：Cookies文件已清除")
+            # 删除已保存的cookies
+            if self.cookie_store.delete(state.account):
+                print("✅ Session管理器：已保存的Cookies已清除")
             
             # 重置登录状态
-            self.set_logged_out()
+            self.set_logged_out(account)
             return True
             
         except Exception as e:
             print(f"❌ Session管理器：清除cookies失败: {e}")
             return False
+
+    def purge_expired_cookies(self) -> int:
+        """
+        批量删除已过期的cookies记录
+
+        Returns:
+            删除的记录数
+        """
+        try:
+            return self.cookie_store.purge_expired(COOKIE_MAX_AGE)
+        except Exception as e:
+            print(f"❌ Session管理器：清理过期cookies失败: {e}")
+            return 0
     
-    def is_session_valid(self) -> bool:
+    def is_session_valid(self, account: Optional[str] = None) -> bool:
         """
-        检查当前session是否有效
+        检查账号的session是否有效
         
+        Args:
+            account: 账号，为空表示默认账号
+
         Returns:
             session是否有效
         """
+        state = self._get_state(account)
         try:
             url = 'http://oa.csmu.edu.cn:8099/jsxsd/framework/xsMain.jsp'
-            response = self._session.get(url, timeout=10)
+            response = state.session.get(url)
             
             if response.status_code != 200:
                 print(f"❌ Session管理器：响应状态码错误: {response.status_code}")
                 return False
             
             # 检查是否重定向到登录页面
-            if "login" in response.url.lower() or "verifycode" in response.url:
+            if is_login_response(response.url, response.text):
                 print("❌ Session管理器：被重定向到登录页面")
-                self.set_logged_out()
+                self.set_logged_out(account)
                 return False
             
             # 检查页面内容是否包含用户信息
             if "姓名：" in response.text and "xsMain.jsp" in response.url:
                 print("✅ Session管理器：Session验证成功")
-                self.set_logged_in()
+                self._mark_valid(state)
                 return True
             else:
                 print("❌ Session管理器：页面内容异常")
-                self.set_logged_out()
+                self.set_logged_out(account)
                 return False
                 
         except Exception as e:
             print(f"❌ Session管理器：验证session失败: {e}")
-            self.set_logged_out()
+            self.set_logged_out(account)
             return False
+
+    def _get_login_credentials(self, state: AccountSession) -> Tuple[Optional[str], Optional[str]]:
+        """获取账号的登录凭据：优先使用内存缓存，默认账号回退到环境变量"""
+        if state.password:
+            return state.account, state.password
+
+        if state.account == self._default_account():
+            from src.auth.credentials import get_login_credentials
+            username, password, _ = get_login_credentials()
+            return username, password
+
+        return None, None
+    
+    @property
+    def login_stats(self) -> Dict[str, int]:
+        """登录统计：实际发起的登录次数和被合并等待的次数"""
+        with self._login_lock:
+            return dict(self._login_stats)
+
+    def _record_login(self, coalesced: bool):
+        """记录一次登录尝试或一次合并等待"""
+        with self._login_lock:
+            self._login_stats["coalesced" if coalesced else "attempts"] += 1
+
+    def _login(self, state: AccountSession, since: Optional[float] = None) -> bool:
+        """
+        重新登录账号，同一账号的并发登录只会真正执行一次
+
+        第一个线程执行登录，其余线程等待它的结果。
+
+        Args:
+            state: 账号会话状态
+            since: 调用方发现会话失效的时间，若之后已有其他线程登录成功则直接复用
+
+        Returns:
+            是否登录成功
+        """
+        with self._login_lock:
+            if since is not None and state.is_logged_in and state.validated_at > since:
+                return True
+
+            flight = self._login_flights.get(state.account)
+            is_leader = flight is None
+            if is_leader:
+                flight = _LoginFlight()
+                self._login_flights[state.account] = flight
+                self._login_stats["attempts"] += 1
+            else:
+                self._login_stats["coalesced"] += 1
+
+        if not is_leader:
+            print(f"⏳ Session管理器：{state.account} 正在由其他线程登录，等待结果...")
+            flight.done.wait(LOGIN_WAIT_TIMEOUT)
+            return flight.result
+
+        try:
+            flight.result = self._do_login(state)
+        finally:
+            with self._login_lock:
+                self._login_flights.pop(state.account, None)
+            flight.done.set()
+
+        return flight.result
+
+    def _do_login(self, state: AccountSession) -> bool:
+        """使用缓存或环境变量中的凭据重新登录账号"""
+        print(f"🔄 Session管理器：尝试自动登录 {state.account}...")
+        username, password = self._get_login_credentials(state)
+        if username and password:
+            # 导入login函数并登录（login会更新会话池中对应账号的状态并保存cookies）
+            from src.auth.login import login
+            if login(username, password):
+                return True
+
+        print("❌ Session管理器：自动登录失败")
+        return False
     
-    def ensure_logged_in(self) -> bool:
+    def ensure_logged_in(self, account: Optional[str] = None) -> bool:
         """
-        确保用户已登录，如果未登录则尝试自动登录
+        确保账号已登录，如果未登录则尝试自动登录
+
+        在validation_ttl内刚被确认有效的会话直接返回，不再请求主页验证。
         
+        Args:
+            account: 账号，为空表示默认账号
+
         Returns:
             是否成功登录
         """
+        state = self._get_state(account)
+        started_at = time.time()
+
+        # 0. 短时间内已确认有效，跳过验证请求
+        if self._is_recently_validated(state):
+            return True
+
         # 1. 检查当前session是否有效
-        if self.is_session_valid():
+        if self.is_session_valid(state.account):
             return True
         
         # 2. 尝试加载cookies
-        if self.load_cookies() and self.is_session_valid():
+        if self.load_cookies(state.account) and self.is_session_valid(state.account):
             return True
         
         # 3. 尝试自动登录
-        print("🔄 Session管理器：尝试自动登录...")
-        from src.auth.credentials import get_login_credentials
-        
-        username, password, _ = get_login_credentials()
-        if username and password:
-            # 导入login函数并登录
-            from src.auth.login import login
-            session_result = login(username, password)
-            
-            if session_result:
-                # 登录成功，更新session管理器
-                self._session = session_result
-                self.set_logged_in({"username": username})
-                self.save_cookies()
+        return self._login(state, since=started_at)
+
+    def request(self, method: str, url: str, account: Optional[str] = None, **kwargs) -> requests.Response:
+        """
+        乐观地直接请求目标地址，只有响应表明会话已失效时才重新登录并重放一次请求
+
+        Args:
+            method: HTTP方法
+            url: 请求地址
+            account: 账号，为空表示默认账号
+            **kwargs: 透传给requests的参数，未指定timeout时按接口类型使用传输层默认超时
+
+        Returns:
+            响应对象
+
+        Raises:
+            SessionExpiredError: 会话失效且重新登录失败
+        """
+        state = self._get_state(account)
+
+        # 冷启动：内存中没有任何cookies时先尝试从文件恢复，仍没有则直接登录
+        if not state.is_logged_in and not state.session.cookies:
+            if not self.load_cookies(state.account) and not self._login(state):
+                raise SessionExpiredError(f"账号 {state.account} 未登录且自动登录失败")
+
+        self._update_activity(state)
+        sent_at = time.time()
+        response = state.session.request(method, url, **kwargs)
+        if not is_login_response(response.url, response.text):
+            # 只有成功的响应才能证明会话有效，5xx维护页等不延长验证有效期
+            if response.status_code < 400:
+                self._mark_valid(state)
+            return response
+
+        print(f"🔄 Session管理器：{state.account} 的会话已失效，重新登录后重放请求")
+        if not self._login(state, since=sent_at):
+            raise SessionExpiredError(f"账号 {state.account} 会话已失效且重新登录失败")
+
+        response = state.session.request(method, url, **kwargs)
+        if is_login_response(response.url, response.text):
+            raise SessionExpiredError(f"账号 {state.account} 重新登录后仍被重定向到登录页")
+
+        if response.status_code < 400:
+            self._mark_valid(state)
+        return response
+    
+    def session_age(self, account: Optional[str] = None) -> Optional[float]:
+        """
+        获取账号会话自登录以来的时长
+
+        Args:
+            account: 账号，为空表示默认账号
+
+        Returns:
+            会话年龄（秒），登录时间未知时返回None
+        """
+        state = self._peek_state(account)
+        if state is None or not state.logged_in_at:
+            return None
+        return time.time() - state.logged_in_at
+
+    def ping(self, account: Optional[str] = None) -> bool:
+        """
+        轻量保活请求，不改变LRU顺序和最后活动时间
+
+        Args:
+            account: 账号，为空表示默认账号
+
+        Returns:
+            会话是否仍然有效
+        """
+        state = self._peek_state(account)
+        if state is None:
+            return False
+
+        try:
+            url = 'http://oa.csmu.edu.cn:8099/jsxsd/framework/xsMain.jsp'
+            response = state.session.get(url)
+            if response.status_code == 200 and not is_login_response(response.url, response.text):
+                state.is_logged_in = True
+                state.validated_at = time.time()
                 return True
-        
-        print("❌ Session管理器：自动登录失败")
+        except Exception as e:
+            print(f"⚠️ Session管理器：{state.account} 保活请求失败: {e}")
+
+        state.is_logged_in = False
+        state.validated_at = 0.0
         return False
+
+    def refresh_login(self, account: Optional[str] = None) -> bool:
+        """
+        主动重新登录账号（即使当前会话仍然有效），用于在cookies过期前续期
+
+        Args:
+            account: 账号，为空表示默认账号
+
+        Returns:
+            是否登录成功
+        """
+        state = self._peek_state(account) or self._get_state(account)
+        return self._login(state)
     
-    def get_user_name(self) -> Optional[str]:
+    def get_user_name(self, account: Optional[str] = None) -> Optional[str]:
         """
-        获取当前登录用户的姓名
+        获取账号用户的姓名
         
+        Args:
+            account: 账号，为空表示默认账号
+
         Returns:
             用户姓名或None
         """
-        if not self.ensure_logged_in():
-            return None
-        
+        state = self._get_state(account)
         try:
             url = 'http://oa.csmu.edu.cn:8099/jsxsd/framework/xsMain.jsp'
-            response = self._session.get(url, timeout=10)
+            response = self.request('GET', url, account=state.account)
             
             if response.status_code == 200:
-                import re
                 name_match = re.findall('姓名：(.*?)<br/>', response.text)
                 if name_match:
                     name = name_match[0].strip()
-                    self._user_info["name"] = name
+                    state.user_info["name"] = name
                     return name
         except Exception as e:
             print(f"❌ Session管理器：获取用户姓名失败: {e}")
         
         return None
     
-    def reset_session(self):
-        """重置session（保持cookies）"""
-        cookies = dict(self._session.cookies)
-        self._session = requests.Session()
-        self._session.cookies.update(cookies)
-        
-        # 重新设置headers
-        self._session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
+    def reset_session(self, account: Optional[str] = None):
+        """重置账号的session（保持cookies）"""
+        state = self._get_state(account)
+        old_session = state.session
+        # 新session挂载同一个共享adapter，已建立的keep-alive连接继续复用
+        state.session = create_session()
+        # 复制整个cookie jar（保留domain和path）：登录后 / 和 /jsxsd 下都有JSESSIONID，转换为字典会冲突
+        state.session.cookies.update(old_session.cookies)
+        release_session(old_session)
         
-        print("🔄 Session管理器：Session已重置")
+        print(f"🔄 Session管理器：{state.account} 的Session已重置")
 
 
 # 全局session管理器实例
 session_manager = SessionManager()
 
-def get_session() -> requests.Session:
+def get_session(account: Optional[str] = None) -> requests.Session:
     """
-    获取全局session对象
+    获取账号的session对象
     
+    Args:
+        account: 账号，为空表示默认账号
+
+    Returns:
+        账号的session对象
+    """
+    return session_manager.get_session(account)
+
+def request(method: str, url: str, account: Optional[str] = None, **kwargs) -> requests.Response:
+    """
+    使用账号的session发送请求，会话失效时自动重新登录并重放一次
+
+    Args:
+        method: HTTP方法
+        url: 请求地址
+        account: 账号，为空表示默认账号
+        **kwargs: 透传给requests的参数
+
     Returns:
-        全局session对象
+        响应对象
     """
-    return session_manager.session
+    return session_manager.request(method, url, account=account, **kwargs)
 
-def ensure_logged_in() -> bool:
+def ensure_logged_in(account: Optional[str] = None) -> bool:
     """
     确保已登录
     
+    Args:
+        account: 账号，为空表示默认账号
+
     Returns:
         是否已登录
     """
-    return session_manager.ensure_logged_in()
+    return session_manager.ensure_logged_in(account)
 
-def is_logged_in() -> bool:
+def is_logged_in(account: Optional[str] = None) -> bool:
     """
     检查是否已登录
     
+    Args:
+        account: 账号，为空表示默认账号
+
     Returns:
         是否已登录
     """
-    return session_manager.is_logged_in
+    return session_manager.is_account_logged_in(account)
 
-def get_user_info() -> Dict[str, Any]:
+def get_user_info(account: Optional[str] = None) -> Dict[str, Any]:
     """
     获取用户信息
     
+    Args:
+        account: 账号，为空表示默认账号
+
     Returns:
         用户信息字典
     """
-    return session_manager.user_info
+    return session_manager.get_user_info(account)
 
-def logout():
+def logout(account: Optional[str] = None):
     """登出并清除session"""
-    session_manager.clear_cookies()
-    session_manager.set_logged_out()
+    session_manager.clear_cookies(account)
+    session_manager.set_logged_out(account)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP传输层配置
+
+所有账号的session共享同一个挂载的HTTPAdapter，从而共享已建立的keep-alive连接池。
+提供可配置的连接池大小、针对幂等GET请求的urllib3重试（带退避），以及按接口类型区分的连接/读取超时。
+每个请求发送前检查熔断器（src.auth.circuit_breaker）并经过全局限流器（src.auth.rate_limit）。
+"""
+
+import sys
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.env_loader import env_loader
+from src.auth.rate_limit import rate_limiter
+from src.auth.circuit_breaker import circuit_breaker
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# 各类接口默认的 (连接超时, 读取超时)，单位秒
+ENDPOINT_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    'login': (5, 10),     # LoginToXk 登录提交、/jsxsd 首页
+    'captcha': (5, 15),   # verifycode.servlet 验证码图片
+    'page': (5, 10),      # 主页、学生信息、考试安排等普通页面
+    'data': (5, 30),      # 成绩、课程表等大页面
+}
+
+# 大页面接口
+DATA_ENDPOINTS = ('kscj/cjcx_list', 'xskb/xskb_list.do')
+
+
+def classify_endpoint(url: str) -> str:
+    """
+    根据URL判断接口类型
+
+    Args:
+        url: 请求地址
+
+    Returns:
+        login / captcha / page / data
+    """
+    if 'verifycode' in url:
+        return 'captcha'
+    if 'LoginToXk' in url or url.rstrip('/').endswith('/jsxsd'):
+        return 'login'
+    if any(endpoint in url for endpoint in DATA_ENDPOINTS):
+        return 'data'
+    return 'page'
+
+
+def _load_timeouts() -> Dict[str, Tuple[float, float]]:
+    """读取超时配置，环境变量格式为 HTTP_TIMEOUT_<类型>=连接超时,读取超时"""
+    timeouts = dict(ENDPOINT_TIMEOUTS)
+    for kind in timeouts:
+        value = env_loader.get(f'HTTP_TIMEOUT_{kind.upper()}')
+        if not value:
+            continue
+        try:
+            connect, read = (float(part) for part in value.split(','))
+            timeouts[kind] = (connect, read)
+        except ValueError:
+            print(f"⚠️ 超时配置格式错误: HTTP_TIMEOUT_{kind.upper()}={value}")
+    return timeouts
+
+
+class TransportConfig:
+    """HTTP传输层配置"""
+
+    def __init__(self):
+        self.pool_connections = env_loader.get_int('HTTP_POOL_CONNECTIONS', 4)
+        self.pool_maxsize = env_loader.get_int('HTTP_POOL_MAXSIZE', 32)
+        self.max_retries = env_loader.get_int('HTTP_MAX_RETRIES', 3)
+        self.backoff_factor = env_loader.get_float('HTTP_RETRY_BACKOFF', 0.5)
+        self.timeouts = _load_timeouts()
+
+    def get_timeout(self, url_or_kind: str) -> Tuple[float, float]:
+        """获取接口类型或URL对应的 (连接超时, 读取超时)"""
+        kind = url_or_kind if url_or_kind in self.timeouts else classify_endpoint(url_or_kind)
+        return self.timeouts[kind]
+
+    def build_retry(self) -> Retry:
+        """只对幂等的GET/HEAD请求在连接错误和网关错误时重试"""
+        return Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+
+
+class TunedHTTPAdapter(HTTPAdapter):
+    """
+    发送前检查熔断器并经过全局限流，在调用方未指定超时时按接口类型补充连接/读取超时的HTTPAdapter
+
+    5xx响应和超时/连接错误计入熔断器（urllib3重试之后才计一次）。
+    """
+
+    def __init__(self, config: TransportConfig):
+        self.transport_config = config
+        super().__init__(
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize,
+            max_retries=config.build_retry(),
+        )
+
+    def send(self, request, timeout=None, **kwargs):
+        probe = circuit_breaker.before_request()
+        kind = classify_endpoint(request.url)
+        rate_limiter.acquire(kind)
+        if timeout is None:
+            timeout = self.transport_config.get_timeout(kind)
+
+        try:
+            response = super().send(request, timeout=timeout, **kwargs)
+        except Exception:
+            circuit_breaker.record_failure()
+            raise
+
+        circuit_breaker.record_response(response.status_code, probe)
+        return response
+
+
+transport_config = TransportConfig()
+
+_shared_adapter: Optional[TunedHTTPAdapter] = None
+_adapter_lock = Lock()
+
+
+def get_shared_adapter() -> TunedHTTPAdapter:
+    """获取所有session共享的HTTPAdapter（共享连接池）"""
+    global _shared_adapter
+    if _shared_adapter is None:
+        with _adapter_lock:
+            if _shared_adapter is None:
+                _shared_adapter = TunedHTTPAdapter(transport_config)
+    return _shared_adapter
+
+
+def get_timeout(url_or_kind: str) -> Tuple[float, float]:
+    """获取接口类型或URL对应的 (连接超时, 读取超时)"""
+    return transport_config.get_timeout(url_or_kind)
+
+
+def create_session() -> requests.Session:
+    """创建挂载共享adapter、带默认headers的session"""
+    session = requests.Session()
+    adapter = get_shared_adapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def release_session(session: requests.Session) -> None:
+    """
+    释放不再使用的session
+
+    不调用session.close()，因为那会关闭共享adapter中的连接池；只关闭session独有的adapter。
+    """
+    shared = _shared_adapter
+    for adapter in set(session.adapters.values()):
+        if adapter is not shared:
+            adapter.close()
+    session.cookies.clear()
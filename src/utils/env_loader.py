@@ -4,6 +4,9 @@
 环境变量加载模块
 
 支持从 .env 文件加载环境变量，提供便捷的配置管理功能。
+
+首次读取配置时自动加载 .env，模块导入时就读取配置的全局实例（连接池、重试、限流、熔断等）
+在任何入口下都能读到 .env 中的值，不依赖入口脚本先调用 load_env()。
 """
 
 import os
@@ -23,6 +26,7 @@ class EnvLoader:
         self.project_root = project_root
         self.env_file = self.project_root / env_file
         self._loaded = False
+        self._attempted = False
         self._env_vars = {}
     
     def load_env(self, override: bool = False) -> bool:
@@ -38,6 +42,7 @@ class EnvLoader:
         if self._loaded and not override:
             return True
         
+        self._attempted = True
         if not self.env_file.exists():
             print(f"⚠️ 环境变量文件不存在: {self.env_file}")
             print(f"💡 请复制 .env.example 为 .env 并填入真实值")
@@ -79,8 +84,14 @@ class EnvLoader:
             print(f"❌ 加载环境变量文件失败: {e}")
             return False
     
+    def _ensure_loaded(self) -> None:
+        """首次读取配置时加载 .env（只尝试一次，文件不存在时不重复提示）"""
+        if not self._attempted:
+            self.load_env()
+    
     def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
-        """获取环境变量值"""
+        """获取环境变量值（首次调用时自动加载 .env）"""
+        self._ensure_loaded()
         return os.getenv(key, default)
     
     def get_int(self, key: str, default: int = 0) -> int:
@@ -90,6 +101,13 @@ class EnvLoader:
         except (ValueError, TypeError):
             return default
     
+    def get_float(self, key: str, default: float = 0.0) -> float:
+        """获取浮点类型的环境变量"""
+        try:
+            return float(self.get(key, str(default)))
+        except (ValueError, TypeError):
+            return default
+    
     def get_bool(self, key: str, default: bool = False) -> bool:
         """获取布尔类型的环境变量"""
         value = self.get(key, '').lower()
@@ -3,7 +3,16 @@
 包含各种辅助工具和函数
 """
 
-from .code1 import code_ocr
+from .code1 import (
+    code_ocr, async_code_ocr, recognize_captcha, ocr_pool, warm_up_ocr, warm_up_ocr_async, get_ocr_stats,
+    captcha_capture, captcha_profile
+)
+from .ocr_service import ocr_service, code_ocr_batch
+from .captcha_feedback import captcha_feedback
 from .conwork import encodeInp
 
-__all__ = ['code_ocr', 'encodeInp']
+__all__ = [
+    'code_ocr', 'async_code_ocr', 'recognize_captcha',
+    'ocr_pool', 'warm_up_ocr', 'warm_up_ocr_async', 'get_ocr_stats', 'captcha_capture', 'captcha_profile',
+    'ocr_service', 'code_ocr_batch', 'captcha_feedback', 'encodeInp'
+]
@@ -0,0 +1,308 @@
+"""
+验证码识别离线评测工具
+
+对一个目录中已标注的验证码图片运行与登录流程相同的识别路径（utils.code1.read_captcha），
+统计整串准确率、逐字符准确率、p50/p95延迟和吞吐量。全程离线，用于在上线前比较预处理和模型设置。
+
+标注来源（按优先级）：
+    0. --from-feedback：先把登录时被服务器接受过的验证码（utils.captcha_feedback）导出到目录
+    1. 目录下的 labels.txt，每行 "文件名 标注"（也支持逗号分隔，#开头为注释）
+    2. 文件名：<标注>.png、<标注>_<任意>.png（人工核对后重命名的图片）
+
+调试采样保存的 captcha_<用户>_<时间戳>_<识别结果>.png 中的是OCR自己的识别结果，不能作为标注，
+没有出现在 labels.txt 中时跳过；人工核对后写入 labels.txt 或重命名为 <标注>.png 再使用。
+
+用法:
+    python -m utils.captcha_benchmark data/captcha_labeled
+    python -m utils.captcha_benchmark data/captcha_labeled --service --json
+    python -m utils.captcha_benchmark data/captcha_labeled --preprocess threshold,denoise
+    python -m utils.captcha_benchmark data/captcha_labeled --from-feedback
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# 标注中允许的字符
+LABEL_PATTERN = re.compile(r'^[0-9A-Za-z]+$')
+
+
+def _is_debug_capture(path: Path) -> bool:
+    """是否为调试采样保存的图片（captcha_<用户>_<时间戳>_<识别结果>.png）"""
+    return path.stem.split('_')[0] == 'captcha'
+
+
+def _label_from_filename(path: Path) -> Optional[str]:
+    """从人工重命名的文件名中解析标注，调试采样的文件名中是OCR识别结果，返回None"""
+    if _is_debug_capture(path):
+        return None
+    label = path.stem.split('_')[0]
+    return label if label and LABEL_PATTERN.match(label) else None
+
+
+def load_labels_file(labels_file: Path) -> Dict[str, str]:
+    """
+    读取标注文件
+
+    Args:
+        labels_file: labels.txt 路径
+
+    Returns:
+        {文件名: 标注}
+    """
+    labels = {}
+    with open(labels_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = re.split(r'[\s,]+', line, maxsplit=1)
+            if len(parts) == 2:
+                labels[parts[0]] = parts[1].strip()
+    return labels
+
+
+def load_corpus(directory: Path, labels_file: Optional[Path] = None) -> List[Tuple[Path, str]]:
+    """
+    加载已标注的验证码图片
+
+    Args:
+        directory: 图片目录
+        labels_file: 标注文件，为空时使用目录下的 labels.txt（存在时）
+
+    Returns:
+        [(图片路径, 标注)]，没有标注的图片被跳过
+    """
+    directory = Path(directory)
+    labels_file = Path(labels_file) if labels_file else directory / "labels.txt"
+    labels = load_labels_file(labels_file) if labels_file.exists() else {}
+
+    samples = []
+    skipped = 0
+    unreviewed = 0
+    for path in sorted(directory.glob("*.png")):
+        label = labels.get(path.name) or _label_from_filename(path)
+        if label:
+            samples.append((path, label))
+        elif _is_debug_capture(path):
+            unreviewed += 1
+        else:
+            skipped += 1
+
+    if skipped:
+        print(f"⚠️ {skipped} 张图片没有标注，已跳过")
+    if unreviewed:
+        print(f"⚠️ {unreviewed} 张调试采样图片未经人工标注（文件名中是OCR识别结果），已跳过")
+    return samples
+
+
+def char_matches(prediction: Optional[str], label: str) -> int:
+    """按位置统计识别正确的字符数"""
+    if not prediction:
+        return 0
+    return sum(1 for predicted, expected in zip(prediction, label) if predicted == expected)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """计算分位数（线性插值）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def run_benchmark(
+    samples: List[Tuple[Path, str]],
+    reader: Optional[Callable[[bytes], Optional[str]]] = None,
+    use_service: bool = False,
+    warmup: int = 3,
+    case_sensitive: bool = False
+) -> Dict[str, Any]:
+    """
+    运行评测
+
+    Args:
+        samples: [(图片路径, 标注)]
+        reader: 识别函数，为空时使用登录流程的 read_captcha
+        use_service: 是否使用OCR进程池批量识别（只统计吞吐量，不统计单张延迟）
+        warmup: 正式计时前预热识别的图片数
+        case_sensitive: 是否区分大小写
+
+    Returns:
+        评测结果
+    """
+    from utils.code1 import read_captcha, warm_up_ocr, get_ocr_stats, is_valid_code, get_preprocessor
+
+    images = [path.read_bytes() for path, _ in samples]
+    labels = [label if case_sensitive else label.lower() for _, label in samples]
+    latencies: List[float] = []
+
+    if use_service:
+        from utils.ocr_service import ocr_service
+        load_time = ocr_service.warm_up()
+        start = time.perf_counter()
+        predictions = ocr_service.batch(images, raw=True)
+        wall = time.perf_counter() - start
+    else:
+        reader = reader or read_captcha
+        if reader is read_captcha:
+            warm_up_ocr(1)
+        for image in images[:warmup]:
+            reader(image)
+        load_time = get_ocr_stats()["model_load"]["total"]
+
+        predictions = []
+        start = time.perf_counter()
+        for image in images:
+            begin = time.perf_counter()
+            predictions.append(reader(image))
+            latencies.append(time.perf_counter() - begin)
+        wall = time.perf_counter() - start
+
+    preprocess_stats = get_preprocessor().get_stats()
+
+    if not case_sensitive:
+        predictions = [prediction.lower() if prediction else prediction for prediction in predictions]
+
+    total = len(samples)
+    exact = sum(1 for prediction, label in zip(predictions, labels) if prediction == label)
+    chars_total = sum(len(label) for label in labels)
+    chars_correct = sum(char_matches(prediction, label) for prediction, label in zip(predictions, labels))
+    accepted = sum(1 for prediction in predictions if is_valid_code(prediction))
+
+    errors = [
+        {"file": path.name, "label": label, "prediction": prediction}
+        for (path, _), label, prediction in zip(samples, labels, predictions)
+        if prediction != label
+    ]
+
+    return {
+        "samples": total,
+        "exact_accuracy": exact / total if total else 0.0,
+        "char_accuracy": chars_correct / chars_total if chars_total else 0.0,
+        "accepted_rate": accepted / total if total else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        } if latencies else None,
+        "throughput": total / wall if wall > 0 else 0.0,
+        "wall_time": wall,
+        "model_load_time": load_time,
+        "mode": "service" if use_service else "in-process",
+        "preprocess": list(get_preprocessor().steps),
+        "preprocess_ms": (
+            preprocess_stats["total"] / preprocess_stats["count"] * 1000 if preprocess_stats["count"] else 0.0
+        ),
+        "errors": errors,
+    }
+
+
+def configure_preprocess(steps: Optional[str] = None, threshold: Optional[int] = None,
+                         min_component: Optional[int] = None) -> None:
+    """
+    设置评测使用的预处理参数（未指定的参数沿用环境变量）
+
+    同时写入环境变量，使OCR进程池的工作进程使用相同的设置。
+    """
+    import os
+    from utils.code1 import set_preprocessor
+    from utils.captcha_preprocess import CaptchaPreprocessor
+
+    for key, value in (('CAPTCHA_PREPROCESS', steps), ('CAPTCHA_THRESHOLD', threshold),
+                       ('CAPTCHA_DENOISE_MIN_SIZE', min_component)):
+        if value is not None:
+            os.environ[key] = str(value)
+    set_preprocessor(CaptchaPreprocessor())
+
+
+def format_report(result: Dict[str, Any], show_errors: int = 10) -> str:
+    """格式化评测结果"""
+    output = ["📊 验证码识别评测"]
+    output.append("=" * 40)
+    output.append(f"样本数: {result['samples']}  模式: {result['mode']}")
+    output.append(f"预处理: {','.join(result['preprocess']) or '关闭'}"
+                  + (f" (平均 {result['preprocess_ms']:.2f}ms)" if result['preprocess_ms'] else ""))
+    output.append(f"整串准确率: {result['exact_accuracy']:.2%}")
+    output.append(f"逐字符准确率: {result['char_accuracy']:.2%}")
+    output.append(f"通过格式检查: {result['accepted_rate']:.2%}")
+
+    latency = result["latency_ms"]
+    if latency:
+        output.append(f"延迟: p50={latency['p50']:.1f}ms p95={latency['p95']:.1f}ms 平均={latency['mean']:.1f}ms")
+    output.append(f"吞吐量: {result['throughput']:.1f} 张/秒 (总耗时 {result['wall_time']:.2f} 秒)")
+    output.append(f"模型加载: {result['model_load_time']:.2f} 秒（不计入延迟）")
+
+    errors = result["errors"][:show_errors]
+    if errors:
+        output.append(f"\n❌ 识别错误示例（共 {len(result['errors'])} 个）:")
+        for error in errors:
+            output.append(f"   {error['file']}: 标注={error['label']} 识别={error['prediction']}")
+
+    return "\n".join(output)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='验证码识别离线评测')
+    parser.add_argument('directory', help='已标注的验证码图片目录')
+    parser.add_argument('--labels', help='标注文件（默认为目录下的labels.txt）')
+    parser.add_argument('--limit', type=int, help='最多评测的图片数')
+    parser.add_argument('--warmup', type=int, default=3, help='正式计时前预热识别的图片数')
+    parser.add_argument('--service', action='store_true', help='使用OCR进程池批量识别')
+    parser.add_argument('--case-sensitive', action='store_true', help='区分大小写')
+    parser.add_argument('--show-errors', type=int, default=10, help='显示的识别错误示例数')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    parser.add_argument('--preprocess', help='预处理步骤，逗号分隔（grayscale,threshold,denoise,crop），all为全部，none为关闭')
+    parser.add_argument('--threshold', type=int, help='固定二值化阈值（0为Otsu自动阈值）')
+    parser.add_argument('--min-component', type=int, help='去噪时保留的最小连通域像素数')
+    parser.add_argument('--from-feedback', action='store_true', help='先导出登录时被服务器接受过的验证码作为语料')
+    args = parser.parse_args()
+
+    configure_preprocess(args.preprocess, args.threshold, args.min_component)
+
+    if args.from_feedback:
+        from utils.captcha_feedback import captcha_feedback
+        stats = captcha_feedback.get_stats()
+        print(f"📨 生产环境验证码提交 {stats['submitted']} 次，通过率 {stats['accept_rate']:.2%}，"
+              f"首次提交通过率 {stats['first_try_rate']:.2%}")
+        count = captcha_feedback.export_labels(Path(args.directory))
+        print(f"✅ 已导出 {count} 张服务器接受过的验证码到 {args.directory}")
+
+    samples = load_corpus(Path(args.directory), Path(args.labels) if args.labels else None)
+    if args.limit:
+        samples = samples[:args.limit]
+    if not samples:
+        print("❌ 没有找到已标注的验证码图片")
+        return 1
+
+    result = run_benchmark(
+        samples,
+        use_service=args.service,
+        warmup=args.warmup,
+        case_sensitive=args.case_sensitive
+    )
+
+    if args.service:
+        from utils.ocr_service import ocr_service
+        ocr_service.shutdown()
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(result, args.show_errors))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+验证码识别结果反馈记录
+
+登录时每次提交验证码后，服务器的判定（接受/验证码错误）会连同图片哈希和OCR结果一起追加到SQLite：
+    images:   按sha256去重保存的验证码图片
+    outcomes: 每次提交的记录（时间、账号、图片哈希、OCR结果、判定、第几次尝试）
+
+被服务器接受的验证码就是免费的标注数据，可以导出为评测语料（utils.captcha_benchmark），
+也可以统计生产环境中的首次提交通过率。
+
+环境变量：
+    CAPTCHA_FEEDBACK_ENABLED: 是否记录（默认false；开启后每次登录提交都会在登录线程中写入一次SQLite）
+    CAPTCHA_FEEDBACK_DB: 数据库路径（默认 data/captcha_feedback.db）
+    CAPTCHA_FEEDBACK_MAX_IMAGES: 最多保存的图片数，超出后删除最早的图片（默认5000，0表示不限制）；
+        提交记录本身很小，全部保留用于统计
+
+导出并评测:
+    python -m utils.captcha_benchmark data/captcha_labeled --from-feedback
+"""
+
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Any, Optional, Tuple
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# 服务器判定
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+
+DEFAULT_MAX_IMAGES = 5000
+
+
+class CaptchaFeedbackLog:
+    """验证码识别结果反馈记录"""
+
+    def __init__(self, db_path: Optional[Path] = None, enabled: Optional[bool] = None,
+                 max_images: Optional[int] = None):
+        if enabled is None:
+            enabled = os.getenv('CAPTCHA_FEEDBACK_ENABLED', 'false').lower() in ('true', '1', 'yes', 'on')
+        self.enabled = enabled
+        self.db_path = Path(db_path or os.getenv('CAPTCHA_FEEDBACK_DB') or project_root / "data" / "captcha_feedback.db")
+        if max_images is None:
+            try:
+                max_images = int(os.getenv('CAPTCHA_FEEDBACK_MAX_IMAGES', DEFAULT_MAX_IMAGES))
+            except ValueError:
+                max_images = DEFAULT_MAX_IMAGES
+        self.max_images = max_images
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, Tuple[bytes, str]] = {}
+        self._lock = Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """首次写入时打开数据库（调用方持有锁）"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                "hash TEXT PRIMARY KEY, data BLOB NOT NULL, first_seen REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outcomes ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL NOT NULL, account TEXT, "
+                "image_hash TEXT NOT NULL, ocr_result TEXT, verdict TEXT NOT NULL, attempt INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_outcomes_verdict ON outcomes(verdict)")
+            self._conn = conn
+        return self._conn
+
+    def remember(self, account: str, image_bytes: bytes, code: str) -> None:
+        """
+        记下即将提交的验证码，等待服务器判定
+
+        Args:
+            account: 账号
+            image_bytes: 验证码图片的原始字节
+            code: OCR识别结果
+        """
+        if self.enabled and image_bytes and code:
+            with self._lock:
+                self._pending[account] = (image_bytes, code)
+
+    def discard(self, account: str) -> None:
+        """丢弃无法判定的提交（如用户名密码错误、服务器异常）"""
+        with self._lock:
+            self._pending.pop(account, None)
+
+    def record(self, account: str, verdict: str, attempt: int = 0) -> bool:
+        """
+        记录服务器对该账号最近一次提交的验证码的判定
+
+        Args:
+            account: 账号
+            verdict: ACCEPTED 或 REJECTED
+            attempt: 本次登录中的第几次尝试（从0开始）
+
+        Returns:
+            是否写入了记录
+        """
+        with self._lock:
+            pending = self._pending.pop(account, None)
+        if not self.enabled or pending is None:
+            return False
+
+        image_bytes, code = pending
+        image_hash = hashlib.sha256(image_bytes).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            conn = None
+            try:
+                conn = self._connect()
+                conn.execute("BEGIN")
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO images (hash, data, first_seen) VALUES (?, ?, ?)",
+                    (image_hash, image_bytes, now)
+                ).rowcount
+                conn.execute(
+                    "INSERT INTO outcomes (timestamp, account, image_hash, ocr_result, verdict, attempt) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (now, account, image_hash, code, verdict, attempt)
+                )
+                # 超出容量时删除最早的图片（提交记录保留）
+                if inserted and self.max_images > 0:
+                    conn.execute(
+                        "DELETE FROM images WHERE hash IN ("
+                        "SELECT hash FROM images ORDER BY first_seen DESC LIMIT -1 OFFSET ?)",
+                        (self.max_images,)
+                    )
+                conn.execute("COMMIT")
+                return True
+            except sqlite3.Error as e:
+                # 回滚未完成的事务，否则连接停留在事务中，之后的BEGIN都会失败
+                if conn is not None and conn.in_transaction:
+                    conn.rollback()
+                print(f"⚠️ 记录验证码反馈失败: {e}")
+                return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        统计服务器判定
+
+        Returns:
+            {'submitted': 提交次数, 'accepted': 通过次数, 'accept_rate': 通过率,
+             'first_try_rate': 首次提交通过率, 'images': 去重后的图片数}
+        """
+        stats = {"submitted": 0, "accepted": 0, "accept_rate": 0.0, "first_try_rate": 0.0, "images": 0}
+        if not self.db_path.exists():
+            return stats
+
+        with self._lock:
+            conn = self._connect()
+            submitted, accepted, first_total, first_accepted = conn.execute(
+                "SELECT COUNT(*), "
+                "COALESCE(SUM(verdict = ?), 0), "
+                "COALESCE(SUM(attempt = 0), 0), "
+                "COALESCE(SUM(attempt = 0 AND verdict = ?), 0) FROM outcomes",
+                (ACCEPTED, ACCEPTED)
+            ).fetchone()
+            images = conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+        stats.update({
+            "submitted": submitted,
+            "accepted": accepted,
+            "accept_rate": accepted / submitted if submitted else 0.0,
+            "first_try_rate": first_accepted / first_total if first_total else 0.0,
+            "images": images,
+        })
+        return stats
+
+    def export_labels(self, directory: Path) -> int:
+        """
+        把服务器接受过的验证码导出为评测语料（文件名为 <标注>_<哈希前缀>.png）
+
+        Args:
+            directory: 输出目录
+
+        Returns:
+            导出的图片数
+        """
+        if not self.db_path.exists():
+            return 0
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT images.hash, images.data, MIN(outcomes.ocr_result) FROM outcomes "
+                "JOIN images ON images.hash = outcomes.image_hash "
+                "WHERE outcomes.verdict = ? GROUP BY images.hash",
+                (ACCEPTED,)
+            ).fetchall()
+
+        for image_hash, data, label in rows:
+            (directory / f"{label}_{image_hash[:12]}.png").write_bytes(data)
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 全局验证码反馈记录
+captcha_feedback = CaptchaFeedbackLog()
+
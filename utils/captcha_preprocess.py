@@ -0,0 +1,252 @@
+"""
+验证码图片预处理
+
+把验证码字节解码一次为NumPy数组，依次执行可单独开关的向量化步骤后交给OCR，全程不落盘：
+    grayscale: 加权灰度化
+    threshold: 二值化（Otsu自动阈值或固定阈值）
+    denoise:   去除像素数小于阈值的小连通域（噪点、干扰线碎片）
+    crop:      裁剪到字符所在区域
+
+环境变量：
+    CAPTCHA_PREPROCESS: 开启的步骤，逗号分隔；all 表示全部，none/false 或为空表示关闭（默认关闭）
+    CAPTCHA_THRESHOLD: 固定二值化阈值 1-255，0表示使用Otsu自动阈值（默认0）
+    CAPTCHA_DENOISE_MIN_SIZE: 小于该像素数的连通域视为噪点（默认3）
+"""
+
+import io
+import os
+import threading
+import time
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+# 全部预处理步骤（按执行顺序）
+ALL_STEPS = ('grayscale', 'threshold', 'denoise', 'crop')
+
+# 灰度化权重（ITU-R BT.601）
+GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# 单色图片（空白验证码等）无法计算Otsu阈值时使用的固定阈值
+FALLBACK_THRESHOLD = 127
+
+# 8邻域偏移
+NEIGHBOR_OFFSETS = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if (dy, dx) != (0, 0)]
+
+
+def parse_steps(value: Optional[Union[str, Iterable[str]]]) -> tuple:
+    """解析预处理步骤配置"""
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ('', 'none', 'false', 'off', '0'):
+            return ()
+        if value in ('all', 'true', 'on', '1'):
+            return ALL_STEPS
+        value = [step.strip() for step in value.split(',')]
+
+    steps = set(value)
+    unknown = steps - set(ALL_STEPS)
+    if unknown:
+        print(f"⚠️ 未知的验证码预处理步骤: {', '.join(sorted(unknown))}")
+    return tuple(step for step in ALL_STEPS if step in steps)
+
+
+def decode_image(image_bytes: bytes) -> np.ndarray:
+    """把验证码图片字节解码为 (高, 宽, 3) 的uint8数组"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        return np.asarray(image.convert('RGB'), dtype=np.uint8)
+
+
+def to_grayscale(rgb: np.ndarray) -> np.ndarray:
+    """加权灰度化，返回uint8数组"""
+    if rgb.ndim == 2:
+        return rgb
+    return (rgb[..., :3].astype(np.float32) @ GRAY_WEIGHTS).clip(0, 255).astype(np.uint8)
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Otsu自动阈值：使类间方差最大的灰度值"""
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = gray.size
+    levels = np.arange(256, dtype=np.float64)
+
+    weight_background = np.cumsum(histogram)
+    weight_foreground = total - weight_background
+    cumulative_mean = np.cumsum(histogram * levels)
+    mean_total = cumulative_mean[-1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_background = cumulative_mean / weight_background
+        mean_foreground = (mean_total - cumulative_mean) / weight_foreground
+        between = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+
+    # 只有一种灰度时类间方差全为NaN
+    if np.isnan(between).all():
+        return FALLBACK_THRESHOLD
+    return int(np.nanargmax(between))
+
+
+def foreground_mask(gray: np.ndarray, threshold: int = 0) -> np.ndarray:
+    """字符（深色）像素为True的掩码，threshold为0时使用Otsu阈值"""
+    return gray <= (threshold or otsu_threshold(gray))
+
+
+def _shift(array: np.ndarray, dy: int, dx: int, fill) -> np.ndarray:
+    """把数组平移 (dy, dx)，空出的位置填充fill"""
+    height, width = array.shape
+    padded = np.full((height + 2, width + 2), fill, dtype=array.dtype)
+    padded[1:-1, 1:-1] = array
+    return padded[1 - dy:1 - dy + height, 1 - dx:1 - dx + width]
+
+
+def label_components(mask: np.ndarray) -> np.ndarray:
+    """
+    8连通域标记（向量化的最小标签传播）
+
+    Args:
+        mask: 前景掩码
+
+    Returns:
+        与mask同形状的标签数组，背景为0，同一连通域的像素标签相同
+    """
+    height, width = mask.shape
+    sentinel = height * width + 1
+    labels = np.where(mask, np.arange(1, height * width + 1).reshape(height, width), sentinel)
+
+    while True:
+        neighbors = labels
+        for dy, dx in NEIGHBOR_OFFSETS:
+            neighbors = np.minimum(neighbors, _shift(labels, dy, dx, sentinel))
+        updated = np.where(mask, neighbors, sentinel)
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+
+    return np.where(mask, labels, 0)
+
+
+def remove_small_components(mask: np.ndarray, min_size: int) -> np.ndarray:
+    """去除像素数小于min_size的连通域"""
+    if min_size <= 1 or not mask.any():
+        return mask
+    labels = label_components(mask)
+    sizes = np.bincount(labels.ravel())
+    keep = sizes >= min_size
+    keep[0] = False
+    return keep[labels]
+
+
+def crop_box(mask: np.ndarray, padding: int = 2) -> Optional[tuple]:
+    """字符区域的裁剪框 (上, 下, 左, 右)，没有前景时返回None"""
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0 or cols.size == 0:
+        return None
+    height, width = mask.shape
+    return (
+        max(rows[0] - padding, 0), min(rows[-1] + padding + 1, height),
+        max(cols[0] - padding, 0), min(cols[-1] + padding + 1, width),
+    )
+
+
+class CaptchaPreprocessor:
+    """验证码预处理流水线"""
+
+    def __init__(self, steps=None, threshold: Optional[int] = None, min_component: Optional[int] = None,
+                 padding: int = 2):
+        if steps is None:
+            steps = os.getenv('CAPTCHA_PREPROCESS', '')
+        if threshold is None:
+            threshold = _get_int('CAPTCHA_THRESHOLD', 0)
+        if min_component is None:
+            min_component = _get_int('CAPTCHA_DENOISE_MIN_SIZE', 3)
+
+        self.steps = parse_steps(steps)
+        self.threshold = threshold
+        self.min_component = min_component
+        self.padding = padding
+        self._stats_lock = threading.Lock()
+        self._stats = {"count": 0, "total": 0.0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.steps)
+
+    def process_array(self, rgb: np.ndarray) -> np.ndarray:
+        """
+        对解码后的图片数组执行开启的步骤
+
+        Args:
+            rgb: (高, 宽, 3) 或 (高, 宽) 的uint8数组
+
+        Returns:
+            处理后的uint8数组（灰度或RGB）
+        """
+        steps = self.steps
+        image = to_grayscale(rgb) if 'grayscale' in steps else rgb
+
+        needs_mask = 'threshold' in steps or 'denoise' in steps or 'crop' in steps
+        if not needs_mask:
+            return image
+
+        mask = foreground_mask(to_grayscale(rgb), self.threshold)
+        if 'denoise' in steps:
+            cleaned = remove_small_components(mask, self.min_component)
+            removed = mask & ~cleaned
+            mask = cleaned
+            if 'threshold' not in steps:
+                # 未二值化时把噪点像素涂成背景色
+                image = image.copy()
+                image[removed] = 255
+
+        if 'threshold' in steps:
+            # 字符为黑色，背景为白色
+            image = np.where(mask, 0, 255).astype(np.uint8)
+
+        if 'crop' in steps:
+            box = crop_box(mask, self.padding)
+            if box is not None:
+                top, bottom, left, right = box
+                image = image[top:bottom, left:right]
+
+        return np.ascontiguousarray(image)
+
+    def process(self, image_bytes: bytes):
+        """
+        预处理验证码图片
+
+        Args:
+            image_bytes: 验证码图片的原始字节
+
+        Returns:
+            未开启任何步骤时原样返回字节，否则返回可直接交给ddddocr的PIL图片
+        """
+        if not self.steps:
+            return image_bytes
+
+        from PIL import Image
+
+        start = time.perf_counter()
+        image = Image.fromarray(self.process_array(decode_image(image_bytes)))
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._stats["count"] += 1
+            self._stats["total"] += elapsed
+        return image
+
+    def get_stats(self) -> dict:
+        """获取预处理统计（count: 处理的图片数, total: 总耗时秒）"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+
+def _get_int(key: str, default: int) -> int:
+    """读取整数型环境变量"""
+    try:
+        return int(os.getenv(key, default))
+    except ValueError:
+        return default
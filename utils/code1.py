@@ -1,8 +1,10 @@
-import ddddocr
 import time
 import requests
 import os
+import queue
+import threading
 import warnings
+from contextlib import contextmanager
 
 # 抑制ONNX Runtime警告
 os.environ['ORT_LOGGING_LEVEL'] = '3'  # 只显示错误级别的日志
@@ -17,6 +19,350 @@ try:
 except ImportError:
     pass
 
+from utils.captcha_feedback import captcha_feedback
+
+
+def _env_flag(key, default=False):
+    """读取布尔型环境变量"""
+    value = os.getenv(key, '').lower()
+    if value in ('true', '1', 'yes', 'on'):
+        return True
+    if value in ('false', '0', 'no', 'off'):
+        return False
+    return default
+
+
+# 未配置验证码长度时的最小长度
+MIN_CODE_LENGTH = 4
+
+
+class CaptchaProfile:
+    """
+    站点验证码规格
+
+    识别结果不符合规格时直接丢弃并重新获取验证码，不再提交登录表单。
+
+    环境变量：
+        CAPTCHA_LENGTH: 验证码长度，0表示只要求至少4位（默认0）
+        CAPTCHA_CHARSET: 站点使用的字符集，设置后通过ddddocr的set_ranges限制识别范围（默认不限制）
+        CAPTCHA_MIN_CONFIDENCE: 最低置信度 0-1，大于0时使用ddddocr的概率输出（默认0，不检查）
+    """
+
+    def __init__(self, length=None, charset=None, min_confidence=None):
+        if length is None:
+            try:
+                length = int(os.getenv('CAPTCHA_LENGTH', 0))
+            except ValueError:
+                length = 0
+        if charset is None:
+            charset = os.getenv('CAPTCHA_CHARSET', '')
+        if min_confidence is None:
+            try:
+                min_confidence = float(os.getenv('CAPTCHA_MIN_CONFIDENCE', 0))
+            except ValueError:
+                min_confidence = 0.0
+
+        self.length = max(0, length)
+        self.charset = ''.join(dict.fromkeys(charset))
+        self.min_confidence = min_confidence
+        self._allowed = set(self.charset)
+        self.stats = {"accepted": 0, "rejected_length": 0, "rejected_charset": 0, "rejected_confidence": 0}
+
+    @property
+    def needs_confidence(self):
+        """是否需要ddddocr输出置信度"""
+        return self.min_confidence > 0
+
+    def apply(self, engine):
+        """把字符集限制应用到OCR实例"""
+        if self.charset:
+            engine.set_ranges(self.charset)
+
+    def check(self, code, confidence=None):
+        """
+        检查识别结果是否符合规格
+
+        Args:
+            code: 识别结果
+            confidence: 置信度，为空时不检查
+
+        Returns:
+            (是否通过, 未通过的原因)
+        """
+        if not code:
+            return False, 'length'
+        if self.length and len(code) != self.length:
+            return False, 'length'
+        if not self.length and len(code) < MIN_CODE_LENGTH:
+            return False, 'length'
+        if self._allowed and not set(code) <= self._allowed:
+            return False, 'charset'
+        if self.needs_confidence and confidence is not None and confidence < self.min_confidence:
+            return False, 'confidence'
+        return True, ''
+
+    def validate(self, code, confidence=None):
+        """检查识别结果并统计通过/拒绝次数，返回 (是否通过, 原因)"""
+        ok, reason = self.check(code, confidence)
+        self.stats["accepted" if ok else f"rejected_{reason}"] += 1
+        return ok, reason
+
+
+# 全局验证码规格
+captcha_profile = CaptchaProfile()
+
+
+def is_valid_code(code):
+    """验证码格式检查（长度和字符集）"""
+    return captcha_profile.check(code)[0]
+
+
+def parse_probability_result(result):
+    """
+    解析ddddocr概率输出
+
+    Args:
+        result: classification(probability=True) 的返回值
+
+    Returns:
+        (识别结果, 置信度)
+    """
+    if 'text' in result:
+        return result['text'], result.get('confidence')
+
+    # 旧版本ddddocr只返回字符集和逐位概率
+    import numpy as np
+
+    probabilities = np.asarray(result['probability'])
+    charsets = result['charsets']
+    indices = probabilities.argmax(axis=-1)
+    text = ''.join(charsets[index] for index in indices)
+    return text, float(probabilities.max(axis=-1).mean())
+
+
+# OCR引擎池默认大小（同时进行识别的线程数）
+DEFAULT_OCR_POOL_SIZE = 2
+
+
+class OcrEnginePool:
+    """
+    进程级OCR引擎池
+
+    每个DdddOcr实例只加载一次ONNX模型，识别时从池中借出、用完归还，
+    多线程登录时最多创建 size 个实例。模型加载耗时和单次识别耗时分别统计。
+    """
+
+    def __init__(self, size=None):
+        self._size = size
+        self._engines = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._load_times = []
+        self._inference = {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+        self._warm_up_thread = None
+        self._warm_up_wait = 0.0
+
+    @property
+    def size(self):
+        """池大小，未指定时读取环境变量OCR_POOL_SIZE"""
+        if self._size is None:
+            try:
+                self._size = max(1, int(os.getenv('OCR_POOL_SIZE', DEFAULT_OCR_POOL_SIZE)))
+            except ValueError:
+                self._size = DEFAULT_OCR_POOL_SIZE
+        return self._size
+
+    def _create_engine(self):
+        """加载一个OCR实例并记录加载耗时（首次调用时才导入ddddocr/onnxruntime）"""
+        start = time.perf_counter()
+        import ddddocr
+        engine = ddddocr.DdddOcr(show_ad=False)
+        captcha_profile.apply(engine)
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._load_times.append(elapsed)
+        print(f"🧠 OCR模型加载完成，耗时 {elapsed:.2f} 秒")
+        return engine
+
+    def _reserve_slot(self):
+        """池未满时占用一个创建名额"""
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return True
+            return False
+
+    def warm_up(self, count=None):
+        """
+        预先加载OCR实例
+
+        Args:
+            count: 加载数量，为空时加载到池大小
+
+        Returns:
+            池中已创建的实例数
+        """
+        target = min(count or self.size, self.size)
+        while self._created < target and self._reserve_slot():
+            try:
+                self._engines.put(self._create_engine())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._created
+
+    def warm_up_async(self, count=1):
+        """
+        在后台线程中预先加载OCR实例，立即返回
+
+        Args:
+            count: 加载数量，为空时加载到池大小
+
+        Returns:
+            预热线程
+        """
+        with self._lock:
+            if self._warm_up_thread is None or not self._warm_up_thread.is_alive():
+                self._warm_up_thread = threading.Thread(
+                    target=self._background_warm_up, args=(count,), name="ocr-warm-up", daemon=True
+                )
+                self._warm_up_thread.start()
+            return self._warm_up_thread
+
+    def _background_warm_up(self, count):
+        try:
+            self.warm_up(count)
+        except Exception as e:
+            print(f"⚠️ OCR模型后台加载失败: {e}")
+
+    def _wait_for_warm_up(self):
+        """后台预热进行中时等待它加载出的实例，避免重复加载模型；预热已结束返回None"""
+        thread = self._warm_up_thread
+        if thread is None or not thread.is_alive():
+            return None
+
+        start = time.perf_counter()
+        try:
+            while thread.is_alive():
+                try:
+                    return self._engines.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+            return None
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self._warm_up_wait += elapsed
+            print(f"⏳ 等待OCR模型加载 {elapsed:.2f} 秒")
+
+    @contextmanager
+    def engine(self):
+        """借出一个OCR实例，池中没有空闲实例且未满时新建（后台预热中时等待预热结果），已满时等待归还"""
+        try:
+            engine = self._engines.get_nowait()
+        except queue.Empty:
+            engine = self._wait_for_warm_up()
+            if engine is None:
+                if self._reserve_slot():
+                    try:
+                        engine = self._create_engine()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                else:
+                    engine = self._engines.get()
+
+        try:
+            yield engine
+        finally:
+            self._engines.put(engine)
+
+    def classify(self, image_bytes, **kwargs):
+        """
+        识别验证码并记录推理耗时
+
+        Args:
+            image_bytes: 验证码图片的原始字节
+            **kwargs: 透传给DdddOcr.classification的参数
+
+        Returns:
+            识别结果
+        """
+        with self.engine() as engine:
+            start = time.perf_counter()
+            result = engine.classification(image_bytes, **kwargs)
+            elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            stats = self._inference
+            stats["count"] += 1
+            stats["total"] += elapsed
+            stats["last"] = elapsed
+            stats["max"] = max(stats["max"], elapsed)
+        return result
+
+    def get_stats(self):
+        """获取模型加载和识别耗时统计（秒）"""
+        with self._stats_lock:
+            load_times = list(self._load_times)
+            inference = dict(self._inference)
+
+        return {
+            "size": self.size,
+            "engines": self._created,
+            "idle": self._engines.qsize(),
+            "warm_up_wait": round(self._warm_up_wait, 4),
+            "model_load": {
+                "count": len(load_times),
+                "total": round(sum(load_times), 4),
+                "avg": round(sum(load_times) / len(load_times), 4) if load_times else 0.0,
+                "last": round(load_times[-1], 4) if load_times else 0.0,
+            },
+            "inference": {
+                "count": inference["count"],
+                "avg": round(inference["total"] / inference["count"], 4) if inference["count"] else 0.0,
+                "max": round(inference["max"], 4),
+                "last": round(inference["last"], 4),
+            },
+        }
+
+
+# 全局OCR引擎池
+ocr_pool = OcrEnginePool()
+
+
+def warm_up_ocr(count=None):
+    """预先加载OCR模型（可在程序启动时调用），返回已加载的实例数"""
+    return ocr_pool.warm_up(count)
+
+
+def warm_up_ocr_async(count=1):
+    """
+    在后台线程中加载OCR模型（程序启动时调用），与读取配置、加载cookies、访问首页并行
+
+    识别验证码时如果模型还没加载完成才会等待。开启OCR进程池（OCR_SERVICE_ENABLED）时改为在后台启动进程池。
+
+    Args:
+        count: 加载的实例数，为空时加载到池大小
+
+    Returns:
+        预热线程
+    """
+    if _env_flag('OCR_SERVICE_ENABLED'):
+        from utils.ocr_service import ocr_service
+        thread = threading.Thread(target=ocr_service.warm_up, name="ocr-service-warm-up", daemon=True)
+        thread.start()
+        return thread
+    return ocr_pool.warm_up_async(count)
+
+
+def get_ocr_stats():
+    """获取OCR模型加载耗时和识别耗时统计"""
+    return ocr_pool.get_stats()
+
 
 def clean_old_captcha_files(captcha_dir, max_age_hours=24):
     """
@@ -39,80 +385,395 @@ def clean_old_captcha_files(captcha_dir, max_age_hours=24):
         print(f"⚠️ 清理验证码文件时出错: {e}")
 
 
-def code_ocr(username, session, max_retries=3):
+# 验证码调试采样默认配置
+DEFAULT_CAPTURE_SAMPLE_RATE = 0.1
+DEFAULT_CAPTURE_MAX_FILES = 200
+DEFAULT_CAPTURE_CLEANUP_INTERVAL = 3600
+
+
+class CaptchaDebugCapture:
     """
-    识别验证码
+    验证码调试采样（默认关闭）
+
+    开启后按采样率把验证码图片交给后台线程写入 data/captcha，识别流程本身不做任何磁盘IO。
+    目录中最多保留 max_files 张图片（环形淘汰最旧的），过期文件由后台线程定时清理。
+
+    环境变量：
+        CAPTCHA_DEBUG_CAPTURE: 是否开启（默认false）
+        CAPTCHA_DEBUG_SAMPLE_RATE: 采样率 0-1（默认0.1）
+        CAPTCHA_DEBUG_MAX_FILES: 最多保留的图片数（默认200）
+    """
+
+    def __init__(self, captcha_dir=None, enabled=None, sample_rate=None, max_files=None,
+                 cleanup_interval=DEFAULT_CAPTURE_CLEANUP_INTERVAL):
+        from pathlib import Path
+
+        self.captcha_dir = Path(captcha_dir or Path(__file__).parent.parent / "data" / "captcha")
+        self._enabled = enabled
+        self._sample_rate = sample_rate
+        self._max_files = max_files
+        self.cleanup_interval = cleanup_interval
+
+        self._queue = queue.Queue(maxsize=100)
+        self._files = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {"captured": 0, "dropped": 0, "removed": 0}
+
+    @property
+    def enabled(self):
+        if self._enabled is None:
+            self._enabled = _env_flag('CAPTCHA_DEBUG_CAPTURE')
+        return self._enabled
+
+    @property
+    def sample_rate(self):
+        if self._sample_rate is None:
+            try:
+                self._sample_rate = float(os.getenv('CAPTCHA_DEBUG_SAMPLE_RATE', DEFAULT_CAPTURE_SAMPLE_RATE))
+            except ValueError:
+                self._sample_rate = DEFAULT_CAPTURE_SAMPLE_RATE
+        return self._sample_rate
+
+    @property
+    def max_files(self):
+        if self._max_files is None:
+            try:
+                self._max_files = max(1, int(os.getenv('CAPTCHA_DEBUG_MAX_FILES', DEFAULT_CAPTURE_MAX_FILES)))
+            except ValueError:
+                self._max_files = DEFAULT_CAPTURE_MAX_FILES
+        return self._max_files
+
+    def capture(self, username, image_bytes, code=None):
+        """
+        按采样率保存验证码图片（非阻塞）
+
+        Args:
+            username: 用户名
+            image_bytes: 验证码图片的原始字节
+            code: 识别结果，为空表示识别失败
+
+        Returns:
+            是否被采样
+        """
+        import random
+
+        if not self.enabled or not image_bytes or random.random() >= self.sample_rate:
+            return False
+
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((username, image_bytes, code, time.time()))
+            return True
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+
+    def _ensure_writer(self):
+        """启动后台写入线程"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="captcha-debug-capture", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """后台线程：写入采样的图片，空闲时定时清理过期文件"""
+        from collections import deque
+
+        self.captcha_dir.mkdir(parents=True, exist_ok=True)
+        existing = sorted(self.captcha_dir.glob("captcha_*.png"), key=lambda path: path.stat().st_mtime)
+        self._files = deque(existing)
+        self._trim()
+        last_cleanup = 0.0
+
+        while True:
+            if time.time() - last_cleanup >= self.cleanup_interval:
+                clean_old_captcha_files(self.captcha_dir)
+                self._files = deque(path for path in self._files if path.exists())
+                last_cleanup = time.time()
+
+            try:
+                username, image_bytes, code, captured_at = self._queue.get(timeout=self.cleanup_interval)
+            except queue.Empty:
+                continue
+
+            try:
+                path = self.captcha_dir / f"captcha_{username}_{int(captured_at * 1000)}_{code or 'failed'}.png"
+                path.write_bytes(image_bytes)
+                self._files.append(path)
+                self.stats["captured"] += 1
+                self._trim()
+            except Exception as e:
+                print(f"⚠️ 保存调试验证码失败: {e}")
+
+    def _trim(self):
+        """超过保留数量时删除最旧的图片"""
+        while len(self._files) > self.max_files:
+            oldest = self._files.popleft()
+            try:
+                oldest.unlink()
+                self.stats["removed"] += 1
+            except FileNotFoundError:
+                pass
+
+
+# 全局验证码调试采样
+captcha_capture = CaptchaDebugCapture()
+
+
+# 验证码预处理流水线（首次使用时按环境变量创建）
+_preprocessor = None
+
+
+def get_preprocessor():
+    """获取验证码预处理流水线（见 utils.captcha_preprocess）"""
+    global _preprocessor
+    if _preprocessor is None:
+        from utils.captcha_preprocess import CaptchaPreprocessor
+        _preprocessor = CaptchaPreprocessor()
+    return _preprocessor
+
+
+def set_preprocessor(preprocessor):
+    """替换验证码预处理流水线（用于评测不同的预处理设置）"""
+    global _preprocessor
+    _preprocessor = preprocessor
+
+
+def prepare_image(image_bytes):
+    """按配置预处理验证码图片，未开启预处理时原样返回字节"""
+    return get_preprocessor().process(image_bytes)
+
+
+def read_captcha(image_bytes, with_confidence=False):
+    """
+    读取验证码图片的原始识别结果（不做格式检查，不输出日志）
+
+    登录流程和离线评测（utils.captcha_benchmark）共用这一识别路径，开启预处理时先在内存中预处理图片。
 
     Args:
-        username: 用户名
-        session: 会话对象
-        max_retries: 最大重试次数
+        image_bytes: 验证码图片的原始字节
+        with_confidence: 是否同时返回置信度
+
+    Returns:
+        识别出的字符串；with_confidence为True时返回 (识别结果, 置信度)
+    """
+    if _env_flag('OCR_SERVICE_ENABLED'):
+        # 交给OCR进程池识别
+        from utils.ocr_service import ocr_service
+        return ocr_service.read(image_bytes, with_confidence=with_confidence)
+
+    # 使用引擎池中已加载的OCR实例
+    image = prepare_image(image_bytes)
+    if with_confidence:
+        return parse_probability_result(ocr_pool.classify(image, probability=True))
+    return ocr_pool.classify(image)
+
+
+def _accept_code(code, confidence=None):
+    """按验证码规格检查识别结果，未通过时返回None"""
+    ok, reason = captcha_profile.validate(code, confidence)
+    if ok:
+        print(f"🎯 验证码识别成功: {code}")
+        return code
+
+    details = {
+        'length': f"长度: {len(code) if code else 0}",
+        'charset': "包含站点不使用的字符",
+        'confidence': f"置信度: {confidence:.2f}" if confidence is not None else "置信度过低",
+    }
+    print(f"⚠️ 验证码不符合规格，重新获取: {code} ({details[reason]})")
+    return None
+
+
+def recognize_captcha(image_bytes):
+    """
+    使用ddddocr识别验证码图片数据（OCR实例来自进程级引擎池，不会重复加载模型）
+
+    识别结果不符合验证码规格（长度、字符集、置信度，见 CaptchaProfile）时返回None，
+    调用方应重新获取验证码而不是提交登录。
+
+    Args:
+        image_bytes: 验证码图片的原始字节
 
     Returns:
         验证码字符串或None
     """
-    import os
-    from pathlib import Path
+    if not image_bytes:
+        print("⚠️ 验证码图片数据为空")
+        return None
+
+    try:
+        if captcha_profile.needs_confidence:
+            code, confidence = read_captcha(image_bytes, with_confidence=True)
+        else:
+            code, confidence = read_captcha(image_bytes), None
+
+        return _accept_code(code, confidence)
+
+    except Exception as ocr_error:
+        print(f"❌ OCR识别失败: {ocr_error}")
+
+        # 如果是PIL相关错误，尝试使用备用方法
+        if "ANTIALIAS" in str(ocr_error):
+            print("🔧 检测到PIL兼容性问题，尝试修复...")
+            try:
+                # 重新导入并设置兼容性
+                from PIL import Image
+                if not hasattr(Image, 'ANTIALIAS'):
+                    Image.ANTIALIAS = Image.LANCZOS
+                    print("✅ PIL兼容性补丁已应用")
+            except Exception as patch_error:
+                print(f"❌ 兼容性补丁失败: {patch_error}")
+
+    return None
+
+
+# 服务器会话cookie名称
+SESSION_COOKIE = 'JSESSIONID'
 
-    # 确保验证码目录存在
-    captcha_dir = Path(__file__).parent.parent / "data" / "captcha"
-    captcha_dir.mkdir(parents=True, exist_ok=True)
+# 未传入节奏配置时使用的随机等待区间（秒）
+DEFAULT_DELAYS = {
+    'warmup': (1.5, 3),
+    'captcha_retry': (3, 8),
+}
 
-    # 清理旧的验证码文件
-    clean_old_captcha_files(captcha_dir)
 
+def has_session_cookie(cookie_jar):
+    """
+    判断cookie jar中是否已有服务器会话cookie
+
+    Args:
+        cookie_jar: requests的session.cookies或httpx的client.cookies.jar
+
+    Returns:
+        是否存在JSESSIONID
+    """
+    return any(cookie.name == SESSION_COOKIE for cookie in cookie_jar)
+
+
+def _get_delay(pacing, kind):
+    """获取等待时长：优先使用登录节奏配置，否则使用默认随机区间"""
     import random
 
-    for attempt in range(max_retries):
+    if pacing is not None:
+        return pacing.delay(kind)
+    low, high = DEFAULT_DELAYS[kind]
+    return random.uniform(low, high)
+
+
+def _stage(timings, name):
+    """阶段计时上下文，未传入计时器时不计时"""
+    from contextlib import nullcontext
+
+    return timings.stage(name) if timings is not None else nullcontext()
+
+
+def _captcha_request_args():
+    """验证码请求参数，模拟浏览器行为"""
+    import random
+
+    timestamp_ms = int(time.time() * 1000)
+    return {
+        'params': {
+            't': str(timestamp_ms),
+            '_': str(timestamp_ms + random.randint(1, 999))
+        },
+        'headers': {
+            'Referer': 'http://oa.csmu.edu.cn:8099/jsxsd/xk/LoginToXk',
+            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+            'Cache-Control': 'no-cache',
+            'Pragma': 'no-cache'
+        }
+    }
+
+
+async def recognize_captcha_async(image_bytes):
+    """
+    异步识别验证码图片数据
+
+    开启OCR进程池服务（OCR_SERVICE_ENABLED）时提交给工作进程并等待结果，
+    否则在线程池中使用进程内引擎池识别，均不阻塞事件循环。
+
+    Args:
+        image_bytes: 验证码图片的原始字节
+
+    Returns:
+        验证码字符串或None
+    """
+    import asyncio
+
+    if image_bytes and _env_flag('OCR_SERVICE_ENABLED'):
+        from utils.ocr_service import ocr_service
         try:
-            print(f"🔍 正在获取验证码... (尝试 {attempt + 1}/{max_retries})")
+            if captcha_profile.needs_confidence:
+                code, confidence = await ocr_service.read_async(image_bytes, with_confidence=True)
+            else:
+                code, confidence = await ocr_service.read_async(image_bytes), None
+        except Exception as e:
+            print(f"❌ OCR识别失败: {e}")
+            return None
+        return _accept_code(code, confidence)
 
-            # 添加随机延迟，避免请求过于频繁
-            if attempt > 0:
-                delay = random.uniform(3, 8)  # 3-8秒随机延迟
-                print(f"⏳ 等待 {delay:.1f} 秒避免请求过于频繁...")
-                time.sleep(delay)
+    return await asyncio.to_thread(recognize_captcha, image_bytes)
 
-            # 生成验证码图片文件名
-            timestamp = int(time.time())
-            image_path = captcha_dir / f'captcha_{username}_{timestamp}.png'
 
-            # 先访问主页面建立会话
-            try:
-                main_page = session.get(
-                    'http://oa.csmu.edu.cn:8099/jsxsd',
-                    timeout=10
-                )
-                print(f"🌐 主页面访问状态: {main_page.status_code}")
+def code_ocr(username, session, max_retries=3, pacing=None, timings=None):
+    """
+    识别验证码
 
-                # 访问主页面后稍作等待
-                time.sleep(random.uniform(1.5, 3))
+    验证码直接在内存中识别，只有开启调试采样（CAPTCHA_DEBUG_CAPTURE）时才会由后台线程按采样率保存图片。
+    快速模式（pacing.fast_mode）下仅在cookie中没有JSESSIONID时访问首页预热，也不插入固定等待。
 
-            except Exception as e:
-                print(f"⚠️ 访问主页面失败: {e}")
-
-            # 获取验证码图片，添加更多参数模拟浏览器行为
-            timestamp_ms = int(time.time() * 1000)
-            response = session.get(
-                'http://oa.csmu.edu.cn:8099/jsxsd/verifycode.servlet',
-                params={
-                    't': str(timestamp_ms),
-                    '_': str(timestamp_ms + random.randint(1, 999))
-                },
-                headers={
-                    'Referer': 'http://oa.csmu.edu.cn:8099/jsxsd/xk/LoginToXk',
-                    'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
-                    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                    'Cache-Control': 'no-cache',
-                    'Pragma': 'no-cache'
-                },
-                timeout=15
-            )
+    Args:
+        username: 用户名
+        session: 会话对象（由session管理器创建，超时和连接重试由传输层按接口类型配置）
+        max_retries: 最大重试次数
+        pacing: 登录节奏配置（src.auth.pacing.LoginPacing），为空时使用原有的随机延迟
+        timings: 阶段计时器（src.auth.pacing.LoginTimings），为空时不计时
+
+    Returns:
+        验证码字符串或None
+    """
+    fast_mode = pacing is not None and pacing.fast_mode
+
+    for attempt in range(max_retries):
+        try:
+            print(f"🔍 正在获取验证码... (尝试 {attempt + 1}/{max_retries})")
+
+            # 添加延迟，避免请求过于频繁
+            if attempt > 0:
+                delay = _get_delay(pacing, 'captcha_retry')
+                if delay > 0:
+                    print(f"⏳ 等待 {delay:.1f} 秒避免请求过于频繁...")
+                    time.sleep(delay)
+
+            # 先访问主页面建立会话（快速模式下已有会话cookie时跳过）
+            if not fast_mode or not has_session_cookie(session.cookies):
+                try:
+                    with _stage(timings, 'warmup'):
+                        main_page = session.get('http://oa.csmu.edu.cn:8099/jsxsd')
+                    print(f"🌐 主页面访问状态: {main_page.status_code}")
+
+                    # 访问主页面后稍作等待
+                    delay = _get_delay(pacing, 'warmup')
+                    if delay > 0:
+                        time.sleep(delay)
+
+                except Exception as e:
+                    print(f"⚠️ 访问主页面失败: {e}")
+
+            # 获取验证码图片
+            with _stage(timings, 'captcha_fetch'):
+                response = session.get(
+                    'http://oa.csmu.edu.cn:8099/jsxsd/verifycode.servlet',
+                    **_captcha_request_args()
+                )
 
             # 检查响应状态码
             if response.status_code == 200:
                 print(f"🔍 验证码响应大小: {len(response.content)} 字节")
-                print(f"🔍 响应Content-Type: {response.headers.get('Content-Type', 'Unknown')}")
 
                 # 检查响应内容是否为空
                 if len(response.content) == 0:
@@ -125,76 +786,14 @@ def code_ocr(username, session, max_retries=3):
                     print(f"🔍 响应内容前100字符: {response.text[:100]}")
                     continue
 
-                # 保存验证码图片
-                with open(image_path, mode='wb') as file:
-                    file.write(response.content)
-
-                print(f"✅ 验证码图片已保存: {image_path}")
-
-                # 等待文件写入完成
-                time.sleep(0.1)
-
-                # 检查文件是否存在且有内容
-                if not image_path.exists():
-                    print(f"⚠️ 验证码文件不存在: {image_path}")
-                    continue
-
-                file_size = image_path.stat().st_size
-                print(f"🔍 验证码文件大小: {file_size} 字节")
-
-                if file_size == 0:
-                    print("⚠️ 验证码图片文件为空")
-                    continue
-
-                # 使用ddddocr识别验证码
-                with open(image_path, 'rb') as image_file:
-                    try:
-                        ocr = ddddocr.DdddOcr()  # 创建OCR对象
-                        image_bytes = image_file.read()
-
-                        print(f"🔍 读取到的图片数据大小: {len(image_bytes)} 字节")
-
-                        if len(image_bytes) == 0:
-                            print("⚠️ 验证码图片数据为空")
-                            continue
-
-                        code = ocr.classification(image_bytes)
-
-                        # 验证码基本格式检查
-                        if code and len(code) >= 4:
-                            print(f"🎯 验证码识别成功: {code}")
-
-                            # 保留文件用于调试，不立即删除
-                            # try:
-                            #     os.remove(image_path)
-                            # except:
-                            #     pass
-
-                            return code
-                        else:
-                            print(f"⚠️ 验证码格式异常: {code} (长度: {len(code) if code else 0})")
-
-                    except Exception as ocr_error:
-                        print(f"❌ OCR识别失败: {ocr_error}")
-
-                        # 如果是PIL相关错误，尝试使用备用方法
-                        if "ANTIALIAS" in str(ocr_error):
-                            print("🔧 检测到PIL兼容性问题，尝试修复...")
-                            try:
-                                # 重新导入并设置兼容性
-                                from PIL import Image
-                                if not hasattr(Image, 'ANTIALIAS'):
-                                    Image.ANTIALIAS = Image.LANCZOS
-                                    print("✅ PIL兼容性补丁已应用")
-                            except Exception as patch_error:
-                                print(f"❌ 兼容性补丁失败: {patch_error}")
-
-                # 保留失败的图片文件用于调试
-                # try:
-                #     if image_path.exists():
-                #         os.remove(image_path)
-                # except:
-                #     pass
+                # 直接在内存中识别验证码
+                with _stage(timings, 'ocr'):
+                    code = recognize_captcha(response.content)
+                captcha_capture.capture(username, response.content, code)
+                if code:
+                    # 登录提交后由 captcha_feedback 记录服务器的判定
+                    captcha_feedback.remember(username, response.content, code)
+                    return code
 
             else:
                 print(f"❌ 获取验证码失败，状态码: {response.status_code}")
@@ -213,10 +812,69 @@ def code_ocr(username, session, max_retries=3):
                 print("2. 或运行: pip install --upgrade ddddocr")
                 print("3. 重启程序")
 
-        # 短暂延迟后重试
-        if attempt < max_retries - 1:
-            print("⏳ 等待1秒后重试...")
-            time.sleep(1)
+    print(f"❌ 验证码识别失败，已尝试 {max_retries} 次")
+    return None
+
+
+async def async_code_ocr(username, client, max_retries=3, pacing=None, timings=None):
+    """
+    异步识别验证码
+
+    验证码在内存中识别（调试采样见 CaptchaDebugCapture）；OCR推理放到线程池或OCR进程池中执行，避免阻塞事件循环。
+
+    Args:
+        username: 用户名
+        client: httpx.AsyncClient对象
+        max_retries: 最大重试次数
+        pacing: 登录节奏配置，为空时使用原有的随机延迟
+        timings: 阶段计时器，为空时不计时
+
+    Returns:
+        验证码字符串或None
+    """
+    import asyncio
+
+    fast_mode = pacing is not None and pacing.fast_mode
+
+    for attempt in range(max_retries):
+        try:
+            print(f"🔍 [{username}] 正在获取验证码... (尝试 {attempt + 1}/{max_retries})")
+
+            if attempt > 0:
+                await asyncio.sleep(_get_delay(pacing, 'captcha_retry'))
+
+            # 先访问主页面建立会话（快速模式下已有会话cookie时跳过）
+            if not fast_mode or not has_session_cookie(client.cookies.jar):
+                try:
+                    with _stage(timings, 'warmup'):
+                        await client.get('http://oa.csmu.edu.cn:8099/jsxsd')
+                    await asyncio.sleep(_get_delay(pacing, 'warmup'))
+                except Exception as e:
+                    print(f"⚠️ 访问主页面失败: {e}")
+
+            with _stage(timings, 'captcha_fetch'):
+                response = await client.get(
+                    'http://oa.csmu.edu.cn:8099/jsxsd/verifycode.servlet',
+                    **_captcha_request_args()
+                )
+
+            if response.status_code != 200:
+                print(f"❌ 获取验证码失败，状态码: {response.status_code}")
+                continue
+
+            if response.headers.get('Content-Type', '').startswith('text/html'):
+                print("⚠️ 服务器返回HTML页面而不是图片")
+                continue
+
+            with _stage(timings, 'ocr'):
+                code = await recognize_captcha_async(response.content)
+            captcha_capture.capture(username, response.content, code)
+            if code:
+                captcha_feedback.remember(username, response.content, code)
+                return code
+
+        except Exception as e:
+            print(f"❌ 异步验证码识别过程中出现问题: {e}")
 
     print(f"❌ 验证码识别失败，已尝试 {max_retries} 次")
     return None
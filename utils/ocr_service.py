@@ -0,0 +1,224 @@
+"""
+验证码识别进程池服务
+
+夜间批量刷新大量账号时，OCR推理是CPU密集型任务，在登录线程中串行执行会受GIL限制。
+本模块把推理分散到 ProcessPoolExecutor 的多个工作进程：每个进程在启动时加载一个DdddOcr实例并常驻，
+ONNX Runtime线程数可配置。登录线程提交验证码图片字节并等待结果（同步或异步）。
+
+环境变量：
+    OCR_SERVICE_ENABLED: 登录流程的 recognize_captcha 是否改用本服务（默认false，使用进程内引擎池）
+    OCR_SERVICE_WORKERS: 工作进程数（默认CPU核数）
+    OCR_ONNX_THREADS: 每个工作进程的ONNX Runtime线程数（默认1）
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Iterable
+
+# 工作进程中常驻的OCR实例
+_worker_engine = None
+
+
+def _init_worker(onnx_threads: int) -> None:
+    """工作进程初始化：限制ONNX Runtime线程数并加载一个OCR实例"""
+    global _worker_engine
+
+    os.environ['ORT_LOGGING_LEVEL'] = '3'
+
+    import onnxruntime
+
+    # ddddocr 不暴露 SessionOptions，在工作进程内包装 InferenceSession 以设置线程数
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = onnx_threads
+    options.inter_op_num_threads = 1
+    original_session = onnxruntime.InferenceSession
+
+    def session_with_threads(path_or_bytes, sess_options=None, *args, **kwargs):
+        return original_session(path_or_bytes, sess_options or options, *args, **kwargs)
+
+    onnxruntime.InferenceSession = session_with_threads
+
+    import ddddocr
+    from utils.code1 import captcha_profile
+    _worker_engine = ddddocr.DdddOcr(show_ad=False)
+    captcha_profile.apply(_worker_engine)
+
+
+def _worker_ready() -> int:
+    """确认工作进程已完成初始化，返回进程ID"""
+    return os.getpid()
+
+
+def _worker_read(image_bytes: bytes, with_confidence: bool = False):
+    """在工作进程中识别一张验证码，返回原始识别结果（with_confidence时返回 (识别结果, 置信度)）"""
+    from utils.code1 import prepare_image
+
+    try:
+        image = prepare_image(image_bytes)
+        if with_confidence:
+            from utils.code1 import parse_probability_result
+            # 在工作进程中解析概率输出，只把结果和置信度传回主进程
+            return parse_probability_result(_worker_engine.classification(image, probability=True))
+        return _worker_engine.classification(image)
+    except Exception as e:
+        print(f"❌ OCR工作进程识别失败: {e}")
+        return (None, None) if with_confidence else None
+
+
+def _validated(code: Optional[str]) -> Optional[str]:
+    """格式检查未通过的识别结果视为失败"""
+    from utils.code1 import is_valid_code
+    return code if is_valid_code(code) else None
+
+
+class OcrService:
+    """验证码识别进程池"""
+
+    def __init__(self, workers: Optional[int] = None, onnx_threads: Optional[int] = None):
+        self._workers = workers
+        self._onnx_threads = onnx_threads
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"submitted": 0, "batches": 0}
+
+    @property
+    def workers(self) -> int:
+        """工作进程数"""
+        if self._workers is None:
+            self._workers = _get_int('OCR_SERVICE_WORKERS', os.cpu_count() or 1)
+        return max(1, self._workers)
+
+    @property
+    def onnx_threads(self) -> int:
+        """每个工作进程的ONNX Runtime线程数"""
+        if self._onnx_threads is None:
+            self._onnx_threads = _get_int('OCR_ONNX_THREADS', 1)
+        return max(1, self._onnx_threads)
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> ProcessPoolExecutor:
+        """启动进程池（已启动时直接返回）"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # 使用spawn启动工作进程，避免fork时复制登录线程持有的锁
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker,
+                        initargs=(self.onnx_threads,),
+                    )
+                    print(f"🧠 OCR进程池已启动: {self.workers} 个工作进程, 每个进程 {self.onnx_threads} 个ONNX线程")
+        return self._executor
+
+    def warm_up(self) -> float:
+        """
+        启动全部工作进程并等待模型加载完成
+
+        Returns:
+            预热耗时（秒）
+        """
+        start = time.perf_counter()
+        executor = self.start()
+        futures = [executor.submit(_worker_ready) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+        print(f"🧠 OCR进程池预热完成，耗时 {elapsed:.2f} 秒")
+        return elapsed
+
+    def submit(self, image_bytes: bytes, with_confidence: bool = False) -> Future:
+        """
+        提交一张验证码
+
+        Args:
+            image_bytes: 验证码图片的原始字节
+            with_confidence: 是否同时返回置信度
+
+        Returns:
+            结果为原始识别结果（或 (识别结果, 置信度)）的Future
+        """
+        with self._stats_lock:
+            self._stats["submitted"] += 1
+        return self.start().submit(_worker_read, image_bytes, with_confidence)
+
+    def read(self, image_bytes: bytes, timeout: Optional[float] = None, with_confidence: bool = False):
+        """同步识别一张验证码，返回原始识别结果"""
+        return self.submit(image_bytes, with_confidence).result(timeout=timeout)
+
+    async def read_async(self, image_bytes: bytes, with_confidence: bool = False):
+        """异步识别一张验证码，等待期间不阻塞事件循环，返回原始识别结果"""
+        import asyncio
+        return await asyncio.wrap_future(self.submit(image_bytes, with_confidence))
+
+    def recognize(self, image_bytes: bytes, timeout: Optional[float] = None) -> Optional[str]:
+        """同步识别一张验证码，格式检查未通过时返回None"""
+        return _validated(self.read(image_bytes, timeout))
+
+    async def recognize_async(self, image_bytes: bytes) -> Optional[str]:
+        """异步识别一张验证码，格式检查未通过时返回None"""
+        return _validated(await self.read_async(image_bytes))
+
+    def batch(self, images: Iterable[bytes], chunksize: int = 8, raw: bool = False) -> List[Optional[str]]:
+        """
+        批量识别验证码
+
+        Args:
+            images: 验证码图片字节序列
+            chunksize: 每次发送给工作进程的图片数
+            raw: 是否返回原始识别结果（不做格式检查）
+
+        Returns:
+            与输入顺序一致的识别结果列表，识别失败的位置为None
+        """
+        images = list(images)
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["submitted"] += len(images)
+        results = self.start().map(_worker_read, images, chunksize=max(1, chunksize))
+        return list(results) if raw else [_validated(code) for code in results]
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取提交统计（submitted: 提交的图片数, batches: 批量识别次数）"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭进程池"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+def _get_int(key: str, default: int) -> int:
+    """读取整数型环境变量"""
+    try:
+        return int(os.getenv(key, default))
+    except ValueError:
+        return default
+
+
+# 全局OCR进程池服务（首次使用时启动）
+ocr_service = OcrService()
+
+
+def code_ocr_batch(images: Iterable[bytes], chunksize: int = 8) -> List[Optional[str]]:
+    """
+    使用进程池批量识别验证码
+
+    Args:
+        images: 验证码图片字节序列
+        chunksize: 每次发送给工作进程的图片数
+
+    Returns:
+        与输入顺序一致的识别结果列表，识别失败的位置为None
+    """
+    return ocr_service.batch(images, chunksize)